@@ -27,17 +27,279 @@ EasyBuild support for building and installing Bazel, implemented as an easyblock
 """
 from easybuild.tools import LooseVersion
 import glob
+import gzip
+import json
 import os
+import re
 import tempfile
 
 import easybuild.tools.environment as env
 from easybuild.framework.easyblock import EasyBlock
 from easybuild.tools.build_log import EasyBuildError
-from easybuild.tools.filetools import apply_regex_substitutions, copy_file, which
+from easybuild.tools.filetools import apply_regex_substitutions, copy_file, is_readable, mkdir, read_file
+from easybuild.tools.filetools import remove_file, which
 from easybuild.tools.modules import get_software_root, get_software_version
 from easybuild.tools.run import run_shell_cmd
+from easybuild.tools.systemtools import UNKNOWN, get_total_memory
 from easybuild.framework.easyconfig import CUSTOM
 
+# summary of executed actions printed by Bazel at the end of a build, for example:
+#   INFO: 12345 processes: 9876 disk cache hit, 1234 internal, 1235 linux-sandbox.
+BAZEL_PROCESSES_SUMMARY_REGEX = re.compile(r'^INFO: (?P<total>[0-9]+) process(?:es)?: (?P<details>.*?)\.?$', re.M)
+# older Bazel versions report hits in the disk cache as 'remote cache hit'
+BAZEL_CACHE_HIT_REGEX = re.compile(r'^(?P<cnt>[0-9]+) (?:disk|remote) cache hits?$')
+
+# files specifying the memory limit of the cgroup we're running in (cgroups v2 and v1, respectively)
+CGROUP_MEMORY_LIMIT_FILES = [
+    '/sys/fs/cgroup/memory.max',
+    '/sys/fs/cgroup/memory/memory.limit_in_bytes',
+]
+# category of trace events in Bazel JSON profile for critical path components and executed actions
+BAZEL_PROFILE_CRITICAL_PATH_CAT = 'critical path component'
+BAZEL_PROFILE_ACTION_CATS = ('action processing', 'local action execution', 'remote action execution')
+
+
+def bazel_cache_extra_options():
+    """Custom easyconfig parameters to configure persistent Bazel caches."""
+    return {
+        'bazel_disk_cache': [None, "Directory to use as persistent Bazel disk cache (--disk_cache) for action "
+                                   "outputs; must be located outside of the build directory", CUSTOM],
+        'bazel_disk_cache_max_size': [None, "Maximum size (in MiB) of the Bazel disk cache, least recently used "
+                                            "entries are removed after the build when exceeded", CUSTOM],
+        'bazel_repository_cache': [None, "Directory to use as persistent Bazel repository cache "
+                                         "(--repository_cache) for downloaded external dependencies; "
+                                         "must be located outside of the build directory", CUSTOM],
+    }
+
+
+def bazel_cache_opts(cfg, builddir):
+    """
+    Determine Bazel options to use the persistent disk/repository caches specified in the easyconfig.
+
+    :param cfg: easyconfig instance (see bazel_cache_extra_options for the relevant parameters)
+    :param builddir: build directory, which the caches are not allowed to be located in
+    """
+    opts = []
+    for param, opt in (('bazel_disk_cache', '--disk_cache'), ('bazel_repository_cache', '--repository_cache')):
+        cache_dir = cfg[param]
+        if cache_dir:
+            cache_dir = os.path.abspath(os.path.expandvars(os.path.expanduser(cache_dir)))
+            if builddir and os.path.commonpath([cache_dir, os.path.abspath(builddir)]) == os.path.abspath(builddir):
+                raise EasyBuildError("Bazel cache directory specified via %s must be located outside of "
+                                     "the build directory %s: %s", param, builddir, cache_dir)
+            mkdir(cache_dir, parents=True)
+            opts.append('%s=%s' % (opt, cache_dir))
+    return opts
+
+
+def parse_bazel_cache_hits(output):
+    """
+    Parse the number of cache hits and total number of processes from the (last) summary in output of Bazel.
+
+    :return: tuple with number of cache hits and total number of processes, or None if no summary was found
+    """
+    res = None
+    for summary in BAZEL_PROCESSES_SUMMARY_REGEX.finditer(output):
+        hits = 0
+        for detail in summary.group('details').split(','):
+            cache_hit = BAZEL_CACHE_HIT_REGEX.match(detail.strip())
+            if cache_hit:
+                hits += int(cache_hit.group('cnt'))
+        res = (hits, int(summary.group('total')))
+    return res
+
+
+def trim_bazel_disk_cache(path, max_size):
+    """
+    Remove least recently used entries from the Bazel disk cache at specified path until
+    its total size no longer exceeds max_size (in MiB).
+
+    :return: total size (in bytes) of removed entries
+    """
+    entries = []
+    total_size = 0
+    for dirpath, _, filenames in os.walk(path):
+        for filename in filenames:
+            filepath = os.path.join(dirpath, filename)
+            try:
+                st = os.lstat(filepath)
+            except OSError:
+                continue
+            entries.append((max(st.st_atime, st.st_mtime), st.st_size, filepath))
+            total_size += st.st_size
+
+    max_bytes = max_size * 1024 ** 2
+    removed = 0
+    for _, size, filepath in sorted(entries):
+        if total_size - removed <= max_bytes:
+            break
+        remove_file(filepath)
+        removed += size
+
+    return removed
+
+
+def report_bazel_cache(cfg, output, log):
+    """
+    Log the hit rate of the Bazel disk cache derived from Bazel output,
+    and enforce the size limit of the disk cache (if any).
+    """
+    cache_dir = cfg['bazel_disk_cache']
+    if not cache_dir:
+        return
+
+    cache_hits = parse_bazel_cache_hits(output)
+    if cache_hits is None:
+        log.info("No summary of executed processes found in Bazel output, can't determine disk cache hit rate")
+    else:
+        hits, total = cache_hits
+        log.info("Bazel disk cache hit rate: %d out of %d processes (%.1f%%)",
+                 hits, total, 100.0 * hits / total if total else 0.0)
+
+    max_size = cfg['bazel_disk_cache_max_size']
+    if max_size:
+        cache_dir = os.path.abspath(os.path.expandvars(os.path.expanduser(cache_dir)))
+        removed = trim_bazel_disk_cache(cache_dir, int(max_size))
+        log.info("Removed %.1f MiB from Bazel disk cache %s to respect limit of %s MiB",
+                 removed / 1024.0 ** 2, cache_dir, max_size)
+
+
+def bazel_resources_extra_options():
+    """Custom easyconfig parameters to control local resources used by Bazel and profiling of Bazel builds."""
+    return {
+        'bazel_local_resources': [False, "Limit RAM and CPU resources used by Bazel for local actions, "
+                                         "based on available memory and cores", CUSTOM],
+        'bazel_ram_fraction': [0.7, "Fraction of available memory (excluding memory reserved for Bazel JVM) "
+                                    "that can be used by Bazel for local actions", CUSTOM],
+        'bazel_profile': [False, "Let Bazel write a JSON trace profile of the build, which is analysed after "
+                                 "the build and copied to the directory of the build log", CUSTOM],
+    }
+
+
+def det_available_memory():
+    """
+    Determine available memory (in MiB), taking into account memory limit of cgroup we're running in (if any).
+
+    :return: available memory, or None if it could not be determined
+    """
+    avail_mem = get_total_memory()
+    if avail_mem == UNKNOWN:
+        avail_mem = None
+
+    for path in CGROUP_MEMORY_LIMIT_FILES:
+        if is_readable(path):
+            limit = read_file(path).strip()
+            # value is 'max' when there's no limit, very large value in cgroups v1
+            if limit.isdigit():
+                limit = int(limit) // 1024 ** 2
+                if avail_mem is None or limit < avail_mem:
+                    avail_mem = limit
+            break
+
+    return avail_mem
+
+
+def bazel_resource_opts(bazel_version, cpus, ram_fraction, reserved_ram=0):
+    """
+    Determine Bazel options to limit RAM/CPU resources used for local actions.
+
+    :param bazel_version: Bazel version (as LooseVersion)
+    :param cpus: number of cores that can be used
+    :param ram_fraction: fraction of available memory that can be used for local actions
+    :param reserved_ram: amount of memory (in MiB) to reserve for other purposes (like the Bazel JVM)
+    """
+    opts = []
+    ram = None
+    avail_mem = det_available_memory()
+    if avail_mem is not None:
+        ram = max(int((avail_mem - reserved_ram) * ram_fraction), 1024)
+
+    # --local_ram_resources and --local_cpu_resources were replaced by --local_resources in Bazel 7.0
+    if bazel_version >= '7.0.0':
+        if ram is not None:
+            opts.append('--local_resources=memory=%d' % ram)
+        opts.append('--local_resources=cpu=%d' % cpus)
+    elif bazel_version >= '0.17.1':
+        if ram is not None:
+            opts.append('--local_ram_resources=%d' % ram)
+        opts.append('--local_cpu_resources=%d' % cpus)
+    else:
+        # RAM (MiB), CPU cores and I/O resources
+        opts.append('--local_resources=%d,%d,1.0' % (ram or 4096, cpus))
+
+    return opts
+
+
+def parse_bazel_profile(profile, top=10):
+    """
+    Analyse JSON trace profile written by Bazel (--profile option).
+
+    :param profile: path to (compressed) JSON trace profile
+    :param top: number of (slowest) critical path components to report
+    :return: dict with (top) critical path components as (duration, name) tuples (duration in seconds),
+             total duration of critical path, number of actions and peak number of concurrently running actions
+    """
+    if profile.endswith('.gz'):
+        with gzip.open(profile, 'rt') as fp:
+            trace = json.load(fp)
+    else:
+        trace = json.loads(read_file(profile))
+
+    # profile can either be a dict with a list of trace events, or a list of trace events
+    if isinstance(trace, dict):
+        events = trace.get('traceEvents', [])
+    else:
+        events = trace
+
+    critical_path = []
+    action_events = []
+    for event in events:
+        # only consider complete events, which have both a start time and a duration (in microseconds)
+        if event.get('ph') != 'X' or 'dur' not in event:
+            continue
+        if event.get('cat') == BAZEL_PROFILE_CRITICAL_PATH_CAT:
+            critical_path.append((event['dur'] / 1e6, event.get('name', '')))
+        elif event.get('cat') in BAZEL_PROFILE_ACTION_CATS:
+            action_events.append((event['ts'], event['ts'] + event['dur']))
+
+    # sweep over start/end times of actions to determine peak concurrency;
+    # actions that end at the same time as another one starts are not considered to overlap
+    peak_concurrency, concurrency = 0, 0
+    for _, delta in sorted([(start, 1) for start, _ in action_events] + [(end, -1) for _, end in action_events]):
+        concurrency += delta
+        peak_concurrency = max(peak_concurrency, concurrency)
+
+    return {
+        'critical_path': sorted(critical_path, reverse=True)[:top],
+        'critical_path_time': sum(dur for dur, _ in critical_path),
+        'actions': len(action_events),
+        'peak_concurrency': peak_concurrency,
+    }
+
+
+def report_bazel_profile(profile, logfile, log):
+    """
+    Log analysis of JSON trace profile written by Bazel, and copy it to the directory of the build log.
+    """
+    if not os.path.exists(profile):
+        log.info("Bazel profile %s not found, so not analysing it", profile)
+        return
+
+    try:
+        res = parse_bazel_profile(profile)
+    except (ValueError, OSError) as err:
+        log.warning("Failed to parse Bazel profile %s: %s", profile, err)
+    else:
+        log.info("Bazel profile: %d actions, peak concurrency of %d actions, critical path of %.1fs",
+                 res['actions'], res['peak_concurrency'], res['critical_path_time'])
+        log.info("Slowest actions on critical path of Bazel build:\n%s",
+                 '\n'.join('%10.1fs  %s' % comp for comp in res['critical_path']))
+
+    if logfile:
+        target = os.path.splitext(logfile)[0] + '-' + os.path.basename(profile)
+        copy_file(profile, target)
+        log.info("Bazel profile copied to %s", target)
+
 
 class EB_Bazel(EasyBlock):
     """Support for building/installing Bazel."""
@@ -49,6 +311,7 @@ class EB_Bazel(EasyBlock):
             'static': [None, 'Build statically linked executables ' +
                              '(default: True for Bazel >= 1.0 else False)', CUSTOM],
         }
+        extra_vars.update(bazel_cache_extra_options())
         return EasyBlock.extra_options(extra_vars)
 
     def fixup_hardcoded_paths(self):
@@ -120,6 +383,8 @@ class EB_Bazel(EasyBlock):
         super().prepare_step(*args, **kwargs)
         self.bazel_tmp_dir = tempfile.mkdtemp(suffix='-bazel-tmp', dir=self.builddir)
         self._make_output_user_root()
+        # persistent caches (if any) are located outside of the build directory, so they survive rebuilds
+        self.bazel_cache_opts = bazel_cache_opts(self.cfg, self.builddir)
 
     def _make_output_user_root(self):
         if not os.path.isdir(self.builddir):
@@ -159,6 +424,8 @@ class EB_Bazel(EasyBlock):
 
         # enable building in parallel
         bazel_args = f'--jobs={self.cfg.parallel}'
+        if self.bazel_cache_opts:
+            bazel_args += ' ' + ' '.join(self.bazel_cache_opts)
 
         # Bazel provides a JDK by itself for some architectures
         # We want to enforce it using the JDK we provided via modules
@@ -190,7 +457,8 @@ class EB_Bazel(EasyBlock):
             self.cfg['prebuildopts'],
             "bash -c 'set -x && ./compile.sh'",  # Show the commands the script is running to faster debug failures
         ])
-        run_shell_cmd(cmd)
+        res = run_shell_cmd(cmd)
+        report_bazel_cache(self.cfg, res.output, self.log)
 
     def test_step(self):
         """Test the compilation"""
@@ -212,9 +480,11 @@ class EB_Bazel(EasyBlock):
                 '--subcommands', '--verbose_failures',
                 # Just build tests
                 '--build_tests_only',
+            ] + self.bazel_cache_opts + [
                 self.cfg['testopts']
             ])
-            run_shell_cmd(cmd)
+            res = run_shell_cmd(cmd)
+            report_bazel_cache(self.cfg, res.output, self.log)
 
     def install_step(self):
         """Custom install procedure for Bazel."""
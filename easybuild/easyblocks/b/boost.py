@@ -44,11 +44,12 @@ import glob
 import os
 import re
 import sys
+import xml.etree.ElementTree as ElementTree
 
 import easybuild.tools.toolchain as toolchain
 from easybuild.framework.easyblock import EasyBlock
 from easybuild.framework.easyconfig import CUSTOM
-from easybuild.tools.build_log import EasyBuildError
+from easybuild.tools.build_log import EasyBuildError, print_msg
 from easybuild.tools.config import ERROR
 from easybuild.tools.filetools import apply_regex_substitutions, read_file, symlink, which, write_file
 from easybuild.tools.modules import get_software_root, get_software_version
@@ -57,6 +58,44 @@ from easybuild.tools.systemtools import AARCH64, POWER, RISCV64, UNKNOWN
 from easybuild.tools.systemtools import get_cpu_architecture, get_glibc_version, get_shared_lib_ext
 
 
+# regular expression to determine name of Boost library from path of target built by b2 (like bin.v2/libs/<lib>/...)
+BOOST_LIB_TARGET_REGEX = re.compile(r'(?:^|[/>])libs/(?P<lib>[^/\s]+)/')
+
+# name of library files for Boost libraries for which it does not match the library name,
+# None implies that there is no shared library with a fixed name that can be checked
+BOOST_LIBRARY_FILES = {
+    'exception': None,
+    'math': 'math_tr1',
+    'python': None,
+    'stacktrace': 'stacktrace_basic',
+    'test': 'unit_test_framework',
+}
+
+
+def parse_b2_xml_log(path):
+    """
+    Parse build log in XML format produced by b2 (via --out-xml), to determine the time spent on building
+    each Boost library: CPU time (user + system) of all actions for targets of that library.
+
+    :return: dict with (CPU time in seconds, number of actions) tuple for each library
+    """
+    times = {}
+    for _, elem in ElementTree.iterparse(path):
+        if elem.tag == 'action':
+            txt = ' '.join((elem.findtext(x) or '') for x in ('path', 'jam-target', 'name'))
+            res = BOOST_LIB_TARGET_REGEX.search(txt)
+            if res:
+                try:
+                    cpu_time = float(elem.get('user', 0)) + float(elem.get('system', 0))
+                except ValueError:
+                    cpu_time = 0
+                lib_time, lib_cnt = times.get(res.group('lib'), (0, 0))
+                times[res.group('lib')] = (lib_time + cpu_time, lib_cnt + 1)
+            # free memory used by output of action, since log can be large
+            elem.clear()
+    return times
+
+
 class EB_Boost(EasyBlock):
     """Support for building Boost."""
 
@@ -86,6 +125,13 @@ class EB_Boost(EasyBlock):
             'mpi_launcher': [None, "Launcher to use when running MPI regression tests", CUSTOM],
             'only_python_bindings': [False, "Only install Boost.Python library providing Python bindings", CUSTOM],
             'use_glibcxx11_abi': [None, "Use the GLIBCXX11 ABI", CUSTOM],
+            'boost_libraries': [None, "List of Boost libraries to build (via --with-<lib>), "
+                                      "for example ['filesystem', 'program_options', 'system']; "
+                                      "None implies building all libraries", CUSTOM],
+            'single_pass_install': [False, "Build and install Boost with a single 'b2 install' command "
+                                           "(in install step)", CUSTOM],
+            'compile_time_summary': [False, "Report compile time per Boost library, "
+                                            "based on build log in XML format produced by b2", CUSTOM],
         }
         return EasyBlock.extra_options(extra_vars)
 
@@ -234,12 +280,21 @@ class EB_Boost(EasyBlock):
         else:
             self.paracmd = ''
 
-        # Add list of default library settings from project-config (created by configure step)
-        # Required because any --with-* or --without-* overwrites this entirely
-        project_config = read_file('project-config.jam')
-        libraries = re.search(r'libraries = (.*) ;', project_config)
-        if libraries:
-            self.bjamoptions += libraries.group(1)
+        boost_libraries = self.cfg['boost_libraries']
+        if boost_libraries:
+            # only build specified subset of Boost libraries, which overrides default library settings
+            boost_libraries = list(boost_libraries)
+            if self.cfg['boost_mpi'] and 'mpi' not in boost_libraries:
+                boost_libraries.append('mpi')
+            self.log.info("Only building subset of Boost libraries: %s", ', '.join(boost_libraries))
+            self.bjamoptions += ''.join(" --with-%s" % lib for lib in boost_libraries)
+        else:
+            # Add list of default library settings from project-config (created by configure step)
+            # Required because any --with-* or --without-* overwrites this entirely
+            project_config = read_file('project-config.jam')
+            libraries = re.search(r'libraries = (.*) ;', project_config)
+            if libraries:
+                self.bjamoptions += libraries.group(1)
 
         if self.cfg['only_python_bindings']:
             # magic incantation to only install Boost Python bindings is... --with-python
@@ -270,38 +325,82 @@ class EB_Boost(EasyBlock):
 
         self.bjamoptions += " threading=" + threading + " --layout=" + layout
 
-        if not self.cfg['boost_mpi'] and not self.cfg['only_python_bindings']:
+        if not self.cfg['boost_mpi'] and not self.cfg['only_python_bindings'] and not boost_libraries:
             # Default but avoids a warning. Building Boost.MPI is actually enabled by `using mpi` in the user-config
             # Note: Can't use both --with-* and --without-*
             self.bjamoptions += " --without-mpi"
 
+        if self.cfg['single_pass_install']:
+            self.log.info("Boost libraries will be built and installed in a single pass in install step")
+            return
+
         self.log.info("Building Boost libraries")
         # build with specified options
         cmd = ' '.join([
             self.cfg['prebuildopts'],
             os.path.join('.', self.bjamcmd),
             self.bjamoptions,
+            self.b2_xml_log_opt('build'),
             self.paracmd,
             self.cfg['buildopts'],
         ])
         run_shell_cmd(cmd)
 
+    def b2_xml_log_opt(self, step):
+        """Return option for b2 to produce build log in XML format for specified step (if required)."""
+        opt = ''
+        if self.cfg['compile_time_summary']:
+            opt = '--out-xml=%s' % os.path.join(self.builddir, 'b2-%s-log.xml' % step)
+        return opt
+
+    def report_compile_times(self, top=10):
+        """Report compile time per Boost library, based on build logs in XML format produced by b2."""
+        times = {}
+        for xml_log in glob.glob(os.path.join(self.builddir, 'b2-*-log.xml')):
+            try:
+                for lib, (lib_time, lib_cnt) in parse_b2_xml_log(xml_log).items():
+                    prev_time, prev_cnt = times.get(lib, (0, 0))
+                    times[lib] = (prev_time + lib_time, prev_cnt + lib_cnt)
+            except ElementTree.ParseError as err:
+                self.log.warning("Failed to parse build log in XML format %s: %s", xml_log, err)
+
+        if times:
+            total = sum(t for t, _ in times.values())
+            lines = ["%-20s %10.1fs %6.1f%% (%d actions)" % (lib, lib_time, 100 * lib_time / (total or 1), lib_cnt)
+                     for lib, (lib_time, lib_cnt) in sorted(times.items(), key=lambda x: -x[1][0])]
+            self.log.info("Compile time (CPU time) per Boost library, total %.1fs:\n%s", total, '\n'.join(lines))
+            top_libs = ', '.join('%s (%.0fs)' % (lib, times[lib][0]) for lib in
+                                 sorted(times, key=lambda x: -times[x][0])[:top])
+            print_msg("libraries that took longest to build: %s" % top_libs, log=self.log)
+        else:
+            self.log.warning("No compile times found in build logs in XML format produced by b2")
+
     def install_step(self):
         """Install Boost by copying files to install dir."""
 
         # install boost libraries
-        self.log.info("Installing Boost libraries")
+        if self.cfg['single_pass_install']:
+            self.log.info("Building and installing Boost libraries")
+            preinstallopts = ' '.join([self.cfg['prebuildopts'], self.cfg['preinstallopts']])
+            installopts = ' '.join([self.cfg['buildopts'], self.cfg['installopts']])
+        else:
+            self.log.info("Installing Boost libraries")
+            preinstallopts, installopts = self.cfg['preinstallopts'], self.cfg['installopts']
 
         cmd = ' '.join([
-            self.cfg['preinstallopts'],
+            preinstallopts,
             os.path.join('.', self.bjamcmd),
             self.bjamoptions,
             'install',
+            self.b2_xml_log_opt('install'),
             self.paracmd,
-            self.cfg['installopts'],
+            installopts,
         ])
         run_shell_cmd(cmd)
 
+        if self.cfg['compile_time_summary']:
+            self.report_compile_times()
+
         if self.cfg['tagged_layout']:
             if LooseVersion(self.version) >= LooseVersion("1.69.0") or not self.cfg['single_threaded']:
                 # Link tagged multi threaded libs as the default libs
@@ -347,6 +446,18 @@ class EB_Boost(EasyBlock):
                     custom_paths['files'].append(
                         os.path.join('lib', 'libboost_python%s%s.%s' % (suffix, lib_mt_suffix, shlib_ext)))
 
+        elif self.cfg['boost_libraries']:
+            # only check for libraries that were built
+            boost_libraries = list(self.cfg['boost_libraries'])
+            if self.cfg['boost_mpi'] and 'mpi' not in boost_libraries:
+                boost_libraries.append('mpi')
+            for lib in boost_libraries:
+                lib = BOOST_LIBRARY_FILES.get(lib, lib)
+                if lib:
+                    custom_paths['files'].append(os.path.join('lib', 'libboost_%s.%s' % (lib, shlib_ext)))
+                    if self.cfg['tagged_layout']:
+                        lib_fn = 'libboost_%s%s.%s' % (lib, lib_mt_suffix, shlib_ext)
+                        custom_paths['files'].append(os.path.join('lib', lib_fn))
         else:
             custom_paths['files'].append(os.path.join('lib', 'libboost_system.%s' % shlib_ext))
 
@@ -34,8 +34,12 @@ Ref: https://speakerdeck.com/ajdecon/introduction-to-the-cuda-toolkit-for-buildi
 @author: Ward Poelmans (Free University of Brussels)
 @author: Robert Mijakovic (LuxProvide S.A.)
 """
+import errno
+import fnmatch
+import json
 import os
 import re
+import shutil
 import stat
 from glob import glob
 
@@ -45,8 +49,9 @@ from easybuild.framework.easyconfig import CUSTOM
 from easybuild.tools import LooseVersion
 from easybuild.tools.build_log import EasyBuildError
 from easybuild.tools.config import IGNORE
-from easybuild.tools.filetools import adjust_permissions, change_dir, copy_dir, expand_glob_paths
-from easybuild.tools.filetools import patch_perl_script_autoflush, remove_file, symlink, which, write_file
+from easybuild.tools.filetools import adjust_permissions, change_dir, copy_dir, copy_file, expand_glob_paths
+from easybuild.tools.filetools import mkdir, patch_perl_script_autoflush, read_file, remove_file, symlink, which
+from easybuild.tools.filetools import write_file
 from easybuild.tools.run import run_shell_cmd
 from easybuild.tools.systemtools import AARCH64, POWER, X86_64, get_cpu_architecture, get_shared_lib_ext
 
@@ -61,6 +66,69 @@ else
         exit $?
 fi """
 
+# manifest of components included in CUDA installer (CUDA >= 11), relative to directory it was extracted to;
+# files for each component are in a subdirectory of 'builds' with the same name as the component,
+# using the same layout as the installation prefix
+CUDA_COMPONENTS_MANIFEST = os.path.join('builds', 'version.json')
+CUDA_COMPONENTS_INSTALL_METHODS = ('move', 'hardlink')
+
+
+def read_cuda_components_manifest(path):
+    """
+    Read manifest of components included in CUDA installer.
+
+    :return: dict with version for each component
+    """
+    try:
+        manifest = json.loads(read_file(path))
+    except ValueError as err:
+        raise EasyBuildError("Failed to parse manifest of CUDA components %s: %s", path, err)
+    return {name: info.get('version') for name, info in manifest.items() if isinstance(info, dict)}
+
+
+def select_cuda_components(components, include, exclude=None):
+    """
+    Select components that match any of the specified patterns to include, and none of the patterns to exclude.
+    """
+    return [comp for comp in components if any(fnmatch.fnmatch(comp, pat) for pat in include) and
+            not any(fnmatch.fnmatch(comp, pat) for pat in exclude or [])]
+
+
+def merge_tree(src_dir, target_dir, method='move'):
+    """
+    Merge contents of specified source directory into target directory, by moving or hardlinking files.
+    Symbolic links are recreated, existing files in target directory are replaced.
+    Files are copied instead if source and target directory are on different filesystems.
+
+    :return: number of files that were installed
+    """
+    if method not in CUDA_COMPONENTS_INSTALL_METHODS:
+        raise EasyBuildError("Unknown method to merge directories: %s (known: %s)",
+                             method, ', '.join(CUDA_COMPONENTS_INSTALL_METHODS))
+    cnt = 0
+    for dirpath, dirnames, filenames in os.walk(src_dir):
+        target_subdir = os.path.join(target_dir, os.path.relpath(dirpath, src_dir))
+        mkdir(target_subdir, parents=True)
+        # symlinks to directories are listed in dirnames, but should be handled like other symlinks
+        for name in [d for d in dirnames if os.path.islink(os.path.join(dirpath, d))] + filenames:
+            src, target = os.path.join(dirpath, name), os.path.join(target_subdir, name)
+            # existing files and symlinks (also to directories) are replaced, existing directories are not
+            if os.path.lexists(target) and (os.path.islink(target) or not os.path.isdir(target)):
+                os.remove(target)
+            try:
+                if os.path.islink(src):
+                    os.symlink(os.readlink(src), target)
+                elif method == 'move':
+                    os.rename(src, target)
+                else:
+                    os.link(src, target)
+            except OSError as err:
+                if err.errno != errno.EXDEV:
+                    raise EasyBuildError("Failed to install %s to %s: %s", src, target, err)
+                shutil.copy2(src, target)
+            cnt += 1
+    return cnt
+
 
 class EB_CUDA(Binary):
     """
@@ -71,7 +139,14 @@ class EB_CUDA(Binary):
     def extra_options():
         """Create a set of wrappers based on a list determined by the easyconfig file"""
         extra_vars = {
-            'host_compilers': [None, "Host compilers for which a wrapper will be generated", CUSTOM]
+            'host_compilers': [None, "Host compilers for which a wrapper will be generated", CUSTOM],
+            'cuda_components': [None, "Patterns for components to install (cfr. %s in extracted installer), "
+                                      "by moving/hardlinking files rather than running the CUDA installer "
+                                      "(None implies using the installer)" % CUDA_COMPONENTS_MANIFEST, CUSTOM],
+            'cuda_components_exclude': [[], "Patterns for components to skip when 'cuda_components' is used, "
+                                            "for example 'nsight_*'", CUSTOM],
+            'cuda_components_install_method': ['move', "How to install files of components when 'cuda_components' "
+                                                       "is used ('move' or 'hardlink')", CUSTOM],
         }
         return Binary.extra_options(extra_vars)
 
@@ -130,9 +205,61 @@ class EB_CUDA(Binary):
         run_shell_cmd("/bin/sh " + execpath + " --noexec --nox11 --target " + self.builddir)
         self.src[0]['finalpath'] = self.builddir
 
+    def select_components(self, components):
+        """
+        Select CUDA components to install from specified list of components,
+        according to 'cuda_components' and 'cuda_components_exclude' easyconfig parameters.
+        """
+        include, exclude = self.cfg['cuda_components'], self.cfg['cuda_components_exclude']
+        if isinstance(include, str):
+            include = [include]
+        if isinstance(exclude, str):
+            exclude = [exclude]
+        return select_cuda_components(components, include, exclude=exclude)
+
+    def install_components(self):
+        """
+        Install selected components from extracted CUDA installer, by moving/hardlinking files into installation
+        directory, which avoids copying files (again) and installing components that are not needed.
+        """
+        manifest = os.path.join(self.builddir, CUDA_COMPONENTS_MANIFEST)
+        if not os.path.exists(manifest):
+            raise EasyBuildError("Manifest of CUDA components %s not found, installing only selected components "
+                                 "requires CUDA 11.0 or newer", manifest)
+        components = read_cuda_components_manifest(manifest)
+        components = [comp for comp in components if os.path.isdir(os.path.join(self.builddir, 'builds', comp))]
+        selected = self.select_components(components)
+        self.log.info("Installing selected CUDA components: %s (skipping: %s)", ', '.join(selected),
+                      ', '.join(x for x in components if x not in selected))
+        if not selected:
+            raise EasyBuildError("No CUDA components selected to install, available: %s", ', '.join(components))
+
+        method = self.cfg['cuda_components_install_method']
+        for comp in selected:
+            cnt = merge_tree(os.path.join(self.builddir, 'builds', comp), self.installdir, method=method)
+            self.log.info("Installed %d files for CUDA component %s (method: %s)", cnt, comp, method)
+
+        copy_file(manifest, os.path.join(self.installdir, 'version.json'))
+
+        # headers and libraries are installed in targets/<arch>-linux, which are symlinked by the CUDA installer
+        targets = glob(os.path.join(self.installdir, 'targets', '*-linux'))
+        if len(targets) == 1:
+            for link_name, subdir in (('include', 'include'), ('lib64', 'lib')):
+                link_path = os.path.join(self.installdir, link_name)
+                if os.path.isdir(os.path.join(targets[0], subdir)) and not os.path.lexists(link_path):
+                    symlink(os.path.relpath(os.path.join(targets[0], subdir), self.installdir), link_path,
+                            use_abspath_source=False)
+        else:
+            self.log.warning("Expected a single targets/*-linux directory in %s, found: %s", self.installdir, targets)
+
     def install_step(self):
         """Install CUDA using Perl install script."""
 
+        if self.cfg['cuda_components']:
+            self.install_components()
+            self.install_cuda_patches()
+            return
+
         # define how to run the installer
         # script has /usr/bin/perl hardcoded, but we want to have control over which perl is being used
         if LooseVersion(self.version) <= LooseVersion("5"):
@@ -234,6 +361,10 @@ class EB_CUDA(Binary):
         # Remove the cuda-installer log file
         remove_file('/tmp/cuda-installer.log')
 
+        self.install_cuda_patches()
+
+    def install_cuda_patches(self):
+        """Install patches for CUDA (provided as additional sources)."""
         # check if there are patches to apply
         if len(self.src) > 1:
             for patch in self.src[1:]:
@@ -340,7 +471,9 @@ class EB_CUDA(Binary):
 
         # Samples moved to https://github.com/nvidia/cuda-samples
         if LooseVersion(self.version) > LooseVersion('5') and LooseVersion(self.version) < LooseVersion('11.6'):
-            custom_paths['files'].append(os.path.join('samples', 'Makefile'))
+            # samples are not installed if only selected components are installed, and samples are not included
+            if not self.cfg['cuda_components'] or self.select_components(['cuda_samples']):
+                custom_paths['files'].append(os.path.join('samples', 'Makefile'))
         if LooseVersion(self.version) < LooseVersion('7'):
             custom_paths['files'].append(os.path.join('open64', 'bin', 'nvopencc'))
         if LooseVersion(self.version) >= LooseVersion('7'):
@@ -35,9 +35,13 @@ EasyBuild support for installing a bundle of modules, implemented as a generic e
 """
 import copy
 import os
+from functools import partial
 from datetime import datetime
 
 import easybuild.tools.environment as env
+from easybuild.easyblocks.generic.extensionhelpers import exts_install_history_extra_options
+from easybuild.easyblocks.generic.extensionhelpers import install_exts_parallel_with_history
+from easybuild.easyblocks.generic.extensionhelpers import stop_exts_make_jobserver
 from easybuild.framework.easyblock import EasyBlock
 from easybuild.framework.easyconfig import CUSTOM
 from easybuild.framework.easyconfig.default import get_easyconfig_parameter_default
@@ -79,6 +83,7 @@ class Bundle(EasyBlock):
             'sanity_check_all_components': [False, "Enable sanity checks for all components", CUSTOM],
             'default_easyblock': [None, "Default easyblock to use for components", CUSTOM],
         })
+        extra_vars.update(exts_install_history_extra_options())
         return EasyBlock.extra_options(extra_vars)
 
     def __init__(self, *args, **kwargs):
@@ -305,6 +310,21 @@ class Bundle(EasyBlock):
         """Do nothing."""
         pass
 
+    def extensions_step(self, *args, **kwargs):
+        """
+        Install extensions, with a GNU make jobserver that can be shared across extensions installed in parallel,
+        which is stopped at the end of this step.
+        """
+        self.exts_make_jobserver = None
+        try:
+            super().extensions_step(*args, **kwargs)
+        finally:
+            stop_exts_make_jobserver(self)
+
+    def install_extensions_parallel(self, *args, **kwargs):
+        """Install extensions in parallel, starting with the extensions on the critical path."""
+        install_exts_parallel_with_history(self, partial(super().install_extensions_parallel, *args, **kwargs))
+
     def _install_component(self, comp):
         """Run the installation steps for a single component"""
         # run relevant steps
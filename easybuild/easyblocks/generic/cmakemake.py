@@ -34,15 +34,20 @@ EasyBuild support for software that is configured with CMake, implemented as an
 @author: Maxime Boissonneault (Compute Canada - Universite Laval)
 """
 import glob
+import json
 import re
 import os
+import xml.etree.ElementTree as ElementTree
+from collections import namedtuple
+
 from easybuild.tools import LooseVersion
 
 from easybuild.easyblocks.generic.configuremake import ConfigureMake
 from easybuild.framework.easyconfig import BUILD, CUSTOM
 from easybuild.tools.build_log import EasyBuildError, print_warning
-from easybuild.tools.config import build_option
-from easybuild.tools.filetools import change_dir, create_unused_dir, mkdir, read_file, which
+from easybuild.tools.config import build_option, ERROR, IGNORE, WARN
+from easybuild.tools.filetools import change_dir, create_unused_dir, mkdir, read_file, remove_file, which
+from easybuild.tools.filetools import write_file
 from easybuild.tools.environment import setvar
 from easybuild.tools.modules import get_software_root, get_software_version
 from easybuild.tools.run import run_shell_cmd
@@ -53,6 +58,23 @@ import easybuild.tools.toolchain as toolchain
 
 DEFAULT_CONFIGURE_CMD = 'cmake'
 
+CMAKE_CACHE_FILE = 'CMakeCache.txt'
+# entries in CMakeCache.txt are of the form KEY:TYPE=VALUE, type is optional, key may be quoted
+CMAKE_CACHE_ENTRY_REGEX = re.compile(r'^(?P<key>"[^"]*"|[^:=]+)(?::(?P<type>[A-Z_]+))?=(?P<value>.*)$')
+# values that CMake interprets as false in a boolean context (case-insensitive), next to *-NOTFOUND
+CMAKE_FALSE_EXPRESSIONS = {'', '0', 'OFF', 'NO', 'FALSE', 'N', 'IGNORE', 'NOTFOUND'}
+# entries in CMake cache for libraries and header directories found by CMake
+CMAKE_CACHE_DEP_PATH_REGEX = re.compile(r'.*_(LIBRARY|LIBRARIES|INCLUDE_DIR|INCLUDE_DIRS)(_[A-Z]+)?$')
+
+CMakeCacheEntry = namedtuple('CMakeCacheEntry', ('type', 'value'))
+
+CTEST_JUNIT_FILE = 'ctest-junit.xml'
+CTEST_RESOURCE_SPEC_FILE = 'ctest-resource-spec.json'
+CTestResult = namedtuple('CTestResult', ('name', 'status', 'time'))
+
+# parsed CMake cache files, indexed by path; value is tuple of (mtime, size) of the file and its entries
+_cmake_cache_files = {}
+
 
 def det_cmake_version():
     """
@@ -75,6 +97,94 @@ def det_cmake_version():
     return cmake_version
 
 
+def is_cmake_false(value):
+    """Check whether specified value is considered false by CMake."""
+    value = value.strip()
+    return value.upper() in CMAKE_FALSE_EXPRESSIONS or value.endswith('-NOTFOUND')
+
+
+def parse_cmake_cache(txt):
+    """
+    Parse contents of a CMakeCache.txt file.
+
+    :return: dict with CMakeCacheEntry (type, value) tuples for each key
+    """
+    entries = {}
+    for line in txt.splitlines():
+        if not line or line.startswith('#') or line.startswith('//'):
+            continue
+        res = CMAKE_CACHE_ENTRY_REGEX.match(line)
+        if res:
+            key = res.group('key').strip('"')
+            entries[key] = CMakeCacheEntry(res.group('type'), res.group('value'))
+    return entries
+
+
+def get_cmake_cache(builddir):
+    """
+    Get parsed contents of CMakeCache.txt in specified build directory.
+    Parsed results are cached, and only re-read when the file was modified.
+
+    :return: dict with CMakeCacheEntry (type, value) tuples for each key, or None if there is no CMake cache file
+    """
+    path = os.path.realpath(os.path.join(builddir, CMAKE_CACHE_FILE))
+    try:
+        st = os.stat(path)
+    except OSError:
+        _cmake_cache_files.pop(path, None)
+        return None
+
+    stamp = (st.st_mtime_ns, st.st_size)
+    cached = _cmake_cache_files.get(path)
+    if cached is None or cached[0] != stamp:
+        cached = (stamp, parse_cmake_cache(read_file(path)))
+        _cmake_cache_files[path] = cached
+
+    return cached[1]
+
+
+def parse_ctest_junit(path):
+    """
+    Parse JUnit XML file produced by CTest (via --output-junit).
+
+    :return: list of CTestResult (name, status, time) tuples, with status one of 'passed', 'failed' or 'skipped'
+    """
+    results = []
+    try:
+        root = ElementTree.fromstring(read_file(path))
+    except ElementTree.ParseError as err:
+        raise EasyBuildError("Failed to parse CTest JUnit output in %s: %s", path, err)
+
+    for testcase in root.iter('testcase'):
+        status = testcase.get('status', 'run')
+        if testcase.find('failure') is not None or testcase.find('error') is not None or status == 'fail':
+            status = 'failed'
+        elif testcase.find('skipped') is not None or status in ('notrun', 'disabled'):
+            status = 'skipped'
+        else:
+            status = 'passed'
+        try:
+            time = float(testcase.get('time', 0))
+        except ValueError:
+            time = 0.0
+        results.append(CTestResult(testcase.get('name'), status, time))
+
+    return results
+
+
+def make_ctest_resource_spec(resources):
+    """
+    Compose CTest resource specification (JSON) for specified resources.
+
+    :param resources: dict with number of available slots for each type of resource, e.g. {'mpi': 8}
+    """
+    spec = {
+        'version': {'major': 1, 'minor': 0},
+        'local': [{name: [{'id': '0', 'slots': int(slots)}] for name, slots in sorted(resources.items())}],
+    }
+    return json.dumps(spec, indent=2)
+
+
 def setup_cmake_env(tc):
     """Setup env variables that cmake needs in an EasyBuild context."""
 
@@ -148,10 +258,20 @@ class CMakeMake(ConfigureMake):
                                           "(even if Boost is included as a dependency)", CUSTOM],
             'build_shared_libs': [None, "Build shared library (instead of static library)"
                                         "None can be used to add no flag (usually results in static library)", CUSTOM],
+            'check_cmake_dep_paths': [IGNORE, "Action to take when libraries or header directories found by CMake "
+                                              "are located outside of installation prefix of dependencies: "
+                                              "'%s', '%s' or '%s' (only log them)" % (ERROR, WARN, IGNORE), CUSTOM],
             'build_type': [None, "Build type for CMake, e.g. Release."
                                  "Defaults to 'Release', 'RelWithDebInfo' or 'Debug' depending on "
                                  "toolchainopts[debug,noopt]", CUSTOM],
             'configure_cmd': [DEFAULT_CONFIGURE_CMD, "Configure command to use", CUSTOM],
+            'ctest_exclude_tests': [[], "List of names (regular expressions) of tests to exclude when running "
+                                        "tests with CTest (runtest = True)", CUSTOM],
+            'ctest_max_parallel': [None, "Maximum number of tests to run in parallel with CTest (runtest = True), "
+                                         "in addition to limit imposed by 'parallel'", CUSTOM],
+            'ctest_resources': [None, "Resources available to tests run with CTest (runtest = True): either path "
+                                      "to resource specification file, or dict with number of slots per resource, "
+                                      "e.g. {'mpi': 8}", CUSTOM],
             'generator': [None, "Build file generator to use. None to use CMakes default", CUSTOM],
             'install_target_subdir': [None, "Subdirectory to use as installation target", CUSTOM],
             'install_libdir': ['lib', "Subdirectory to use for library installation files", CUSTOM],
@@ -392,6 +512,12 @@ class CMakeMake(ConfigureMake):
                                      'cuda_compute_capabilities easyconfig parameter or via '
                                      '--cuda-compute-capabilities')
 
+        # route compilations through compiler cache, if desired
+        launcher = self.prepare_compiler_launcher()
+        if launcher:
+            for lang in ['C', 'CXX', 'Fortran'] + (['CUDA'] if cuda_root else []):
+                options['CMAKE_%s_COMPILER_LAUNCHER' % lang] = launcher
+
         if not self.cfg.get('allow_system_boost', False):
             boost_root = get_software_root('Boost')
             if boost_root:
@@ -428,16 +554,25 @@ class CMakeMake(ConfigureMake):
 
         res = run_shell_cmd(command, fail_on_error=fail_on_error)
         self.check_python_paths()
+        self.check_cmake_dep_paths()
 
         return res if return_full_cmd_result else res.output
 
+    def get_cmake_cache(self, builddir=None):
+        """
+        Get parsed contents of CMake cache (CMakeCache.txt) in specified build directory (current directory if None).
+
+        :return: dict with CMakeCacheEntry (type, value) tuples for each key, or None if there is no CMake cache
+        """
+        return get_cmake_cache(builddir or os.getcwd())
+
     def check_python_paths(self):
         """Check that there are no detected Python paths outside the Python dependency provided by EasyBuild"""
-        cache_file_path = os.path.join(os.getcwd(), 'CMakeCache.txt')
-        if not os.path.exists(cache_file_path):
+        cache_file_path = os.path.join(os.getcwd(), CMAKE_CACHE_FILE)
+        cmake_cache = self.get_cmake_cache()
+        if cmake_cache is None:
             self.log.warning(f"{cache_file_path} not found. Python paths checks skipped.")
             return
-        cmake_cache = read_file(cache_file_path)
         if not cmake_cache:
             self.log.warning(f"CMake Cache ({cache_file_path}) could not be read. Python paths checks skipped.")
             return
@@ -449,16 +584,14 @@ class CMakeMake(ConfigureMake):
             "include_dir": [],
             "library": [],
         }
-        python_regex = re.compile(r"_?(Python|PYTHON)\d?_"
-                                  r"(?P<type>EXECUTABLE|INCLUDE_DIR|LIBRARY)\w*(:\w+)?\s*=(?P<value>.*)")
-        cmake_false_expressions = {'', '0', 'OFF', 'NO', 'FALSE', 'N', 'IGNORE', 'NOTFOUND'}
-        for line in cmake_cache.splitlines():
-            match = python_regex.match(line)
+        python_regex = re.compile(r"_?(Python|PYTHON)\d?_(?P<type>EXECUTABLE|INCLUDE_DIR|LIBRARY)\w*$")
+        for key, entry in cmake_cache.items():
+            match = python_regex.match(key)
             if match:
-                self.log.debug("Python related CMake cache line found: " + line)
+                self.log.debug("Python related CMake cache entry found: %s=%s", key, entry.value)
                 path_type = match['type'].lower()
-                path = match['value'].strip()
-                if path.endswith('-NOTFOUND') or path.upper() in cmake_false_expressions:
+                path = entry.value.strip()
+                if is_cmake_false(path):
                     continue
                 self.log.info("Python %s path: %s", path_type, path)
                 python_paths[path_type].append(path)
@@ -490,16 +623,121 @@ class CMakeMake(ConfigureMake):
                                  "to pick up the Python provided by EasyBuild.")
         self.log.info("Check for Python paths in CMake cache successful")
 
+    def check_cmake_dep_paths(self):
+        """
+        Check whether libraries and header directories found by CMake (*_LIBRARY and *_INCLUDE_DIR entries
+        in CMake cache) are located in the installation prefix of one of the (loaded) dependencies.
+        """
+        action = self.cfg.get('check_cmake_dep_paths') or IGNORE
+        if action not in (ERROR, WARN, IGNORE):
+            raise EasyBuildError("Invalid value for 'check_cmake_dep_paths': %s. Must be one of: %s",
+                                 action, ', '.join((ERROR, WARN, IGNORE)))
+
+        cmake_cache = self.get_cmake_cache()
+        if not cmake_cache:
+            self.log.info("No CMake cache found, not checking paths to dependencies found by CMake")
+            return
+
+        # installation prefixes of all loaded modules that were installed with EasyBuild,
+        # which includes the toolchain components and the dependencies
+        allowed_prefixes = [os.environ[var] for var in os.environ if var.startswith('EBROOT')]
+        allowed_prefixes.extend([self.installdir, self.builddir])
+        sysroot = build_option('sysroot')
+        if sysroot:
+            allowed_prefixes.append(sysroot)
+        allowed_prefixes = [os.path.realpath(p) for p in allowed_prefixes if p]
+
+        outside_paths = []
+        for key, entry in sorted(cmake_cache.items()):
+            if entry.type == 'INTERNAL' or not CMAKE_CACHE_DEP_PATH_REGEX.match(key):
+                continue
+            for path in entry.value.split(';'):
+                # skip values that are not absolute paths, like library names or linker flags
+                if is_cmake_false(path) or not os.path.isabs(path):
+                    continue
+                real_path = os.path.realpath(path)
+                if not any(real_path == p or real_path.startswith(p + os.path.sep) for p in allowed_prefixes):
+                    outside_paths.append("%s: %s" % (key, path))
+
+        if outside_paths:
+            msg = "Paths found by CMake that are not located in a dependency provided by EasyBuild:\n"
+            msg += '\n'.join(outside_paths)
+            if action == ERROR:
+                raise EasyBuildError(msg)
+            elif action == WARN:
+                print_warning(msg)
+            else:
+                self.log.info(msg)
+        else:
+            self.log.info("All libraries and header directories found by CMake are provided by dependencies")
+
+    def ctest_cmd(self):
+        """Compose CTest command to run tests with when 'runtest' is set to True."""
+        test_cmd = ['ctest']
+        cmake_version = LooseVersion(self.cmake_version)
+        if cmake_version >= '3.17.0':
+            test_cmd.append('--no-tests=error')
+
+        parallel = self.cfg.parallel
+        max_parallel = self.cfg.get('ctest_max_parallel')
+        if max_parallel:
+            parallel = min(parallel, int(max_parallel))
+        test_cmd.append('--parallel %d' % parallel)
+
+        resources = self.cfg.get('ctest_resources')
+        if resources:
+            if cmake_version < '3.16':
+                raise EasyBuildError("Resource specification for CTest requires CMake 3.16 or newer")
+            if isinstance(resources, dict):
+                resource_spec_file = os.path.join(self.builddir, CTEST_RESOURCE_SPEC_FILE)
+                write_file(resource_spec_file, make_ctest_resource_spec(resources))
+            else:
+                resource_spec_file = resources
+            test_cmd.append('--resource-spec-file %s' % resource_spec_file)
+
+        exclude_tests = self.cfg.get('ctest_exclude_tests')
+        if exclude_tests:
+            test_cmd.append("--exclude-regex '%s'" % '|'.join('(%s)' % name for name in exclude_tests))
+
+        if cmake_version >= '3.21':
+            test_cmd.append('--output-junit %s' % os.path.join(self.builddir, CTEST_JUNIT_FILE))
+
+        return ' '.join(test_cmd)
+
+    def report_ctest_results(self, junit_file, top=10):
+        """Log summary of results of tests run with CTest, as reported in specified JUnit XML file."""
+        results = parse_ctest_junit(junit_file)
+        counts = {status: len([r for r in results if r.status == status]) for status in ('passed', 'failed', 'skipped')}
+        self.log.info("CTest results: %d tests, %d passed, %d failed, %d skipped (total test time: %.1fs)",
+                      len(results), counts['passed'], counts['failed'], counts['skipped'],
+                      sum(r.time for r in results))
+        slowest = sorted(results, key=lambda r: r.time, reverse=True)[:top]
+        slowest = ['%10.2fs  %s (%s)' % (r.time, r.name, r.status) for r in slowest]
+        self.log.info("Slowest tests:\n%s", '\n'.join(slowest))
+        failed = [r.name for r in results if r.status == 'failed']
+        if failed:
+            self.log.warning("Failed tests: %s", ', '.join(failed))
+        return results
+
     def test_step(self):
         """CMake specific test setup"""
         # When using ctest for tests (default) then show verbose output if a test fails
         setvar('CTEST_OUTPUT_ON_FAILURE', 'True')
         # Handle `runtest = True` if `test_cmd` has not been set
         if self.cfg.get('runtest') is True and not self.cfg.get('test_cmd'):
-            test_cmd = 'ctest'
-            if LooseVersion(self.cmake_version) >= '3.17.0':
-                test_cmd += ' --no-tests=error'
+            test_cmd = self.ctest_cmd()
             self.log.debug("`runtest = True` found, using '%s' as test_cmd", test_cmd)
             self.cfg['test_cmd'] = test_cmd
 
-        super().test_step()
+        junit_file = os.path.join(self.builddir, CTEST_JUNIT_FILE)
+        if junit_file in (self.cfg.get('test_cmd') or ''):
+            remove_file(junit_file)
+        else:
+            junit_file = None
+
+        try:
+            super().test_step()
+        finally:
+            # also report on test results when tests failed
+            if junit_file and os.path.exists(junit_file):
+                self.report_ctest_results(junit_file)
@@ -60,7 +60,9 @@ class CMakeNinja(CMakeMake, MesonNinja):
 
     def build_step(self, *args, **kwargs):
         """Build using MesonNinja."""
-        return MesonNinja.build_step(self, *args, **kwargs)
+        res = MesonNinja.build_step(self, *args, **kwargs)
+        self.report_compiler_launcher_stats()
+        return res
 
     def install_step(self, *args, **kwargs):
         """Install using MesonNinja."""
@@ -36,9 +36,12 @@ i.e. configure/make/make install, implemented as an easyblock.
 @author: Alan O'Cais (Juelich Supercomputing Centre)
 @author: Sebastian Achilles (Juelich Supercomputing Centre)
 """
+import hashlib
+import json
 import os
 import re
 import stat
+import tempfile
 from datetime import datetime
 
 from easybuild.base import fancylogger
@@ -48,7 +51,8 @@ from easybuild.framework.easyconfig import CUSTOM
 from easybuild.tools.build_log import print_warning, EasyBuildError
 from easybuild.tools.config import source_paths, build_option, ERROR, IGNORE, WARN
 from easybuild.tools.filetools import CHECKSUM_TYPE_SHA256, adjust_permissions, compute_checksum, download_file
-from easybuild.tools.filetools import read_file, remove_file
+from easybuild.tools.environment import setvar
+from easybuild.tools.filetools import mkdir, read_file, remove_file, which, write_file
 from easybuild.tools.run import run_shell_cmd
 from easybuild.tools.utilities import nub
 
@@ -70,6 +74,28 @@ DEFAULT_CONFIGURE_CMD = './configure'
 DEFAULT_INSTALL_CMD = 'make install'
 DEFAULT_TEST_CMD = 'make'
 
+# supported compiler caches that can be used as compiler launcher,
+# with environment variables to specify cache directory and maximum cache size
+CCACHE = 'ccache'
+SCCACHE = 'sccache'
+COMPILER_LAUNCHERS = {
+    CCACHE: ('CCACHE_DIR', 'CCACHE_MAXSIZE'),
+    SCCACHE: ('SCCACHE_DIR', 'SCCACHE_CACHE_SIZE'),
+}
+# environment variables specifying compiler commands that are wrapped with compiler launcher
+COMPILER_LAUNCHER_ENV_VARS = ['CC', 'CXX', 'F77', 'F90', 'FC']
+
+# environment variables that determine results of configure checks,
+# a separate configure cache file is used for each unique combination of values
+CONFIG_CACHE_KEY_ENV_VARS = ['CC', 'CXX', 'CPP', 'F77', 'F90', 'FC', 'CFLAGS', 'CXXFLAGS', 'CPPFLAGS', 'FFLAGS',
+                             'FCFLAGS', 'F90FLAGS', 'LDFLAGS', 'LIBS']
+# variable assignments in (pre)configure options (like CC=gcc or CFLAGS='-O2 -g'),
+# which are also taken into account to determine which configure cache file is used
+CONFIG_CACHE_KEY_VAR_REGEX = re.compile(r'''(?:^|\s)(?P<assignment>[A-Za-z_][A-Za-z0-9_]*=(?:'[^']*'|"[^"]*"|\S)*)''')
+CONFIG_CACHE_ENTRY_REGEX = re.compile(r'^(?P<var>[A-Za-z_][A-Za-z0-9_]*)=')
+# names of cache variables, like ac_cv_sizeof_long_double or ax_cv_c_flags__msse2
+CONFIG_CACHE_VAR_REGEX = re.compile(r'^[A-Za-z0-9]+_cv_[A-Za-z0-9_]+$')
+
 
 def check_config_guess(config_guess):
     """Check timestamp & SHA256 checksum of config.guess script.
@@ -168,6 +194,123 @@ def obtain_config_guess(download_source_path=None, search_source_paths=None):
     return config_guess_path
 
 
+def det_config_cache_key(*opts):
+    """
+    Determine key for configure cache file, based on the values of environment variables that determine
+    the results of configure checks, and on the variables that are set via the specified configure options.
+
+    :param opts: strings with (pre)configure options
+    :return: string with key to use in name of configure cache file
+    """
+    key = ['%s=%s' % (var, os.getenv(var, '')) for var in CONFIG_CACHE_KEY_ENV_VARS]
+    for opts_str in opts:
+        key.extend(m.group('assignment') for m in CONFIG_CACHE_KEY_VAR_REGEX.finditer(opts_str or ''))
+    return hashlib.sha256('\n'.join(key).encode('utf-8')).hexdigest()[:16]
+
+
+def det_config_cache_excludes(configopts_variants):
+    """
+    Determine patterns for entries in configure cache that are specific to one of the specified variants
+    of configure options, i.e. cache variables (like ac_cv_prog_f77_v) that are set via configure options
+    with a value that is not the same in all variants.
+
+    Entries affected by --enable-*/--with-* options can not be determined reliably based on the name of the option,
+    so they have to be listed explicitly via the 'configure_cache_exclude' easyconfig parameter.
+
+    :param configopts_variants: list of strings with configure options, one per variant
+    :return: list of regular expressions (strings) for names of configure cache entries to exclude
+    """
+    assignments = []
+    for configopts in configopts_variants:
+        assignments.append({m.group('assignment') for m in CONFIG_CACHE_KEY_VAR_REGEX.finditer(configopts)})
+
+    excludes = []
+    if assignments:
+        # only cache variables that are not set to the same value in all variants are relevant
+        variant_assignments = set.union(*assignments) - set.intersection(*assignments)
+        cache_vars = {assignment.split('=', 1)[0] for assignment in variant_assignments}
+        excludes = [r'^%s$' % re.escape(var) for var in sorted(cache_vars) if CONFIG_CACHE_VAR_REGEX.match(var)]
+    return excludes
+
+
+def filter_config_cache(path, excludes):
+    """
+    Remove entries from configure cache file of which the name matches one of the specified regular expressions.
+
+    :param path: path to configure cache file
+    :param excludes: list of regular expressions (strings) for names of entries to remove
+    :return: list of names of entries that were removed
+    """
+    if not os.path.exists(path):
+        return []
+
+    exclude_regexes = [re.compile(regex) for regex in excludes]
+    lines, removed = [], []
+    keep = True
+    for line in read_file(path).splitlines():
+        entry = CONFIG_CACHE_ENTRY_REGEX.match(line)
+        if entry:
+            var = entry.group('var')
+            keep = not any(regex.match(var) for regex in exclude_regexes)
+            if not keep:
+                removed.append(var)
+        elif line.startswith('#'):
+            keep = True
+        # lines that are not a new entry or comment are continuation lines of a multi-line value
+        if keep:
+            lines.append(line)
+
+    if removed:
+        write_file(path, '\n'.join(lines) + '\n')
+    return removed
+
+
+def parse_compiler_launcher_stats(launcher, output):
+    """
+    Parse statistics reported by compiler cache used as compiler launcher.
+
+    :param launcher: name of compiler launcher (ccache or sccache)
+    :param output: output of 'ccache --print-stats' or 'sccache --show-stats --stats-format=json'
+    :return: tuple with number of cache hits and misses, or None if statistics could not be parsed
+    """
+    res = None
+    if launcher == CCACHE:
+        # machine-readable output, one tab-separated counter per line
+        stats = dict(re.findall(r'^(\w+)\t([0-9]+)$', output, re.M))
+        if 'cache_miss' in stats:
+            hits = int(stats.get('direct_cache_hit', 0)) + int(stats.get('preprocessed_cache_hit', 0))
+            res = (hits, int(stats['cache_miss']))
+    elif launcher == SCCACHE:
+        try:
+            stats = json.loads(output)['stats']
+            res = tuple(sum(stats[key]['counts'].values()) for key in ('cache_hits', 'cache_misses'))
+        except (ValueError, KeyError, TypeError, AttributeError):
+            # fall back to parsing human-readable output of older sccache versions
+            hits = re.search(r'^Cache hits\s+([0-9]+)$', output, re.M)
+            misses = re.search(r'^Cache misses\s+([0-9]+)$', output, re.M)
+            if hits and misses:
+                res = (int(hits.group(1)), int(misses.group(1)))
+    else:
+        raise EasyBuildError("Unknown compiler launcher: %s", launcher)
+    return res
+
+
+def get_compiler_launcher_stats(launcher):
+    """
+    Obtain statistics from compiler cache used as compiler launcher.
+
+    :return: tuple with number of cache hits and misses, or None if statistics could not be determined
+    """
+    if launcher == CCACHE:
+        cmd = 'ccache --print-stats'
+    else:
+        cmd = 'sccache --show-stats --stats-format=json'
+    res = run_shell_cmd(cmd, fail_on_error=False, hidden=True)
+    if res.exit_code:
+        return None
+    return parse_compiler_launcher_stats(launcher, res.output)
+
+
 class ConfigureMake(EasyBlock):
     """
     Support for building and installing applications with configure/make/make install
@@ -181,11 +324,24 @@ class ConfigureMake(EasyBlock):
             'build_cmd': [DEFAULT_BUILD_CMD, "Build command to use", CUSTOM],
             'build_cmd_targets': [DEFAULT_BUILD_TARGET, "Target name (string) or list of target names to build",
                                   CUSTOM],
+            'compiler_launcher': [None, "Compiler cache to use as compiler launcher ('%s'), "
+                                        "None to not use a compiler launcher" % "' or '".join(COMPILER_LAUNCHERS),
+                                  CUSTOM],
+            'compiler_launcher_cache_dir': [None, "Cache directory for compiler launcher "
+                                                  "(default: default location of compiler launcher)", CUSTOM],
+            'compiler_launcher_max_size': [None, "Maximum size of cache of compiler launcher, e.g. '20G'", CUSTOM],
             'build_type': [None, "Value to provide to --build option of configure script, e.g., x86_64-pc-linux-gnu "
                                  "(determined by config.guess shipped with EasyBuild if None,"
                                  " False implies to leave it up to the configure script)", CUSTOM],
             'configure_cmd': [DEFAULT_CONFIGURE_CMD, "Configure command to use", CUSTOM],
             'configure_cmd_prefix': ['', "Prefix to be glued before ./configure", CUSTOM],
+            'configure_cache': [False, "Pass --cache-file to configure script, to share configure cache across "
+                                       "iterations and configure runs with the same compilers and compiler flags",
+                                CUSTOM],
+            'configure_cache_exclude': [[], "Regular expressions for names of configure cache entries that should "
+                                            "not be reused, like those affected by --enable-*/--with-* options "
+                                            "that differ across iterations (in addition to cache variables set "
+                                            "differently via configure options)", CUSTOM],
             'configure_without_installdir': [False, "Avoid passing an install directory to the configure command "
                                                     "(such as via --prefix)", CUSTOM],
             'host_type': [None, "Value to provide to --host option of configure script, e.g., x86_64-pc-linux-gnu "
@@ -209,6 +365,8 @@ class ConfigureMake(EasyBlock):
         super().__init__(*args, **kwargs)
 
         self.config_guess = None
+        self.compiler_launcher = None
+        self.compiler_launcher_stats = None
 
     @property
     def parallel_flag(self):
@@ -272,12 +430,104 @@ class ConfigureMake(EasyBlock):
 
         return build_type, host_type
 
+    def prepare_compiler_launcher(self):
+        """
+        Prepare for using compiler cache specified via 'compiler_launcher' as compiler launcher.
+
+        :return: path to compiler launcher, or None if no compiler launcher should be used
+        """
+        launcher = self.cfg.get('compiler_launcher')
+        if not launcher:
+            return None
+
+        if launcher not in COMPILER_LAUNCHERS:
+            raise EasyBuildError("Unknown compiler launcher specified via 'compiler_launcher': %s (supported: %s)",
+                                 launcher, ', '.join(COMPILER_LAUNCHERS))
+
+        if build_option('use_ccache'):
+            # compiler commands are already wrapped by EasyBuild, don't cache compilations twice
+            self.log.info("Not using %s as compiler launcher, since --use-ccache is used", launcher)
+            return None
+
+        launcher_path = which(launcher)
+        if launcher_path is None:
+            raise EasyBuildError("%s not found in $PATH, required for compiler_launcher", launcher)
+
+        cache_dir_var, max_size_var = COMPILER_LAUNCHERS[launcher]
+        cache_dir = self.cfg.get('compiler_launcher_cache_dir')
+        if cache_dir:
+            mkdir(cache_dir, parents=True)
+            setvar(cache_dir_var, cache_dir)
+        max_size = self.cfg.get('compiler_launcher_max_size')
+        if max_size:
+            setvar(max_size_var, str(max_size))
+
+        self.compiler_launcher = launcher
+        # cache may be shared, so keep track of current statistics to report on the difference after building
+        self.compiler_launcher_stats = get_compiler_launcher_stats(launcher)
+        self.log.info("Using %s as compiler launcher (cache statistics before build: %s)",
+                      launcher_path, self.compiler_launcher_stats)
+
+        return launcher_path
+
+    def report_compiler_launcher_stats(self):
+        """Report on hits and misses of compiler cache used as compiler launcher (if any)."""
+        if not self.compiler_launcher:
+            return
+
+        stats = get_compiler_launcher_stats(self.compiler_launcher)
+        if stats is None:
+            self.log.info("Failed to determine statistics for compiler launcher %s", self.compiler_launcher)
+            return
+
+        hits, misses = stats
+        if self.compiler_launcher_stats:
+            hits -= self.compiler_launcher_stats[0]
+            misses -= self.compiler_launcher_stats[1]
+        self.compiler_launcher_stats = stats
+
+        total = hits + misses
+        self.log.info("Compiler launcher %s: %d cache hits, %d cache misses (hit rate: %.1f%%)",
+                      self.compiler_launcher, hits, misses, 100.0 * hits / total if total else 0.0)
+
+    def config_cache_file(self):
+        """
+        Determine path to configure cache file to use, and remove entries from it that should not be reused.
+
+        Configure cache files are located outside of the build directory (which is cleaned for every iteration),
+        and are specific to the compilers and compiler flags being used, incl. those set via (pre)configure options.
+        """
+        key = det_config_cache_key(self.cfg['preconfigopts'], self.cfg['configopts'])
+        cache_file = os.path.join(tempfile.gettempdir(), 'config-cache-%s-%s' % (self.name, self.version),
+                                  'config-%s.cache' % key)
+        mkdir(os.path.dirname(cache_file), parents=True)
+
+        # cache variables that are set differently across iterations are removed;
+        # entries that record values of 'precious' variables (ac_cv_env_*) are retained,
+        # so configure still refuses to use the cache file if any of those have a different value
+        excludes = list(self.cfg.get('configure_cache_exclude') or [])
+        configopts_variants = self.iter_opts.get('configopts')
+        if configopts_variants:
+            excludes.extend(det_config_cache_excludes(configopts_variants))
+
+        removed = filter_config_cache(cache_file, excludes)
+        self.log.info("Using configure cache file %s (removed entries: %s)", cache_file, ', '.join(removed))
+
+        return cache_file
+
     def configure_step(self, cmd_prefix=''):
         """
         Configure step
         - typically ./configure --prefix=/install/path style
         """
 
+        launcher = self.prepare_compiler_launcher()
+        if launcher:
+            for var in COMPILER_LAUNCHER_ENV_VARS:
+                comp = os.getenv(var)
+                if comp and not comp.startswith(launcher):
+                    setvar(var, '%s %s' % (launcher, comp))
+
         if self.cfg.get('configure_cmd_prefix'):
             if cmd_prefix:
                 tup = (cmd_prefix, self.cfg['configure_cmd_prefix'])
@@ -307,6 +557,7 @@ class ConfigureMake(EasyBlock):
         # it is possible that the configure script is generated using preconfigopts...
         # if so, we're at the mercy of the gods
         build_and_host_options = []
+        cache_options = []
 
         # note: reading contents of 'configure' script in bytes mode,
         # to avoid problems when non-UTF-8 characters are included
@@ -318,6 +569,12 @@ class ConfigureMake(EasyBlock):
             if host_type:
                 build_and_host_options.append(' --host=' + host_type)
 
+            if self.cfg.get('configure_cache'):
+                if re.search(r'(^|\s)(--cache-file=|-C(\s|$)|--config-cache)', self.cfg['configopts']):
+                    self.log.info("Configure cache file already specified in configopts, not using shared cache")
+                else:
+                    cache_options.append('--cache-file=%s' % self.config_cache_file())
+
         if self.cfg.get('configure_without_installdir'):
             configure_prefix = ''
             if self.cfg.get('prefix_opt'):
@@ -331,7 +588,7 @@ class ConfigureMake(EasyBlock):
                 self.cfg['preconfigopts'],
                 configure_command,
                 configure_prefix,
-            ] + build_and_host_options + [self.cfg['configopts']]
+            ] + build_and_host_options + cache_options + [self.cfg['configopts']]
         )
 
         res = run_shell_cmd(cmd)
@@ -382,6 +639,8 @@ class ConfigureMake(EasyBlock):
             res = run_shell_cmd(cmd, work_dir=path)
             out = res.output
 
+        self.report_compiler_launcher_stats()
+
         return out
 
     def test_step(self):
@@ -0,0 +1,425 @@
+##
+# Copyright 2009-2026 Ghent University
+#
+# This file is part of EasyBuild,
+# originally created by the HPC team of Ghent University (http://ugent.be/hpc/en),
+# with support of Ghent University (http://ugent.be/hpc),
+# the Flemish Supercomputer Centre (VSC) (https://www.vscentrum.be),
+# Flemish Research Foundation (FWO) (http://www.fwo.be/en)
+# and the Department of Economy, Science and Innovation (EWI) (http://www.ewi-vlaanderen.be/en).
+#
+# https://github.com/easybuilders/easybuild
+#
+# EasyBuild is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation v2.
+#
+# EasyBuild is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with EasyBuild.  If not, see <http://www.gnu.org/licenses/>.
+##
+"""
+Helper functions for easyblocks that install extensions:
+scheduling of extensions installed in parallel, history of their installation times,
+batching of extensions of the same type, a GNU make jobserver shared across extensions,
+and sanity checks based on a single command that lists all installed packages.
+"""
+import fcntl
+import json
+import os
+import statistics
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from easybuild.framework.easyconfig import CUSTOM
+from easybuild.tools.build_log import EasyBuildError, print_warning
+from easybuild.tools.filetools import mkdir, move_file, read_file, remove_file, write_file
+from easybuild.tools.run import run_shell_cmd
+
+
+# name of history file for installation times of extensions
+EXTS_INSTALL_HISTORY_FILE = 'easybuild-exts-install-times.json'
+
+# named pipe (in build directory of parent installation) used as GNU make jobserver
+MAKE_JOBSERVER_FIFO = 'make-jobserver.fifo'
+
+
+def det_critical_path_priorities(deps, weights):
+    """
+    Determine priorities for nodes in a dependency graph based on the critical path:
+    the priority of a node is its weight plus the highest priority of the nodes that depend on it,
+    so sorting by decreasing priority results in a valid installation order that starts the longest chains first.
+
+    Nodes that are part of a dependency cycle only get their own weight as priority.
+
+    :param deps: list with list of indices of dependencies, for each node
+    :param weights: list with (positive) weight for each node
+    :return: list of priorities for each node
+    """
+    cnt = len(deps)
+    dependents = [[] for _ in range(cnt)]
+    pending = [0] * cnt
+    for idx, node_deps in enumerate(deps):
+        for dep in set(node_deps):
+            dependents[dep].append(idx)
+            pending[idx] += 1
+
+    # determine topological order (dependencies before dependents), using Kahn's algorithm
+    order = [idx for idx in range(cnt) if not pending[idx]]
+    for idx in order:
+        for dependent in dependents[idx]:
+            pending[dependent] -= 1
+            if not pending[dependent]:
+                order.append(dependent)
+
+    priorities = list(weights)
+    in_order = set(order)
+    for idx in reversed(order):
+        prios_dependents = [priorities[x] for x in dependents[idx] if x in in_order]
+        if prios_dependents:
+            priorities[idx] = weights[idx] + max(prios_dependents)
+
+    return priorities
+
+
+def det_ext_weight(ext):
+    """Determine weight of extension for scheduling installations, based on size of its source (if any)."""
+    weight = 1
+    src = getattr(ext, 'src', None)
+    if isinstance(src, str) and os.path.isfile(src):
+        # weight of 1 per MiB of source, with a minimum of 1
+        weight = max(os.path.getsize(src) / 1024 ** 2, 1)
+    return weight
+
+
+def exts_install_history_extra_options():
+    """Easyconfig parameters to control history of installation times of extensions."""
+    return {
+        'exts_install_history': [False, "Record installation time of extensions installed in parallel, "
+                                        "and use it to determine order of installation in later builds; "
+                                        "can be a path to the history file (if True: %s in $XDG_CACHE_HOME or "
+                                        "~/.cache)" % EXTS_INSTALL_HISTORY_FILE, CUSTOM],
+    }
+
+
+def det_exts_install_history_path(exts_install_history):
+    """
+    Determine path to history file for installation times of extensions,
+    based on value of 'exts_install_history' easyconfig parameter (None if disabled).
+    """
+    if not exts_install_history:
+        path = None
+    elif isinstance(exts_install_history, str):
+        path = exts_install_history
+    else:
+        cache_dir = os.getenv('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+        path = os.path.join(cache_dir, EXTS_INSTALL_HISTORY_FILE)
+    return path
+
+
+def read_exts_install_history(path):
+    """
+    Read history of installation times of extensions from specified file.
+
+    :return: dict with installation time (in seconds) for each version of each extension (by name)
+    """
+    history = {}
+    if os.path.exists(path):
+        try:
+            history = json.loads(read_file(path))
+        except (EasyBuildError, ValueError) as err:
+            print_warning("Ignoring history of installation times of extensions in %s: %s", path, err)
+    return history
+
+
+def update_exts_install_history(path, exts):
+    """
+    Update history of installation times of extensions in specified file,
+    for extensions that were installed in parallel (which have an 'install_duration' attribute).
+
+    The history file is re-read right before updating it while holding a lock on an accompanying lock file,
+    and replaced atomically, so concurrent builds do not clobber each others results.
+    """
+    durations = [(ext.name, ext.version or '', getattr(ext, 'install_duration', None)) for ext in exts]
+    durations = [x for x in durations if x[2] is not None]
+    if durations:
+        lock_fd = None
+        try:
+            mkdir(os.path.dirname(path), parents=True)
+            lock_fd = os.open(path + '.lock', os.O_RDWR | os.O_CREAT, 0o644)
+            fcntl.flock(lock_fd, fcntl.LOCK_EX)
+
+            history = read_exts_install_history(path)
+            for name, version, duration in durations:
+                versions = history.setdefault(name, {})
+                # make sure most recent version of extension is listed last
+                versions.pop(version, None)
+                versions[version] = round(duration, 1)
+
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=os.path.basename(path))
+            os.close(fd)
+            write_file(tmp_path, json.dumps(history, indent=1, sort_keys=True))
+            move_file(tmp_path, path)
+        except (EasyBuildError, OSError) as err:
+            print_warning("Failed to update history of installation times of extensions in %s: %s", path, err)
+        finally:
+            if lock_fd is not None:
+                # closing file descriptor also releases lock
+                os.close(lock_fd)
+
+
+def track_ext_install_duration(ext, task):
+    """
+    Keep track of how long the specified task (asynchronous installation of specified extension) takes:
+    on successful completion, the installation time (in seconds) is stored in 'install_duration' of extension.
+    """
+    start_time = time.time()
+
+    def set_install_duration(task):
+        if not task.cancelled() and task.exception() is None and task.result().exit_code == 0:
+            ext.install_duration = time.time() - start_time
+
+    task.add_done_callback(set_install_duration)
+    return task
+
+
+def get_installed_ext_pkgs(ext, list_cmd, parse_output, master_attr):
+    """
+    Determine which packages are installed, by running specified command.
+
+    Result is stored in specified attribute of the parent installation,
+    so this is only done once for all extensions of the same type.
+
+    :param ext: extension instance
+    :param list_cmd: command to list installed packages
+    :param parse_output: function to parse output of list_cmd into dict with installed version for each package
+    :param master_attr: name of attribute of parent installation to store installed packages in
+    :return: dict with installed version for each package (empty if packages could not be listed)
+    """
+    pkgs = getattr(ext.master, master_attr, None)
+    if pkgs is None:
+        res = run_shell_cmd(list_cmd, fail_on_error=False, hidden=True)
+        if res.exit_code:
+            ext.log.warning("Failed to list installed packages with '%s' (exit code %s), output:\n%s",
+                            list_cmd, res.exit_code, res.output)
+            pkgs = {}
+        else:
+            pkgs = parse_output(res.output)
+            ext.log.info("Installed packages according to '%s': %s",
+                         list_cmd, ', '.join('%s %s' % pkg for pkg in sorted(pkgs.items())))
+        setattr(ext.master, master_attr, pkgs)
+
+    return pkgs
+
+
+def det_ext_batch(ext, batchable):
+    """
+    Determine batch of extensions to install together with specified extension: the contiguous run of extensions
+    of the parent installation that starts at specified extension, and for which the specified function returns True.
+
+    Only a contiguous run is taken into account, so the order of installation with respect to other extensions
+    is retained, and installation failures are attributed to the extensions that are part of the batch.
+
+    :param ext: extension instance to start batch at (always included)
+    :param batchable: function that determines whether an extension can be installed together with ext
+    :return: list of extension instances
+    """
+    exts = ext.master.ext_instances
+    batch = [ext]
+    for next_ext in exts[exts.index(ext) + 1:]:
+        if not batchable(next_ext):
+            break
+        batch.append(next_ext)
+    return batch
+
+
+def ext_pkgs_list_sanity_check(ext, exts_filter, list_cmd, parse_output, master_attr):
+    """
+    Sanity check for extension, by checking whether it is included in list of installed packages,
+    which is obtained with a single command for all extensions of the same type (see get_installed_ext_pkgs),
+    rather than running the command specified in exts_filter for every extension.
+
+    Only done for extensions using the default exts_filter, and for which 'modulename' is not specified as option
+    (which may also be False, to skip the sanity check for that extension).
+
+    :param ext: extension instance
+    :param exts_filter: default exts_filter for this type of extensions
+    :return: (sanity check result, failure message) tuple, or None if standard sanity check should be done
+    """
+    current_exts_filter = ext.cfg.get_ref('exts_filter')
+    default_filter = current_exts_filter is None or tuple(current_exts_filter) == tuple(exts_filter)
+    if not ext.is_extension or not default_filter or 'modulename' in ext.options or ext.dry_run:
+        return None
+
+    pkgs = get_installed_ext_pkgs(ext, list_cmd, parse_output, master_attr)
+    if not pkgs:
+        return None
+
+    version = pkgs.get(ext.name)
+    if version == ext.version:
+        ext.log.info("Package %s %s is installed", ext.name, version)
+        return (True, '')
+
+    if version is None:
+        fail_msg = "Package %s not found in output of '%s'" % (ext.name, list_cmd)
+    else:
+        fail_msg = "Found version %s of package %s rather than %s" % (version, ext.name, ext.version)
+    ext.log.warning("Sanity check for '%s' extension failed: %s", ext.name, fail_msg)
+    return (False, fail_msg)
+
+
+def make_ext_weight_func(exts, history):
+    """
+    Create function to determine weight of extensions for scheduling installations,
+    based on installation time of extensions in history (for same version if available, latest version otherwise).
+
+    Weight of extensions not found in history is estimated based on size of their source,
+    in proportion to the installation time per MiB of source for extensions with a known installation time.
+    """
+    def hist_duration(ext):
+        versions = history.get(ext.name) or {}
+        duration = versions.get(ext.version or '')
+        if duration is None and versions:
+            duration = list(versions.values())[-1]
+        return duration
+
+    ratios = [hist_duration(ext) / det_ext_weight(ext) for ext in exts if hist_duration(ext) is not None]
+    secs_per_mib = statistics.median(ratios) if ratios else 1
+
+    def weight_func(ext):
+        duration = hist_duration(ext)
+        if duration is None:
+            duration = det_ext_weight(ext) * secs_per_mib
+        return max(duration, 1)
+
+    return weight_func
+
+
+def install_exts_parallel_with_history(easyblock, install_exts_parallel):
+    """
+    Install extensions in parallel using specified function, starting with extensions on the critical path
+    (weighted by installation time recorded in previous builds, if any), and update history of installation times.
+    """
+    history_path = det_exts_install_history_path(easyblock.cfg['exts_install_history'])
+    history = read_exts_install_history(history_path) if history_path else {}
+    sort_exts_by_critical_path(easyblock, weight_func=make_ext_weight_func(easyblock.ext_instances, history))
+    try:
+        install_exts_parallel()
+    finally:
+        if history_path:
+            update_exts_install_history(history_path, easyblock.ext_instances)
+
+
+def start_make_jobserver(path, slots):
+    """
+    Create named pipe at specified path to use as GNU make jobserver, and fill it with specified number of tokens.
+
+    :return: file descriptor for named pipe, which must be kept open as long as jobserver is in use
+    """
+    remove_file(path)
+    os.mkfifo(path)
+    # opening named pipe for both reading and writing does not block on Linux,
+    # and ensures that tokens are retained when no other process has it open
+    fd = os.open(path, os.O_RDWR)
+    os.write(fd, b'+' * slots)
+    return fd
+
+
+def stop_make_jobserver(path, fd):
+    """
+    Stop GNU make jobserver that was started with start_make_jobserver:
+    close file descriptor for named pipe at specified path, and remove it.
+    """
+    os.close(fd)
+    remove_file(path)
+
+
+def make_jobserver_makeflags(path, slots, makeflags=None):
+    """
+    Determine value for $MAKEFLAGS to make GNU make use the jobserver at specified path.
+    """
+    jobserver_flags = '-j%d --jobserver-auth=fifo:%s' % (slots, path)
+    return ' '.join(x for x in (makeflags, jobserver_flags) if x)
+
+
+def make_jobserver_cmd(cmd, path):
+    """
+    Wrap specified shell command such that it holds a token of the jobserver at specified path while it runs.
+
+    Since GNU make gets one implicit job slot, this ensures that the total number of jobs
+    across all commands sharing the jobserver does not exceed the number of tokens.
+    """
+    return ' '.join([
+        "exec 3<>'%s';" % path,
+        "token=$(dd bs=1 count=1 <&3 2>/dev/null);",
+        "( %s );" % cmd,
+        "ec=$?;",
+        'printf %s "$token" >&3;',
+        "exit $ec",
+    ])
+
+
+def stop_exts_make_jobserver(easyblock):
+    """
+    Stop GNU make jobserver shared across extensions of specified easyblock, if one was started.
+
+    Parent installations that call this at the end of their extensions step should set 'exts_make_jobserver'
+    to None at the start of it, to let extensions start a jobserver when needed (see RPackage.get_make_jobserver).
+    """
+    jobserver = getattr(easyblock, 'exts_make_jobserver', None)
+    if jobserver:
+        path, _, fd = jobserver
+        stop_make_jobserver(path, fd)
+        easyblock.log.info("Stopped make jobserver for extensions: %s", path)
+    easyblock.exts_make_jobserver = False
+
+
+def sort_exts_by_critical_path(easyblock, weight_func=det_ext_weight):
+    """
+    Sort extensions to install for specified easyblock according to the critical path in their dependency graph,
+    so extensions at the start of long chains of dependencies are installed first.
+
+    Required dependencies of all extensions are determined up front (in parallel).
+    Order of extensions is left untouched if required dependencies are not known for all extensions.
+    """
+    exts = easyblock.ext_instances
+    if len(exts) < 2:
+        return
+
+    with ThreadPoolExecutor(max_workers=easyblock.cfg.parallel) as thread_pool:
+        all_required_deps = list(thread_pool.map(lambda ext: ext.required_deps, exts))
+
+    unknown = [ext.name for ext, required_deps in zip(exts, all_required_deps) if required_deps is None]
+    if unknown:
+        easyblock.log.info("Required dependencies not known for extensions %s, so keeping order of extensions",
+                           ', '.join(unknown))
+        return
+
+    ext_idxs = {}
+    for idx, ext in enumerate(exts):
+        ext_idxs.setdefault(ext.name, idx)
+    # only take into account dependencies on extensions that are being installed
+    deps = [[ext_idxs[dep] for dep in required_deps if ext_idxs.get(dep, idx) != idx]
+            for idx, required_deps in enumerate(all_required_deps)]
+    weights = [weight_func(ext) for ext in exts]
+    priorities = det_critical_path_priorities(deps, weights)
+
+    order = sorted(range(len(exts)), key=lambda idx: (-priorities[idx], idx))
+    easyblock.ext_instances = [exts[idx] for idx in order]
+
+    # log critical path, by following dependent with highest priority starting from extension with highest priority
+    dependents = [[] for _ in exts]
+    for idx, ext_deps in enumerate(deps):
+        for dep in ext_deps:
+            dependents[dep].append(idx)
+    critical_path = [order[0]]
+    while dependents[critical_path[-1]] and len(critical_path) <= len(exts):
+        critical_path.append(max(dependents[critical_path[-1]], key=lambda idx: priorities[idx]))
+    easyblock.log.info("Extensions sorted by critical path in dependency graph (%d dependencies), "
+                       "critical path: %s", sum(len(x) for x in deps),
+                       ' -> '.join(exts[idx].name for idx in critical_path))
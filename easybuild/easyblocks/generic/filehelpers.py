@@ -0,0 +1,102 @@
+##
+# Copyright 2009-2026 Ghent University
+#
+# This file is part of EasyBuild,
+# originally created by the HPC team of Ghent University (http://ugent.be/hpc/en),
+# with support of Ghent University (http://ugent.be/hpc),
+# the Flemish Supercomputer Centre (VSC) (https://www.vscentrum.be),
+# Flemish Research Foundation (FWO) (http://www.fwo.be/en)
+# and the Department of Economy, Science and Innovation (EWI) (http://www.ewi-vlaanderen.be/en).
+#
+# https://github.com/easybuilders/easybuild
+#
+# EasyBuild is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation v2.
+#
+# EasyBuild is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with EasyBuild.  If not, see <http://www.gnu.org/licenses/>.
+##
+"""
+Helper functions for easyblocks that deal with files and directories in installations
+"""
+import os
+import stat
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from easybuild.base import fancylogger
+from easybuild.tools.build_log import EasyBuildError
+
+
+def adjust_permissions_tree(path, perms, dir_perms=0, max_workers=1, ignore_errors=False):
+    """
+    Add permissions to all files and directories in specified directory tree, in a single traversal.
+
+    Directories are scanned with os.scandir, and handed out to a pool of threads.
+    Symlinks are not followed, and entries that already have the requested permissions are left untouched.
+
+    :param path: top directory of directory tree
+    :param perms: permission bits to add to all files and directories
+    :param dir_perms: additional permission bits to add to directories only
+    :param max_workers: number of threads to use for scanning directories
+    :param ignore_errors: log failures to change permissions rather than raising an error
+    :return: number of files and directories for which permissions were changed
+    """
+    def adjust(entry_path, mode, is_dir):
+        """Add permissions to specified entry if needed; return True if permissions were changed."""
+        new_mode = mode | perms | (dir_perms if is_dir else 0)
+        if stat.S_IMODE(mode) == stat.S_IMODE(new_mode):
+            return False
+        os.chmod(entry_path, stat.S_IMODE(new_mode))
+        return True
+
+    def scan_dir(dir_path):
+        """Adjust permissions for entries in specified directory; return list of subdirectories + change count."""
+        subdirs, cnt, failed = [], 0, []
+        try:
+            with os.scandir(dir_path) as it:
+                for entry in it:
+                    try:
+                        if entry.is_symlink():
+                            continue
+                        is_dir = entry.is_dir(follow_symlinks=False)
+                        if adjust(entry.path, entry.stat(follow_symlinks=False).st_mode, is_dir):
+                            cnt += 1
+                        if is_dir:
+                            subdirs.append(entry.path)
+                    except OSError as err:
+                        failed.append((entry.path, err))
+        except OSError as err:
+            # directory can not be listed (for example due to lack of read permissions)
+            failed.append((dir_path, err))
+        return subdirs, cnt, failed
+
+    cnt, failed = 0, []
+    try:
+        cnt += int(adjust(path, os.stat(path).st_mode, True))
+    except OSError as err:
+        failed.append((path, err))
+
+    with ThreadPoolExecutor(max_workers=max_workers) as thread_pool:
+        pending = {thread_pool.submit(scan_dir, path)}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for task in done:
+                subdirs, task_cnt, task_failed = task.result()
+                cnt += task_cnt
+                failed.extend(task_failed)
+                pending.update(thread_pool.submit(scan_dir, subdir) for subdir in subdirs)
+
+    if failed:
+        msg = "Failed to adjust permissions for %d paths in %s: %s" % (len(failed), path, failed[:10])
+        if ignore_errors:
+            fancylogger.getLogger('adjust_permissions_tree', fname=False).warning(msg)
+        else:
+            raise EasyBuildError(msg)
+
+    return cnt
@@ -81,7 +81,10 @@ class JuliaBundle(Bundle, JuliaPackage):
         super().prepare_step(*args, **kwargs)
 
     def install_step(self):
-        """Prepare installation environment and dd all dependencies to project environment."""
+        """
+        Prepare installation environment and add all dependencies to project environment.
+        Julia.Pkg commands are run together with those of the extensions, see JuliaPackage.extensions_step.
+        """
         self.prepare_julia_env()
         self.include_pkg_dependencies()
 
@@ -38,6 +38,7 @@ import easybuild.tools.environment as env
 from easybuild.framework.easyconfig import CUSTOM
 from easybuild.framework.extensioneasyblock import ExtensionEasyBlock
 from easybuild.tools.build_log import EasyBuildError
+from easybuild.tools.config import build_option
 from easybuild.tools.modules import get_software_root, get_software_version
 from easybuild.tools.filetools import copy_dir, mkdir
 from easybuild.tools.run import run_shell_cmd
@@ -45,6 +46,8 @@ from easybuild.tools.utilities import trace_msg
 
 EXTS_FILTER_JULIA_PACKAGES = ("julia -e 'using %(ext_name)s'", "")
 USER_DEPOT_PATTERN = re.compile(r"\/\.julia\/?(.*\.toml)*$")
+# lines printed by Pkg.precompile(timing=true), like '   1234.5 ms  ✓ Example'
+PRECOMPILE_TIMING_PATTERN = re.compile(r"^\s*(?P<time>[0-9.]+)\s*ms\s+\S*\s*(?P<pkg>[A-Za-z_][A-Za-z0-9_]*)\s*$", re.M)
 
 JULIA_PATHS_SOFT_INIT = {
     "Lua": """
@@ -74,6 +77,8 @@ class JuliaPackage(ExtensionEasyBlock):
         - add Julia packages found in dependencies of the easyconfig to installation environment, needed
           for Pkg to be aware of those packages and not install them again
         - add newly installed Julia packages to installation environment (automatically done by Pkg)
+        - all Pkg operations of an installation (incl. those of extensions) are run in a single Julia session,
+          with automatic precompilation disabled and a single (parallel) precompilation at the end
 
     Julia environment setup on module load:
         User depot and its shared environment for this version of Julia are kept as top paths of DEPOT_PATH and
@@ -95,6 +100,13 @@ class JuliaPackage(ExtensionEasyBlock):
         })
         return extra_vars
 
+    def __init__(self, *args, **kwargs):
+        """Initialize JuliaPackage-specific variables."""
+        super().__init__(*args, **kwargs)
+
+        # Julia.Pkg commands to run in a single Julia session
+        self.julia_pkg_cmds = []
+
     @staticmethod
     def get_julia_env(env_var):
         """
@@ -164,7 +176,8 @@ class JuliaPackage(ExtensionEasyBlock):
 
         3. Enable offline mode in Julia to avoid automatic downloads of packages.
 
-        4. Enable automatic precompilation of packages after each build.
+        4. Disable automatic precompilation of packages after each Pkg operation,
+        all packages are precompiled at once (in parallel) after all Pkg operations are done.
         """
         # Grab both DEPOT_PATH and LOAD_PATH before any changes are made
         # given that Julia might automatically update LOAD_PATH from a change on DEPOT_PATH
@@ -192,34 +205,48 @@ class JuliaPackage(ExtensionEasyBlock):
         # Enable offline mode
         self.set_pkg_offline()
 
-        # Enable automatic precompilation
-        env.setvar('JULIA_PKG_PRECOMPILE_AUTO', 'true')
+        # Disable automatic precompilation, and precompile in parallel once all packages are installed
+        env.setvar('JULIA_PKG_PRECOMPILE_AUTO', 'false')
+        env.setvar('JULIA_NUM_PRECOMPILE_TASKS', str(self.cfg.parallel))
 
-    def install_pkg_source(self, pkg_source, environment, trace=True):
-        """Execute Julia.Pkg command to install package from its sources"""
-
-        julia_pkg_cmd = [
-            'using Pkg',
-            'Pkg.activate("%s")' % environment,
-        ]
+    def pkg_source_cmds(self, pkg_source):
+        """Return list of Julia.Pkg commands to install package from its sources"""
 
         if os.path.isdir(os.path.join(pkg_source, '.git')):
             # sources from git repos can be installed as any remote package
             self.log.debug('Installing Julia package in normal mode (Pkg.add)')
 
-            julia_pkg_cmd.extend([
+            julia_pkg_cmds = [
                 # install package from local path preserving existing dependencies
                 'Pkg.add(url="%s"; preserve=PRESERVE_ALL)' % pkg_source,
-            ])
+            ]
         else:
             # plain sources have to be installed in develop mode
             self.log.debug('Installing Julia package in develop mode (Pkg.develop)')
 
-            julia_pkg_cmd.extend([
+            julia_pkg_cmds = [
                 # install package from local path preserving existing dependencies
                 'Pkg.develop(PackageSpec(path="%s"); preserve=PRESERVE_ALL)' % pkg_source,
                 'Pkg.build("%s")' % os.path.basename(pkg_source),
-            ])
+            ]
+
+        return julia_pkg_cmds
+
+    def run_julia_pkg_cmds(self, julia_pkg_cmds, environment, precompile=True):
+        """
+        Execute list of Julia.Pkg commands in a single Julia session,
+        optionally followed by precompilation of all packages in the environment.
+        """
+        julia_pkg_cmd = [
+            'using Pkg',
+            'Pkg.activate("%s")' % environment,
+        ] + julia_pkg_cmds
+
+        if precompile:
+            if LooseVersion(get_software_version('Julia')) >= LooseVersion('1.9'):
+                julia_pkg_cmd.append('Pkg.precompile(timing=true)')
+            else:
+                julia_pkg_cmd.append('Pkg.precompile()')
 
         julia_pkg_cmd = '; '.join(julia_pkg_cmd)
         cmd = ' '.join([
@@ -229,10 +256,26 @@ class JuliaPackage(ExtensionEasyBlock):
         ])
         res = run_shell_cmd(cmd)
 
+        if precompile:
+            timings = [(float(m.group('time')), m.group('pkg')) for m in PRECOMPILE_TIMING_PATTERN.finditer(res.output)]
+            if timings:
+                self.log.info("Precompilation times of Julia packages:\n%s",
+                              '\n'.join("%s: %.1f ms" % (pkg, time) for (time, pkg) in sorted(timings, reverse=True)))
+
         return res.output
 
+    def run_queued_julia_pkg_cmds(self):
+        """Execute all queued Julia.Pkg commands in a single Julia session, followed by precompilation."""
+        julia_pkg_cmds, self.julia_pkg_cmds = self.julia_pkg_cmds, []
+        if julia_pkg_cmds:
+            return self.run_julia_pkg_cmds(julia_pkg_cmds, self.julia_env_path())
+        return ''
+
     def include_pkg_dependencies(self):
-        """Add to installation environment all Julia packages already present in its dependencies"""
+        """
+        Add to installation environment all Julia packages already present in its dependencies.
+        Required Julia.Pkg commands are queued, see run_queued_julia_pkg_cmds.
+        """
         # Location of project environment files in install dir
         mkdir(self.julia_env_path(), parents=True)
 
@@ -241,10 +284,13 @@ class JuliaPackage(ExtensionEasyBlock):
             dep_root = get_software_root(dep['name'])
             for pkg in glob.glob(os.path.join(dep_root, 'packages/*')):
                 trace_msg("incorporating Julia package from dependencies: %s" % os.path.basename(pkg))
-                self.install_pkg_source(pkg, self.julia_env_path(), trace=False)
+                self.julia_pkg_cmds.extend(self.pkg_source_cmds(pkg))
 
     def install_pkg(self):
-        """Install Julia package"""
+        """
+        Install Julia package.
+        Required Julia.Pkg commands are queued, see run_queued_julia_pkg_cmds.
+        """
 
         # determine source type of current installation
         if os.path.isdir(os.path.join(self.start_dir, '.git')):
@@ -254,7 +300,7 @@ class JuliaPackage(ExtensionEasyBlock):
             pkg_source = os.path.join(self.installdir, 'packages', self.name)
             copy_dir(self.start_dir, pkg_source)
 
-        return self.install_pkg_source(pkg_source, self.julia_env_path())
+        self.julia_pkg_cmds.extend(self.pkg_source_cmds(pkg_source))
 
     def prepare_step(self, *args, **kwargs):
         """Prepare for Julia package installation."""
@@ -280,8 +326,22 @@ class JuliaPackage(ExtensionEasyBlock):
 
         self.prepare_julia_env()
         self.include_pkg_dependencies()
+        self.install_pkg()
+
+        if self.cfg['exts_list'] and not build_option('skip_extensions'):
+            # queued Julia.Pkg commands are run together with those for extensions, see extensions_step
+            return ''
 
-        return self.install_pkg()
+        return self.run_queued_julia_pkg_cmds()
+
+    def extensions_step(self, *args, **kwargs):
+        """
+        Install extensions: Julia.Pkg commands for all Julia packages (incl. those from dependencies)
+        are run in a single Julia session once all extensions are processed.
+        """
+        super().extensions_step(*args, **kwargs)
+
+        self.run_queued_julia_pkg_cmds()
 
     def install_extension(self):
         """Install Julia package as an extension."""
@@ -291,8 +351,16 @@ class JuliaPackage(ExtensionEasyBlock):
             raise EasyBuildError(errmsg, self.name, self.src)
         ExtensionEasyBlock.install_extension(self, unpack_src=True)
 
-        self.prepare_julia_env()
-        self.install_pkg()
+        if isinstance(self.master, JuliaPackage):
+            # Julia environment is already prepared by parent installation,
+            # which runs queued Julia.Pkg commands for all extensions at once
+            self.install_pkg()
+            self.master.julia_pkg_cmds.extend(self.julia_pkg_cmds)
+            self.julia_pkg_cmds = []
+        else:
+            self.prepare_julia_env()
+            self.install_pkg()
+            self.run_queued_julia_pkg_cmds()
 
     def sanity_check_step(self, *args, **kwargs):
         """Custom sanity check for JuliaPackage"""
@@ -27,12 +27,15 @@ EasyBuild support for installing software with Meson & Ninja.
 
 @author: Kenneth Hoste (Ghent University)
 """
+import heapq
+import json
+import os
 
 from easybuild.tools import LooseVersion
 from easybuild.framework.easyblock import EasyBlock
 from easybuild.framework.easyconfig import CUSTOM
 from easybuild.tools.build_log import EasyBuildError
-from easybuild.tools.filetools import change_dir, create_unused_dir, which
+from easybuild.tools.filetools import change_dir, create_unused_dir, which, write_file
 from easybuild.tools.modules import get_software_version
 from easybuild.tools.run import run_shell_cmd
 
@@ -40,6 +43,88 @@ DEFAULT_CONFIGURE_CMD = 'meson'
 DEFAULT_BUILD_CMD = 'ninja'
 DEFAULT_INSTALL_CMD = 'ninja'
 
+NINJA_LOG = '.ninja_log'
+
+
+def parse_ninja_log(txt):
+    """
+    Parse (part of) .ninja_log file, which has a line for each output of an executed build edge,
+    with tab-separated start time (ms), end time (ms), mtime, path of output and hash of build command.
+
+    :return: list of (start, end, targets) tuples, one per build edge, with start/end time in milliseconds
+    """
+    edges = {}
+    for line in txt.splitlines():
+        if line.startswith('#'):
+            continue
+        fields = line.split('\t')
+        if len(fields) != 5:
+            continue
+        try:
+            start, end = int(fields[0]), int(fields[1])
+        except ValueError:
+            continue
+        # outputs of the same build edge have identical start/end time and command hash
+        edges.setdefault((start, end, fields[4]), []).append(fields[3])
+
+    return sorted((start, end, targets) for (start, end, _), targets in edges.items())
+
+
+def ninja_log_summary(edges, top=10):
+    """
+    Summarize build edges parsed from .ninja_log
+
+    :param edges: list of (start, end, targets) tuples, as returned by parse_ninja_log
+    :param top: number of slowest build edges to include
+    :return: dict with total CPU time and wall time (in seconds), effective parallelism,
+             and slowest build edges as (duration, targets) tuples
+    """
+    cpu_time = sum(end - start for start, end, _ in edges) / 1000.0
+    wall_time = 0.0
+    if edges:
+        wall_time = (max(end for _, end, _ in edges) - min(start for start, _, _ in edges)) / 1000.0
+    slowest = sorted(((end - start) / 1000.0, targets) for start, end, targets in edges)[::-1][:top]
+    return {
+        'cpu_time': cpu_time,
+        'wall_time': wall_time,
+        'parallelism': cpu_time / wall_time if wall_time else 0.0,
+        'slowest': slowest,
+    }
+
+
+def ninja_log_chrome_trace(edges):
+    """
+    Convert build edges parsed from .ninja_log to trace events in Chrome trace format;
+    each build edge is assigned to the first available 'thread', to visualise the parallelism of the build.
+
+    :param edges: list of (start, end, targets) tuples, as returned by parse_ninja_log
+    :return: list of trace events
+    """
+    events = []
+    # heap of (end time, thread id) for threads that are busy
+    busy, free = [], []
+    next_tid = 0
+    for start, end, targets in sorted(edges):
+        while busy and busy[0][0] <= start:
+            heapq.heappush(free, heapq.heappop(busy)[1])
+        if free:
+            tid = heapq.heappop(free)
+        else:
+            tid = next_tid
+            next_tid += 1
+        heapq.heappush(busy, (end, tid))
+        events.append({
+            'name': ', '.join(targets),
+            'cat': 'targets',
+            'ph': 'X',
+            'ts': start * 1000,
+            'dur': (end - start) * 1000,
+            'pid': 0,
+            'tid': tid,
+            'args': {},
+        })
+    return events
+
 
 class MesonNinja(EasyBlock):
     """
@@ -53,6 +138,8 @@ class MesonNinja(EasyBlock):
         extra_vars.update({
             'build_dir': [None, "build_dir to pass to meson", CUSTOM],
             'build_cmd': [DEFAULT_BUILD_CMD, "Build command to use", CUSTOM],
+            'build_trace_slowest': [10, "Number of slowest targets to report on after the build based on "
+                                        ".ninja_log (0 to disable reporting on build times)", CUSTOM],
             'build_type': [None, "Build type for meson, e.g. release."
                                  "Replaces use of toolchain options debug, noopt, lowopt, opt", CUSTOM],
             'ndebug': [True, "Sets -Db_ndebug which in turn defines NDEBUG for C/C++ builds."
@@ -144,9 +231,52 @@ class MesonNinja(EasyBlock):
             'parallel': parallel,
             'prebuildopts': self.cfg['prebuildopts'],
         }
+
+        # keep track of current size of .ninja_log, since Ninja appends to it
+        ninja_log = os.path.join(os.getcwd(), NINJA_LOG)
+        ninja_log_offset = os.path.getsize(ninja_log) if os.path.exists(ninja_log) else 0
+
         res = run_shell_cmd(cmd)
+
+        if self.cfg.get('build_trace_slowest'):
+            self.report_ninja_log(ninja_log, offset=ninja_log_offset)
+
         return res.output
 
+    def report_ninja_log(self, ninja_log, offset=0):
+        """
+        Report on build times of targets as recorded in .ninja_log, and write a trace in Chrome trace format
+        next to the build log.
+
+        :param ninja_log: path to .ninja_log file
+        :param offset: offset in .ninja_log to start parsing from (to ignore results of earlier builds)
+        """
+        if not os.path.exists(ninja_log):
+            self.log.info("No %s found, not reporting on build times", ninja_log)
+            return
+
+        # .ninja_log may have been recompacted by Ninja, in which case we have to parse it entirely
+        if os.path.getsize(ninja_log) < offset:
+            offset = 0
+        with open(ninja_log) as fp:
+            fp.seek(offset)
+            edges = parse_ninja_log(fp.read())
+        if not edges:
+            self.log.info("No build edges found in %s, not reporting on build times", ninja_log)
+            return
+
+        summary = ninja_log_summary(edges, top=int(self.cfg.get('build_trace_slowest')))
+        self.log.info("Build with Ninja: %d build edges, %.1fs CPU time, %.1fs wall time "
+                      "(effective parallelism: %.2f)",
+                      len(edges), summary['cpu_time'], summary['wall_time'], summary['parallelism'])
+        slowest = ['%10.1fs  %s' % (duration, ', '.join(targets)) for duration, targets in summary['slowest']]
+        self.log.info("Slowest targets:\n%s", '\n'.join(slowest))
+
+        if self.logfile:
+            trace_file = os.path.splitext(self.logfile)[0] + '-ninja-trace.json'
+            write_file(trace_file, json.dumps({'traceEvents': ninja_log_chrome_trace(edges)}))
+            self.log.info("Trace of Ninja build written to %s", trace_file)
+
     def test_step(self):
         """
         Run tests using Ninja.
@@ -0,0 +1,226 @@
+##
+# Copyright 2019-2026 Ghent University
+#
+# This file is part of EasyBuild,
+# originally created by the HPC team of Ghent University (http://ugent.be/hpc/en),
+# with support of Ghent University (http://ugent.be/hpc),
+# the Flemish Supercomputer Centre (VSC) (https://www.vscentrum.be),
+# Flemish Research Foundation (FWO) (http://www.fwo.be/en)
+# and the Department of Economy, Science and Innovation (EWI) (http://www.ewi-vlaanderen.be/en).
+#
+# https://github.com/easybuilders/easybuild
+#
+# EasyBuild is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation v2.
+#
+# EasyBuild is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with EasyBuild.  If not, see <http://www.gnu.org/licenses/>.
+##
+"""
+Helper functions for easyblocks that install MPI libraries:
+MPI benchmark that can be run on the local node as part of the sanity check.
+"""
+import json
+import os
+import re
+import tempfile
+from easybuild.tools import LooseVersion
+
+import easybuild.tools.toolchain as toolchain
+from easybuild.framework.easyconfig import CUSTOM
+from easybuild.tools.build_log import EasyBuildError
+from easybuild.tools.config import build_option
+from easybuild.tools.filetools import remove_dir, write_file
+from easybuild.tools.run import run_shell_cmd
+from easybuild.tools.toolchain.mpi import get_mpi_cmd_template
+
+
+# small MPI benchmark to check performance of communication between MPI ranks on a single node:
+# ping-pong between first two ranks (latency + bandwidth), and alltoall across all ranks (time per call)
+MPI_BENCHMARK_SRC = r"""
+#include <mpi.h>
+#include <stdio.h>
+#include <stdlib.h>
+#include <string.h>
+
+#define PINGPONG_MAX_SIZE (4 << 20)
+#define ALLTOALL_MAX_SIZE (64 << 10)
+#define WARMUP 10
+
+int main(int argc, char **argv) {
+    int rank, nranks, size, iter, iters;
+    char *buf, *sendbuf, *recvbuf;
+    double start = 0.0, time, max_time;
+
+    MPI_Init(&argc, &argv);
+    MPI_Comm_rank(MPI_COMM_WORLD, &rank);
+    MPI_Comm_size(MPI_COMM_WORLD, &nranks);
+    if (nranks < 2) {
+        fprintf(stderr, "MPI benchmark requires at least 2 ranks\n");
+        MPI_Abort(MPI_COMM_WORLD, 1);
+    }
+
+    buf = malloc(PINGPONG_MAX_SIZE);
+    memset(buf, 1, PINGPONG_MAX_SIZE);
+    for (size = 1; size <= PINGPONG_MAX_SIZE; size *= 4) {
+        iters = size < (64 << 10) ? 1000 : 100;
+        MPI_Barrier(MPI_COMM_WORLD);
+        for (iter = -WARMUP; iter < iters; iter++) {
+            if (iter == 0) {
+                start = MPI_Wtime();
+            }
+            if (rank == 0) {
+                MPI_Send(buf, size, MPI_CHAR, 1, 0, MPI_COMM_WORLD);
+                MPI_Recv(buf, size, MPI_CHAR, 1, 0, MPI_COMM_WORLD, MPI_STATUS_IGNORE);
+            } else if (rank == 1) {
+                MPI_Recv(buf, size, MPI_CHAR, 0, 0, MPI_COMM_WORLD, MPI_STATUS_IGNORE);
+                MPI_Send(buf, size, MPI_CHAR, 0, 0, MPI_COMM_WORLD);
+            }
+        }
+        /* one-way time */
+        time = (MPI_Wtime() - start) / iters / 2;
+        if (rank == 0) {
+            printf("pingpong %d %.3f %.3f\n", size, time * 1e6, size / time / 1e6);
+        }
+    }
+
+    sendbuf = malloc((size_t)ALLTOALL_MAX_SIZE * nranks);
+    recvbuf = malloc((size_t)ALLTOALL_MAX_SIZE * nranks);
+    memset(sendbuf, 1, (size_t)ALLTOALL_MAX_SIZE * nranks);
+    for (size = 1; size <= ALLTOALL_MAX_SIZE; size *= 16) {
+        iters = size < (4 << 10) ? 1000 : 100;
+        MPI_Barrier(MPI_COMM_WORLD);
+        for (iter = -WARMUP; iter < iters; iter++) {
+            if (iter == 0) {
+                start = MPI_Wtime();
+            }
+            MPI_Alltoall(sendbuf, size, MPI_CHAR, recvbuf, size, MPI_CHAR, MPI_COMM_WORLD);
+        }
+        time = (MPI_Wtime() - start) / iters;
+        MPI_Reduce(&time, &max_time, 1, MPI_DOUBLE, MPI_MAX, 0, MPI_COMM_WORLD);
+        if (rank == 0) {
+            printf("alltoall %d %.3f\n", size, max_time * 1e6);
+        }
+    }
+
+    free(buf);
+    free(sendbuf);
+    free(recvbuf);
+    fflush(stdout);
+    MPI_Finalize();
+    return 0;
+}
+"""
+
+MPI_BENCHMARK_REGEX = re.compile(r'^(?P<test>pingpong|alltoall) (?P<size>[0-9]+) (?P<time>[0-9.]+)'
+                                 r'(?: (?P<bandwidth>[0-9.]+))?\s*$', re.M)
+
+
+def mpi_benchmark_extra_options():
+    """Easyconfig parameters for MPI benchmark that can be run as part of sanity check of MPI libraries."""
+    return {
+        'mpi_benchmark': [False, "Run MPI ping-pong/alltoall benchmark on local node as part of sanity check, "
+                                 "to detect MPI installations that fall back to a slow transport", CUSTOM],
+        'mpi_benchmark_max_latency': [10, "Maximum latency (in microseconds) for smallest message "
+                                          "in MPI ping-pong benchmark (None to disable check)", CUSTOM],
+        'mpi_benchmark_min_bandwidth': [1000, "Minimum bandwidth (in MB/s) for largest message "
+                                              "in MPI ping-pong benchmark (None to disable check)", CUSTOM],
+    }
+
+
+def parse_mpi_benchmark_output(output):
+    """
+    Parse output of MPI benchmark.
+
+    :return: dict with 'pingpong' results (latency in microseconds + bandwidth in MB/s) for each message size,
+             and 'alltoall' results (time per call in microseconds) for each message size
+    """
+    results = {'pingpong': {}, 'alltoall': {}}
+    for res in MPI_BENCHMARK_REGEX.finditer(output):
+        size, time = int(res.group('size')), float(res.group('time'))
+        if res.group('test') == 'pingpong':
+            results['pingpong'][size] = (time, float(res.group('bandwidth') or 0))
+        else:
+            results['alltoall'][size] = time
+    return results
+
+
+def check_mpi_benchmark_results(results, max_latency=None, min_bandwidth=None):
+    """
+    Check results of MPI benchmark against specified thresholds.
+
+    :return: list of error messages (empty if all checks passed)
+    """
+    errors = []
+    pingpong = results['pingpong']
+    if not pingpong:
+        errors.append("no results found for MPI ping-pong benchmark")
+    else:
+        latency = pingpong[min(pingpong)][0]
+        if max_latency is not None and latency > max_latency:
+            errors.append("latency for %d byte messages is %.2f us, should be at most %s us" %
+                          (min(pingpong), latency, max_latency))
+        bandwidth = pingpong[max(pingpong)][1]
+        if min_bandwidth is not None and bandwidth < min_bandwidth:
+            errors.append("bandwidth for %d byte messages is %.1f MB/s, should be at least %s MB/s" %
+                          (max(pingpong), bandwidth, min_bandwidth))
+    if not results['alltoall']:
+        errors.append("no results found for MPI alltoall benchmark")
+    return errors
+
+
+def run_mpi_benchmark(easyblock, mpi_family, mpi_version=None, compile_cmd='mpicc', mpi_cmd_template=None):
+    """
+    Compile and run MPI benchmark on local node with MPI installation provided by specified easyblock,
+    and check results against thresholds specified in easyconfig parameters.
+    Results are logged, and stored in a JSON file next to the log file.
+
+    Should be called with (fake) module for MPI installation loaded.
+    """
+    if not build_option('mpi_tests'):
+        easyblock.log.info("Skipping MPI benchmark since running MPI programs is disabled (--disable-mpi-tests)")
+        return
+
+    tmpdir = tempfile.mkdtemp(prefix='eb-mpi-benchmark-')
+    try:
+        src = os.path.join(tmpdir, 'mpi_benchmark.c')
+        exe = os.path.join(tmpdir, 'mpi_benchmark')
+        write_file(src, MPI_BENCHMARK_SRC)
+        run_shell_cmd("%s -O2 %s -o %s" % (compile_cmd, src, exe))
+
+        # use (at most) 4 ranks, but at least 2 for ping-pong
+        params = {'nr_ranks': min(4, max(2, easyblock.cfg.parallel)), 'cmd': exe}
+        # template for MPI command specified via --mpi-cmd-template always takes precedence
+        if mpi_cmd_template is None or build_option('mpi_cmd_template'):
+            mpi_cmd_template, params = get_mpi_cmd_template(mpi_family, params, mpi_version=mpi_version)
+        cmd = mpi_cmd_template % params
+        if mpi_family == toolchain.OPENMPI:
+            # allow oversubscription (in case of hyperthreading, or if only a single core is available)
+            if mpi_version and LooseVersion(mpi_version) >= '5.0':
+                cmd = "PRTE_MCA_rmaps_default_mapping_policy=:oversubscribe " + cmd
+            else:
+                cmd = "OMPI_MCA_rmaps_base_oversubscribe=1 " + cmd
+        res = run_shell_cmd(cmd)
+    finally:
+        remove_dir(tmpdir)
+
+    results = parse_mpi_benchmark_output(res.output)
+    lines = ["%10d bytes: %10.2f us %10.1f MB/s" % (size, lat, bw) for size, (lat, bw) in
+             sorted(results['pingpong'].items())]
+    easyblock.log.info("Results for MPI ping-pong benchmark (%d ranks):\n%s", params['nr_ranks'], '\n'.join(lines))
+    lines = ["%10d bytes: %10.2f us" % x for x in sorted(results['alltoall'].items())]
+    easyblock.log.info("Results for MPI alltoall benchmark (%d ranks):\n%s", params['nr_ranks'], '\n'.join(lines))
+    if easyblock.logfile:
+        write_file(os.path.splitext(easyblock.logfile)[0] + '-mpi-benchmark.json', json.dumps(results, indent=2))
+
+    errors = check_mpi_benchmark_results(results, max_latency=easyblock.cfg['mpi_benchmark_max_latency'],
+                                         min_bandwidth=easyblock.cfg['mpi_benchmark_min_bandwidth'])
+    if errors:
+        raise EasyBuildError("MPI benchmark on local node shows poor performance, "
+                             "check which transport is used for intra-node communication: %s", '; '.join(errors))
@@ -27,6 +27,8 @@ EasyBuild support for OCaml packages, implemented as an easyblock
 
 @author: Kenneth Hoste (Ghent University)
 """
+from easybuild.easyblocks.ocaml import EXTS_FILTER_OCAML_PACKAGES, mk_opam_install_cmd, parse_opam_list
+from easybuild.easyblocks.generic.extensionhelpers import det_ext_batch, ext_pkgs_list_sanity_check
 from easybuild.framework.extensioneasyblock import ExtensionEasyBlock
 from easybuild.tools.build_log import EasyBuildError
 from easybuild.tools.run import run_shell_cmd
@@ -41,9 +43,34 @@ class OCamlPackage(ExtensionEasyBlock):
 
     def install_extension(self):
         """Perform OCaml package installation (as extension)."""
-        # install using 'opam install'
-        run_shell_cmd("eval `opam config env` && opam install -yv %s.%s" % (self.name, self.version))
+        if not self.is_extension:
+            run_shell_cmd(mk_opam_install_cmd([(self.name, self.version)], parallel=self.cfg.parallel))
+            return
 
-        # 'opam pin add' fixes the version of the package
-        # see https://opam.ocaml.org/doc/Usage.html#opampin
-        run_shell_cmd("eval `opam config env` && opam pin -yv add %s %s" % (self.name, self.version))
+        # install OCaml packages that are installed as extensions with a single 'opam install' command,
+        # so the dependencies are resolved only once and packages can be built in parallel;
+        # this is done for the contiguous run of these extensions that starts at the current extension
+        installed = getattr(self.master, 'opam_pkgs_installed', set())
+        if (self.name, self.version) in installed:
+            self.log.info("OCaml package %s was already installed together with other OCaml packages", self.name)
+        else:
+            pkgs = [(ext.name, ext.version) for ext in det_ext_batch(self, lambda ext: isinstance(ext, OCamlPackage))]
+            self.log.info("Installing %d OCaml packages with a single 'opam install' command: %s",
+                          len(pkgs), ', '.join('%s.%s' % pkg for pkg in pkgs))
+            run_shell_cmd(mk_opam_install_cmd(pkgs, parallel=self.master.cfg.parallel))
+            self.master.opam_pkgs_installed = installed | set(pkgs)
+
+    def sanity_check_step(self, *args, **kwargs):
+        """
+        Custom sanity check for OCaml packages
+        """
+        # for OCaml packages installed as extensions, check output of single 'opam list' command
+        # rather than running opam for every extension
+        if not (args or kwargs):
+            res = ext_pkgs_list_sanity_check(self, EXTS_FILTER_OCAML_PACKAGES,
+                                             "eval `opam config env` && opam list --installed",
+                                             parse_opam_list, 'opam_list_installed')
+            if res is not None:
+                return res
+
+        return super().sanity_check_step(EXTS_FILTER_OCAML_PACKAGES, *args, **kwargs)
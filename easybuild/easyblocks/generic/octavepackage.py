@@ -31,6 +31,8 @@ EasyBuild support for building and installing Octave, implemented as an easybloc
 import os
 import tempfile
 
+from easybuild.easyblocks.octave import EXTS_FILTER_OCTAVE_PACKAGES, parse_octave_pkg_list
+from easybuild.easyblocks.generic.extensionhelpers import det_ext_batch, ext_pkgs_list_sanity_check
 from easybuild.framework.extensioneasyblock import ExtensionEasyBlock
 from easybuild.tools.build_log import EasyBuildError
 from easybuild.tools.filetools import change_dir
@@ -44,9 +46,12 @@ class OctavePackage(ExtensionEasyBlock):
         """Raise error when configure step is run: installing Octave toolboxes stand-alone is not supported (yet)"""
         raise EasyBuildError("Installing Octave toolboxes stand-alone is not supported (yet)")
 
-    def install_extension(self):
-        """Perform Octave package installation (as extension)."""
+    def prepare_octave_pkg_src(self):
+        """
+        Prepare source tarball to install Octave package from.
 
+        :return: path to source tarball
+        """
         # if patches are specified, we need to unpack the source tarball, apply the patch,
         # and create a temporary tarball to use for installation
         if self.patches:
@@ -61,12 +66,58 @@ class OctavePackage(ExtensionEasyBlock):
         else:
             src = self.src
 
+        return src
+
+    def install_octave_pkgs(self, exts):
+        """
+        Install specified Octave packages in a single Octave session.
+        """
+        srcs = []
+        cwd = os.getcwd()
+        for ext in exts:
+            srcs.append(ext.prepare_octave_pkg_src())
+        change_dir(cwd)
+
         # need to specify two install locations, to avoid that $HOME/octave is abused;
         # one general package installation prefix, one for architecture-dependent files
         pkg_prefix = os.path.join(self.installdir, 'share', 'octave', 'packages')
         pkg_arch_dep_prefix = pkg_prefix + '-arch-dep'
         octave_cmd = "pkg prefix %s %s; " % (pkg_prefix, pkg_arch_dep_prefix)
 
-        octave_cmd += "pkg install -global %s" % src
+        # Octave takes into account dependencies between packages that are installed together
+        octave_cmd += "pkg install -global %s" % ' '.join(srcs)
 
         run_shell_cmd("octave --eval '%s'" % octave_cmd)
+
+    def install_extension(self):
+        """Perform Octave package installation (as extension)."""
+
+        if not self.is_extension:
+            self.install_octave_pkgs([self])
+            return
+
+        # install Octave packages that are installed as extensions in a single Octave session, since starting Octave
+        # is slow; this is done for the contiguous run of these extensions that starts at the current extension
+        installed = getattr(self.master, 'octave_pkgs_installed', set())
+        if self.name in installed:
+            self.log.info("Octave package %s was already installed together with other Octave packages", self.name)
+        else:
+            exts = det_ext_batch(self, lambda ext: isinstance(ext, OctavePackage) and ext.src)
+            self.log.info("Installing %d Octave packages in a single Octave session: %s",
+                          len(exts), ', '.join(ext.name for ext in exts))
+            self.install_octave_pkgs(exts)
+            self.master.octave_pkgs_installed = installed | set(ext.name for ext in exts)
+
+    def sanity_check_step(self, *args, **kwargs):
+        """
+        Custom sanity check for Octave packages
+        """
+        # for Octave packages installed as extensions, check output of single 'pkg list' command
+        # rather than running Octave for every extension
+        if not (args or kwargs):
+            res = ext_pkgs_list_sanity_check(self, EXTS_FILTER_OCTAVE_PACKAGES, "octave --eval 'pkg list'",
+                                             parse_octave_pkg_list, 'octave_pkg_list')
+            if res is not None:
+                return res
+
+        return super().sanity_check_step(EXTS_FILTER_OCTAVE_PACKAGES, *args, **kwargs)
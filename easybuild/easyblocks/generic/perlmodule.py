@@ -28,17 +28,98 @@ EasyBuild support for Perl module, implemented as an easyblock
 @author: Jens Timmerman (Ghent University)
 @author: Kenneth Hoste (Ghent University)
 """
+import json
 import os
+import re
+import tarfile
 
 from easybuild.easyblocks.perl import EXTS_FILTER_PERL_MODULES, get_major_perl_version, get_site_suffix
 from easybuild.framework.easyconfig import CUSTOM
 from easybuild.framework.extensioneasyblock import ExtensionEasyBlock
+from easybuild.easyblocks.generic.extensionhelpers import track_ext_install_duration
 from easybuild.easyblocks.generic.configuremake import ConfigureMake
 from easybuild.tools.build_log import EasyBuildError
 from easybuild.tools.config import build_option
 from easybuild.tools.run import run_shell_cmd, RunShellCmdError
 from easybuild.tools.environment import unset_env_vars
 
+# marker printed when tests of a Perl module that is installed asynchronously fail
+PERL_TEST_FAILURE_MARKER = 'EASYBUILD_PERL_MODULE_TEST_FAILURE'
+
+# 'key: value' line in META.yml, taking into account that keys may include '::'
+PERL_META_YML_KEY_VALUE_REGEX = re.compile(r"^(?P<quote>['\"]?)(?P<key>.+?)(?P=quote):(?:\s+(?P<value>.*))?$")
+
+# phases of prerequisites in META.json (and corresponding keys in META.yml) that are relevant for installation
+PERL_META_PHASES = {
+    'configure': 'configure_requires',
+    'build': 'build_requires',
+    'test': 'test_requires',
+    'runtime': 'requires',
+}
+
+
+def parse_perl_meta_yml(txt):
+    """
+    Parse relevant parts of META.yml (CPAN::Meta::Spec v1.x) of a Perl module: name, prerequisites, provided modules.
+
+    Only the simple mapping structure used in META.yml files is supported, to avoid requiring a YAML parser.
+    """
+    meta = {'name': None, 'prereqs': {}, 'provides': {}}
+    phase_keys = {key: phase for (phase, key) in PERL_META_PHASES.items()}
+
+    top_key, indent = None, None
+    for line in txt.splitlines():
+        if not line.strip() or line.lstrip().startswith('#'):
+            continue
+        res = PERL_META_YML_KEY_VALUE_REGEX.match(line.strip())
+        if not res:
+            continue
+        key, value = res.group('key'), (res.group('value') or '').strip().strip('\'"')
+        if not line[0].isspace():
+            top_key, indent = None, None
+            if key == 'name':
+                meta['name'] = value
+            elif not value and (key in phase_keys or key == 'provides'):
+                top_key = key
+            continue
+        if top_key:
+            line_indent = len(line) - len(line.lstrip())
+            if indent is None:
+                indent = line_indent
+            if line_indent == indent:
+                if top_key == 'provides':
+                    meta['provides'][key] = {}
+                else:
+                    phase = phase_keys[top_key]
+                    meta['prereqs'].setdefault(phase, {}).setdefault('requires', {})[key] = value
+
+    return meta
+
+
+def get_perl_meta(src):
+    """
+    Obtain metadata from META.json or META.yml in top-level directory of Perl module source tarball.
+    The tarball is read in streaming mode, and reading stops once META.json is found.
+
+    :param src: path to source tarball
+    :return: dict with metadata (using CPAN::Meta::Spec v2 structure), or None if no metadata was found
+    """
+    meta_yml = None
+    try:
+        with tarfile.open(src, 'r|*') as tar:
+            for member in tar:
+                parts = member.name.strip('./').split('/')
+                if len(parts) != 2 or not member.isfile() or parts[1] not in ('META.json', 'META.yml'):
+                    continue
+                txt = tar.extractfile(member).read().decode('utf-8', 'ignore')
+                if parts[1] == 'META.json':
+                    return json.loads(txt)
+                meta_yml = parse_perl_meta_yml(txt)
+    except (OSError, tarfile.TarError, ValueError):
+        return None
+
+    return meta_yml
+
 
 class PerlModule(ExtensionEasyBlock, ConfigureMake):
     """Builds and installs a Perl module, and can provide a dedicated module file."""
@@ -56,6 +137,8 @@ class PerlModule(ExtensionEasyBlock, ConfigureMake):
         """Initialize custom class variables."""
         super().__init__(*args, **kwargs)
         self.testcmd = None
+        self._perl_meta = None
+        self._required_deps = None
 
         # Environment variables PERL_MM_OPT and PERL_MB_OPT cause installations to fail.
         # Therefore it is better to unset these variables.
@@ -131,6 +214,121 @@ class PerlModule(ExtensionEasyBlock, ConfigureMake):
 
         self.install_perl_module()
 
+    def perl_module_cmd(self):
+        """
+        Compose single shell command to configure, build, test and install Perl module (from current directory).
+        Failing tests are reported via a marker in the output, see post_install_extension.
+        """
+        prefix_opt = self.cfg.get('prefix_opt')
+        runtest = self.cfg['runtest']
+        if not isinstance(runtest, str):
+            runtest = 'test' if runtest else ''
+        if build_option('skip_test_step'):
+            runtest = ''
+
+        if os.path.exists('Makefile.PL'):
+            if prefix_opt is None:
+                prefix_opt = 'PREFIX'
+            configure_cmd = f"perl Makefile.PL {prefix_opt}={self.installdir}"
+            build_cmd, test_cmd, install_cmd = 'make', f'make {runtest}', 'make install'
+        elif os.path.exists('Build.PL'):
+            if prefix_opt is None:
+                prefix_opt = '--prefix'
+            configure_cmd = f"perl Build.PL {prefix_opt} {self.installdir}"
+            build_cmd, test_cmd, install_cmd = 'perl Build build', f'perl Build {runtest}', 'perl Build install'
+        else:
+            raise EasyBuildError("Neither Makefile.PL nor Build.PL found for Perl module %s", self.name)
+
+        cmds = [
+            ' '.join([self.cfg['preconfigopts'], configure_cmd, self.cfg['configopts']]),
+            ' '.join([self.cfg['prebuildopts'], build_cmd, self.cfg['buildopts']]),
+        ]
+        if runtest:
+            test_cmd = ' '.join([self.cfg['pretestopts'], test_cmd, self.cfg['testopts']])
+            cmds.append(f"({test_cmd} || echo {PERL_TEST_FAILURE_MARKER})")
+        cmds.append(' '.join([self.cfg['preinstallopts'], install_cmd, self.cfg['installopts']]))
+
+        return ' && '.join(cmds)
+
+    def install_extension_async(self, thread_pool):
+        """
+        Start installation of Perl module as an extension asynchronously.
+        """
+        if not self.src:
+            raise EasyBuildError("No source found for Perl module %s, required for installation. (src: %s)",
+                                 self.name, self.src)
+        ExtensionEasyBlock.install_extension(self, unpack_src=True)
+
+        cmd = self.perl_module_cmd()
+        task_id = f'ext_{self.name}_{self.version}'
+        task = thread_pool.submit(run_shell_cmd, cmd, asynchronous=True, env=os.environ.copy(),
+                                  fail_on_error=False, task_id=task_id, work_dir=os.getcwd())
+        return track_ext_install_duration(self, task)
+
+    def post_install_extension(self):
+        """
+        Stuff to do after installing Perl module as an extension.
+
+        Output of installation command that was run asynchronously is checked for failing tests,
+        since exit code of test command is masked, see perl_module_cmd.
+        """
+        task = getattr(self, 'async_cmd_task', None)
+        if task is not None and task.done() and PERL_TEST_FAILURE_MARKER in (task.result().output or ''):
+            self.report_test_failure(f"Tests failed for Perl module {self.name}")
+
+        super().post_install_extension()
+
+    @property
+    def perl_meta(self):
+        """Metadata for this Perl module, obtained from META.json/META.yml in source tarball ({} if unknown)."""
+        if self._perl_meta is None:
+            self._perl_meta = (get_perl_meta(self.src) if self.src else None) or {}
+        return self._perl_meta
+
+    @property
+    def provided_modules(self):
+        """Set of names of Perl modules that are (assumed to be) provided by this Perl module."""
+        names = {self.name, self.name.replace('-', '::')}
+        dist_name = self.perl_meta.get('name')
+        if dist_name:
+            names.update([dist_name, dist_name.replace('-', '::')])
+        names.update(self.perl_meta.get('provides') or {})
+        return names
+
+    @property
+    def required_deps(self):
+        """
+        Return list of names of extensions that are required to install this Perl module,
+        based on prerequisites listed in META.json/META.yml in source tarball.
+        """
+        if self._required_deps is None:
+            if not self.perl_meta or not self.is_extension:
+                return None
+
+            required_modules = set()
+            prereqs = self.perl_meta.get('prereqs') or {}
+            for phase in PERL_META_PHASES:
+                required_modules.update((prereqs.get(phase) or {}).get('requires') or {})
+            required_modules -= {'perl'} | self.provided_modules
+
+            # only extensions listed before this one are considered, since the order in which extensions are listed
+            # is known to work for sequential installation (this also avoids circular dependencies)
+            deps = []
+            for ext in self.master.ext_instances:
+                if ext is self:
+                    break
+                if not isinstance(ext, PerlModule):
+                    continue
+                provided = ext.provided_modules
+                # also consider namespace prefixes, e.g. LWP::UserAgent is provided by LWP
+                if any(mod in provided or any(mod.startswith(p + '::') for p in provided) for mod in required_modules):
+                    deps.append(ext.name)
+
+            self._required_deps = deps
+            self.log.info("Required dependencies for %s: %s", self.name, self._required_deps)
+
+        return self._required_deps
+
     def configure_step(self):
         """No separate configuration for Perl modules."""
         pass
@@ -37,14 +37,25 @@ import pathlib
 import re
 
 from easybuild.easyblocks.r import EXTS_FILTER_R_PACKAGES, EB_R
+from easybuild.easyblocks.r import get_r_description, get_r_description_deps
+from easybuild.easyblocks.r import make_r_exts_sanity_check_script, parse_r_exts_sanity_check_output
+from easybuild.easyblocks.generic.extensionhelpers import MAKE_JOBSERVER_FIFO, make_jobserver_cmd
+from easybuild.easyblocks.generic.extensionhelpers import make_jobserver_makeflags, start_make_jobserver
+from easybuild.easyblocks.generic.extensionhelpers import track_ext_install_duration
 from easybuild.easyblocks.generic.configuremake import check_config_guess, obtain_config_guess
 from easybuild.framework.easyconfig import CUSTOM
 from easybuild.framework.extensioneasyblock import ExtensionEasyBlock
+from easybuild.tools import LooseVersion
 from easybuild.tools.build_log import EasyBuildError, print_warning
 from easybuild.tools.environment import setvar
 from easybuild.tools.filetools import mkdir, copy_file
 from easybuild.tools.run import run_shell_cmd
 
+# GNU make supports jobservers based on a named pipe (--jobserver-auth=fifo:PATH) since version 4.4;
+# older versions require inheriting file descriptors, which is not possible via run_shell_cmd
+MAKE_JOBSERVER_MIN_VERSION = '4.4'
+MAKE_VERSION_REGEX = re.compile(r'^GNU Make\s+(?P<version>[0-9][0-9.]*)', re.M)
+
 
 def make_R_install_option(opt, values, cmdline=False):
     """
@@ -65,6 +76,15 @@ def make_R_install_option(opt, values, cmdline=False):
     return txt
 
 
+def det_make_version():
+    """
+    Determine version of GNU make that is available in $PATH (None if it could not be determined).
+    """
+    res = run_shell_cmd("make --version", fail_on_error=False, hidden=True)
+    res = MAKE_VERSION_REGEX.search(res.output) if res.exit_code == 0 else None
+    return res.group('version') if res else None
+
+
 class RPackage(ExtensionEasyBlock):
     """
     Install an R package as a separate module, or as an extension.
@@ -225,45 +245,14 @@ class RPackage(ExtensionEasyBlock):
 
         if self._required_deps is None:
             if self.src:
-                cmd = "tar --wildcards --extract --file %s --to-stdout '*DESCRIPTION'" % self.src
-                res = run_shell_cmd(cmd, hidden=True)
-
-                # lines that start with whitespace are merged with line above
-                lines = []
-                for line in res.output.splitlines():
-                    if line and line[0] in (' ', '\t'):
-                        lines[-1] = lines[-1] + line
-                    else:
-                        lines.append(line)
-                out = '\n'.join(lines)
-
-                pkg_key = 'Package:'
-                deps_map = {}
-                deps = []
-                pkg = None
-
-                for line in out.splitlines():
-                    if pkg_key in line:
-                        if pkg is not None:
-                            deps = []
-
-                        pkg_name_regex = re.compile(r'Package:\s*([^ ]+)')
-                        res = pkg_name_regex.search(line)
-                        if res:
-                            pkg = res.group(1)
-                            if pkg in deps_map:
-                                deps = deps_map[pkg]
-                        else:
-                            raise EasyBuildError("Failed to determine package name from line '%s'", line)
-
-                        deps_map[pkg] = deps
-
-                    elif any(line.startswith(x) for x in ('Depends:', 'Imports:', 'LinkingTo:')):
-                        # entries may specify version requirements between brackets (which we don't care about here)
-                        dep_names = [x.split('(')[0].strip() for x in line.split(':', 1)[1].split(',')]
-                        deps.extend([d for d in dep_names if d not in ('', 'R', self.name)])
-
-                self._required_deps = deps_map.get(self.name, [])
+                description = get_r_description(self.src)
+                if description is None:
+                    self.log.warning("No DESCRIPTION file found in %s, assuming no required dependencies", self.src)
+                    self._required_deps = []
+                elif description.get('Package') == self.name:
+                    self._required_deps = [dep for dep in get_r_description_deps(description) if dep != self.name]
+                else:
+                    self._required_deps = []
                 self.log.info("Required dependencies for %s: %s", self.name, self._required_deps)
             else:
                 # no source => no required dependencies assumed
@@ -320,9 +309,58 @@ class RPackage(ExtensionEasyBlock):
         Start installation of R package as an extension asynchronously.
         """
         cmd, stdin = self.prepare_r_ext_install()
+        env = os.environ.copy()
+
+        # share a GNU make jobserver across all R packages being installed concurrently,
+        # so compilation of packages that are still being installed can use idle cores;
+        # can be disabled for specific packages via 'make_jobserver' extension option
+        jobserver = self.get_make_jobserver()
+        if jobserver and self.options.get('make_jobserver', True):
+            path, slots = jobserver
+            makeflags = env.get('MAKEFLAGS')
+            if makeflags and 'jobserver' in makeflags:
+                self.log.info("Not using shared make jobserver for %s, $MAKEFLAGS already specifies one: %s",
+                              self.name, makeflags)
+            else:
+                env['MAKEFLAGS'] = make_jobserver_makeflags(path, slots, makeflags=makeflags)
+                cmd = make_jobserver_cmd(cmd, path)
+                self.log.debug("Using shared make jobserver for %s: $MAKEFLAGS=%s", self.name, env['MAKEFLAGS'])
+
         task_id = f'ext_{self.name}_{self.version}'
-        return thread_pool.submit(run_shell_cmd, cmd, stdin=stdin, asynchronous=True, env=os.environ.copy(),
+        task = thread_pool.submit(run_shell_cmd, cmd, stdin=stdin, asynchronous=True, env=env,
                                   fail_on_error=False, task_id=task_id, work_dir=os.getcwd())
+        return track_ext_install_duration(self, task)
+
+    def get_make_jobserver(self):
+        """
+        Get GNU make jobserver that is shared across R packages installed in parallel as extensions,
+        with as many tokens as the number of cores that can be used.
+
+        The jobserver is created in the parent installation, so this is only done once for all extensions,
+        and only if the parent installation stops it again at the end of its extensions step
+        (see stop_exts_make_jobserver).
+
+        :return: (path to named pipe, number of tokens) tuple, or None if no jobserver can be used
+        """
+        jobserver = getattr(self.master, 'exts_make_jobserver', False)
+        if jobserver is None:
+            jobserver = False
+            slots = self.master.cfg.parallel
+            make_version = det_make_version()
+            if slots <= 1:
+                self.log.info("Not using shared make jobserver for R packages, parallel=%s", slots)
+            elif make_version is None or LooseVersion(make_version) < LooseVersion(MAKE_JOBSERVER_MIN_VERSION):
+                self.log.info("Not using shared make jobserver for R packages, requires GNU make >= %s (found: %s)",
+                              MAKE_JOBSERVER_MIN_VERSION, make_version)
+            else:
+                path = os.path.join(self.master.builddir, MAKE_JOBSERVER_FIFO)
+                # file descriptor is kept to keep named pipe open during installation of extensions
+                jobserver = (path, slots, start_make_jobserver(path, slots))
+                self.log.info("Started make jobserver with %d tokens for R packages: %s", slots, path)
+
+            self.master.exts_make_jobserver = jobserver
+
+        return jobserver[:2] if jobserver else None
 
     def async_cmd_check(self):
         """
@@ -338,10 +376,63 @@ class RPackage(ExtensionEasyBlock):
 
         return done
 
+    def r_exts_sanity_check(self):
+        """
+        Check whether all R packages installed as extensions can be loaded, in a single R session
+        that uses a pool of forked worker processes.
+
+        Results are stored in the parent installation, so this is only done once for all extensions.
+
+        :return: dict with (success, error message, load time) tuple for each R package
+        """
+        results = getattr(self.master, 'r_exts_sanity_check_results', None)
+        if results is None:
+            pkgs = []
+            for ext in self.master.ext_instances:
+                modname = ext.options.get('modulename', ext.name)
+                if isinstance(ext, RPackage) and modname:
+                    pkgs.append(modname)
+
+            cmd = EXTS_FILTER_R_PACKAGES[0]
+            self.log.info("Checking whether %d R packages can be loaded in a single R session", len(pkgs))
+            res = run_shell_cmd(cmd, stdin=make_r_exts_sanity_check_script(pkgs, self.master.cfg.parallel),
+                                fail_on_error=False, hidden=True)
+            results = parse_r_exts_sanity_check_output(res.output)
+            if res.exit_code:
+                self.log.warning("Batched sanity check for R packages failed (exit code %s), output:\n%s",
+                                 res.exit_code, res.output)
+
+            load_times = sorted((t, pkg) for pkg, (_, _, t) in results.items() if t is not None)[::-1]
+            self.log.info("R packages that took longest to load: %s",
+                          ', '.join('%s (%.2fs)' % (pkg, t) for t, pkg in load_times[:10]))
+
+            self.master.r_exts_sanity_check_results = results
+
+        return results
+
     def sanity_check_step(self, *args, **kwargs):
         """
         Custom sanity check for R packages
         """
+        # for R packages installed as extensions using the default filter, use results of batched sanity check;
+        # fall back to regular sanity check if no result is available for this package
+        exts_filter = self.cfg.get_ref('exts_filter')
+        default_filter = exts_filter is None or tuple(exts_filter) == EXTS_FILTER_R_PACKAGES
+        if self.is_extension and default_filter and not (args or kwargs or self.dry_run):
+            modname = self.options.get('modulename', self.name)
+            if modname is False:
+                self.log.info("modulename set to False for '%s' extension, so skipping sanity check", self.name)
+                return (True, '')
+            res = self.r_exts_sanity_check().get(modname)
+            if res is not None:
+                success, error, load_time = res
+                if success:
+                    self.log.info("R package %s loaded successfully in %ss", modname, load_time)
+                    return (True, '')
+                fail_msg = "loading R package %s via library(%s) failed: %s" % (modname, modname, error)
+                self.log.warning("Sanity check for '%s' extension failed: %s", self.name, fail_msg)
+                return (False, fail_msg)
+
         return super().sanity_check_step(EXTS_FILTER_R_PACKAGES, *args, **kwargs)
 
     def make_module_extra(self, *args, **kwargs):
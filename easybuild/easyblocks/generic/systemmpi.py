@@ -30,10 +30,12 @@ EasyBuild support for using (already installed/existing) system MPI instead of a
 import os
 import re
 
+import easybuild.tools.toolchain as toolchain
 from easybuild.easyblocks.generic.bundle import Bundle
 from easybuild.easyblocks.generic.configuremake import ConfigureMake
 from easybuild.easyblocks.generic.systemcompiler import extract_compiler_version
 from easybuild.easyblocks.impi import EB_impi
+from easybuild.easyblocks.generic.mpihelpers import run_mpi_benchmark
 from easybuild.framework.easyconfig import CUSTOM
 from easybuild.tools.build_log import EasyBuildError, print_warning
 from easybuild.tools.filetools import read_file, resolve_path, which
@@ -325,5 +327,16 @@ class SystemMPI(Bundle, ConfigureMake, EB_impi):
         """
         self.log.info("Testing loading of module '%s' by means of sanity check" % self.full_mod_name)
         fake_mod_data = self.load_fake_module(purge=True)
-        self.log.debug("Cleaning up after testing loading of module")
-        self.clean_up_fake_module(fake_mod_data)
+        try:
+            if self.cfg['mpi_benchmark']:
+                mpi_name = self.cfg['name'].lower()
+                if mpi_name in ('openmpi', 'spectrummpi'):
+                    mpi_family = toolchain.OPENMPI
+                elif mpi_name == 'impi':
+                    mpi_family = toolchain.INTELMPI
+                else:
+                    mpi_family = toolchain.MPICH
+                run_mpi_benchmark(self, mpi_family, mpi_version=getattr(self, 'mpi_version', None))
+        finally:
+            self.log.debug("Cleaning up after testing loading of module")
+            self.clean_up_fake_module(fake_mod_data)
@@ -31,6 +31,7 @@ EasyBuild support for building and installing HPCC, implemented as an easyblock
 import os
 
 from easybuild.easyblocks.hpl import EB_HPL
+from easybuild.tools.build_log import EasyBuildError
 from easybuild.tools.filetools import copy_file, mkdir
 
 
@@ -45,6 +46,10 @@ class EB_HPCC(EB_HPL):
         """
         Create Make.UNKNOWN file to build from
         """
+        if self.cfg['autotune']:
+            # hpcc reads its input from hpccinf.txt, so a tuned HPL.dat would not be used
+            raise EasyBuildError("Autotuning is only supported for HPL, not for HPCC")
+
         # the build script file should be created in the hpl subdir
         super().configure_step(subdir='hpl')
 
@@ -28,21 +28,116 @@ EasyBuild support for building and installing HPCG, implemented as an easyblock
 @author: Kenneth Hoste (Ghent University)
 """
 import glob
+import json
 import os
 import re
 import shutil
 
 from easybuild.easyblocks.generic.configuremake import ConfigureMake
-from easybuild.tools.build_log import EasyBuildError
+from easybuild.framework.easyconfig import CUSTOM
+from easybuild.tools.build_log import EasyBuildError, print_warning
 from easybuild.tools.config import build_option
-from easybuild.tools.filetools import mkdir
+from easybuild.tools.filetools import mkdir, read_file, write_file
 from easybuild.tools.run import run_shell_cmd
 from easybuild.tools import LooseVersion
 
+HPCG_RESULTS_FILE = 'hpcg-results.json'
+
+HPCG_KERNELS = ['DDOT', 'WAXPBY', 'SpMV', 'MG', 'Total']
+HPCG_BANDWIDTHS = ['Read', 'Write', 'Total']
+
+
+def parse_hpcg_summary(txt):
+    """
+    Parse official summary produced by HPCG (HPCG-Benchmark*.txt or *.yaml)
+
+    Supports both 'Section::Key=Value' (HPCG >= 3.0) and YAML-style (HPCG 2.x) formats.
+
+    :return: dict with final GFLOP/s rating, whether result is valid,
+             GFLOP/s per kernel (DDOT, WAXPBY, SpMV, MG, Total) and memory bandwidth estimates in GB/s
+    """
+    entries = {}
+    section = None
+    for line in txt.splitlines():
+        if '::' in line and '=' in line:
+            section, key_value = line.split('::', 1)
+            key, value = key_value.split('=', 1)
+        elif re.match(r'^\S.*:\s*$', line):
+            section = line.strip().rstrip(':')
+            continue
+        elif line.startswith(' ') and ':' in line and section:
+            key, value = line.rsplit(':', 1)
+        else:
+            continue
+        entries[(section.strip(), key.strip())] = value.strip()
+
+    def to_float(value):
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            return None
+
+    results = {
+        'rating': None,
+        'valid': False,
+        'gflops': {},
+        'bandwidth': {},
+    }
+    for (section, key), value in entries.items():
+        if section == 'Final Summary' and key.startswith('HPCG result is'):
+            results['valid'] = 'VALID' in key.split() and 'rating' in key
+            results['rating'] = to_float(value)
+        elif section == 'GFLOP/s Summary':
+            for kernel in HPCG_KERNELS:
+                if key == f'Raw {kernel}':
+                    results['gflops'][kernel] = to_float(value)
+        elif section == 'GB/s Summary':
+            for bandwidth in HPCG_BANDWIDTHS:
+                if key == f'Raw {bandwidth} B/W':
+                    results['bandwidth'][bandwidth] = to_float(value)
+
+    return results
+
+
+def compare_hpcg_results(results, baseline, max_regression):
+    """
+    Compare HPCG results against baseline results
+
+    :param results: HPCG results, as produced by parse_hpcg_summary
+    :param baseline: HPCG baseline results, as produced by parse_hpcg_summary
+    :param max_regression: maximal relative performance regression that is tolerated
+    :return: list of regressions, as (metric, value, baseline value) tuples
+    """
+    metrics = [('rating', results.get('rating'), baseline.get('rating'))]
+    for key in ('gflops', 'bandwidth'):
+        for name, value in sorted(results.get(key, {}).items()):
+            metrics.append((f'{key}/{name}', value, baseline.get(key, {}).get(name)))
+
+    return [(metric, value, base_value) for (metric, value, base_value) in metrics
+            if value is not None and base_value and value < base_value * (1 - max_regression)]
+
 
 class EB_HPCG(ConfigureMake):
     """Support for building/installing HPCG."""
 
+    @staticmethod
+    def extra_options(extra_vars=None):
+        """Custom easyconfig parameters for HPCG"""
+        extra_vars = ConfigureMake.extra_options(extra_vars)
+        extra_vars.update({
+            'baseline': [None, "Path to HPCG results (%s) of a previous installation to compare against" %
+                         HPCG_RESULTS_FILE, CUSTOM],
+            'fail_on_regression': [False, "Fail (rather than warn) when HPCG performance regressed "
+                                          "compared to baseline", CUSTOM],
+            'max_regression': [0.05, "Maximal relative performance regression compared to baseline", CUSTOM],
+        })
+        return extra_vars
+
+    def __init__(self, *args, **kwargs):
+        """Initialize HPCG-specific variables."""
+        super().__init__(*args, **kwargs)
+        self.hpcg_results = None
+
     def configure_step(self):
         """Custom configuration procedure for HPCG."""
 
@@ -116,6 +211,43 @@ class EB_HPCG(ConfigureMake):
             except OSError as err:
                 raise EasyBuildError("Failed to check for success in HPCG log file: %s", err)
 
+            self.check_hpcg_summary()
+
+    def check_hpcg_summary(self):
+        """Parse official HPCG summary, and compare against baseline (if specified)."""
+        hpcg_summaries = glob.glob('HPCG-Benchmark*.txt') + glob.glob('HPCG-Benchmark*.yaml')
+        if len(hpcg_summaries) != 1:
+            raise EasyBuildError("Failed to find exactly one HPCG summary file: %s", hpcg_summaries)
+
+        self.hpcg_results = parse_hpcg_summary(read_file(hpcg_summaries[0]))
+        self.log.info("HPCG results: %s", self.hpcg_results)
+
+        baseline_path = self.cfg['baseline']
+        if self.hpcg_results['rating'] is None:
+            # HPCG reports 'HPCG result is=INVALID.' (without a rating) for runs that are not valid for submission,
+            # which is only a problem if results should be compared against a baseline
+            msg = "Failed to determine GFLOP/s rating from HPCG summary file %s" % hpcg_summaries[0]
+            if baseline_path:
+                raise EasyBuildError(msg)
+            print_warning(msg)
+
+        elif baseline_path:
+            try:
+                baseline = json.loads(read_file(baseline_path))
+            except ValueError as err:
+                raise EasyBuildError("Failed to parse HPCG baseline results %s: %s", baseline_path, err)
+
+            regressions = compare_hpcg_results(self.hpcg_results, baseline, self.cfg['max_regression'])
+            if regressions:
+                msg = "HPCG performance regressed compared to baseline %s:\n" % baseline_path
+                msg += '\n'.join(f"{metric}: {value} (baseline: {base_value})"
+                                 for (metric, value, base_value) in regressions)
+                if self.cfg['fail_on_regression']:
+                    raise EasyBuildError(msg)
+                print_warning(msg)
+            else:
+                self.log.info("No HPCG performance regressions found compared to baseline %s", baseline_path)
+
     def install_step(self):
         """Custom install procedure for HPCG."""
         objbindir = os.path.join(self.cfg['start_dir'], 'obj', 'bin')
@@ -125,6 +257,10 @@ class EB_HPCG(ConfigureMake):
         except OSError as err:
             raise EasyBuildError("Failed to copy HPCG files to %s: %s", bindir, err)
 
+        if self.hpcg_results:
+            results_path = os.path.join(self.installdir, HPCG_RESULTS_FILE)
+            write_file(results_path, json.dumps(self.hpcg_results, indent=4, sort_keys=True))
+
     def sanity_check_step(self):
         """Custom sanity check for HPCG."""
         custom_paths = {
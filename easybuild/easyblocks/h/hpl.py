@@ -33,15 +33,113 @@ EasyBuild support for building and installing HPL, implemented as an easyblock
 @author: Davide Grassano (CECAM - EPFL)
 """
 
+import math
 import re
 import os
 
 import easybuild.tools.toolchain as toolchain
 from easybuild.easyblocks.generic.configuremake import ConfigureMake
-from easybuild.tools.build_log import EasyBuildError
+from easybuild.framework.easyconfig import CUSTOM
+from easybuild.tools.build_log import EasyBuildError, print_warning
 from easybuild.tools.config import build_option
-from easybuild.tools.filetools import change_dir, copy_file, mkdir, remove_file, symlink
+from easybuild.tools.filetools import change_dir, copy_file, mkdir, remove_file, symlink, write_file
 from easybuild.tools.run import run_shell_cmd
+from easybuild.tools.systemtools import get_total_memory
+
+HPL_DAT_TEMPLATE = """HPLinpack benchmark input file
+Innovative Computing Laboratory, University of Tennessee
+HPL.out      output file name (if any)
+6            device out (6=stdout,7=stderr,file)
+%(n_cnt)d            # of problems sizes (N)
+%(ns)s        Ns
+%(nb_cnt)d            # of NBs
+%(nbs)s        NBs
+0            PMAP process mapping (0=Row-,1=Column-major)
+%(grid_cnt)d            # of process grids (P x Q)
+%(ps)s        Ps
+%(qs)s        Qs
+16.0         threshold
+1            # of panel fact
+2            PFACTs (0=left, 1=Crout, 2=Right)
+1            # of recursive stopping criterium
+4            NBMINs (>= 1)
+1            # of panels in recursion
+2            NDIVs
+1            # of recursive panel fact.
+1            RFACTs (0=left, 1=Crout, 2=Right)
+1            # of broadcast
+1            BCASTs (0=1rg,1=1rM,2=2rg,3=2rM,4=Lng,5=LnM)
+1            # of lookahead depth
+1            DEPTHs (>=0)
+2            SWAP (0=bin-exch,1=long,2=mix)
+64           swapping threshold
+0            L1 in (0=transposed,1=no-transposed) form
+0            U  in (0=transposed,1=no-transposed) form
+1            Equilibration (0=no,1=yes)
+8            memory alignment in double (> 0)
+"""
+
+# result lines in xhpl output, like:
+# T/V                N    NB     P     Q               Time                 Gflops
+# --------------------------------------------------------------------------------
+# WR11C2R4       29184   192     2     2             123.45             1.3456e+02
+HPL_RESULT_REGEX = re.compile(r"^(?P<tv>W[RC]\S+)\s+(?P<n>[0-9]+)\s+(?P<nb>[0-9]+)\s+(?P<p>[0-9]+)\s+(?P<q>[0-9]+)"
+                              r"\s+(?P<time>[0-9.eE+-]+)\s+(?P<gflops>[0-9.eE+-]+)\s*$", re.M)
+
+
+def make_hpl_dat(ns, nbs, grids):
+    """
+    Compose contents of HPL.dat input file for xhpl
+
+    :param ns: list of problem sizes (N)
+    :param nbs: list of block sizes (NB)
+    :param grids: list of (P, Q) process grids
+    """
+    return HPL_DAT_TEMPLATE % {
+        'n_cnt': len(ns),
+        'ns': ' '.join(str(n) for n in ns),
+        'nb_cnt': len(nbs),
+        'nbs': ' '.join(str(nb) for nb in nbs),
+        'grid_cnt': len(grids),
+        'ps': ' '.join(str(p) for (p, _) in grids),
+        'qs': ' '.join(str(q) for (_, q) in grids),
+    }
+
+
+def det_hpl_process_grids(nranks):
+    """Determine list of P x Q process grids for specified number of MPI ranks (with P <= Q)"""
+    return [(p, nranks // p) for p in range(1, int(math.sqrt(nranks)) + 1) if nranks % p == 0]
+
+
+def det_hpl_problem_sizes(mem_fractions, nbs, total_mem):
+    """
+    Determine list of HPL problem sizes (N), as fractions of total memory
+
+    :param mem_fractions: list of fractions of total memory to use for matrix
+    :param nbs: list of block sizes (NB); problem sizes are rounded down to a multiple of all of them
+    :param total_mem: total memory (in MiB)
+    """
+    multiple = 1
+    for nb in nbs:
+        multiple = multiple * nb // math.gcd(multiple, nb)
+
+    ns = []
+    for mem_fraction in mem_fractions:
+        # matrix of N x N doubles (8 bytes)
+        n = int(math.sqrt(mem_fraction * total_mem * 1024 * 1024 / 8))
+        ns.append(max(multiple, n // multiple * multiple))
+
+    return sorted(set(ns))
+
+
+def parse_hpl_results(output):
+    """
+    Parse result lines from output of xhpl
+
+    :return: list of (T/V, N, NB, P, Q, time, GFLOP/s) tuples
+    """
+    return [(res.group('tv'), int(res.group('n')), int(res.group('nb')), int(res.group('p')), int(res.group('q')),
+             float(res.group('time')), float(res.group('gflops'))) for res in HPL_RESULT_REGEX.finditer(output)]
 
 
 class EB_HPL(ConfigureMake):
@@ -51,6 +149,26 @@ class EB_HPL(ConfigureMake):
     - build with make and install
     """
 
+    @staticmethod
+    def extra_options(extra_vars=None):
+        """Custom easyconfig parameters for HPL"""
+        extra_vars = ConfigureMake.extra_options(extra_vars)
+        extra_vars.update({
+            'autotune': [False, "Run xhpl with generated HPL.dat candidates after testing, "
+                                "and install the best configuration as HPL.dat", CUSTOM],
+            'autotune_all_grids': [False, "Consider all P x Q process grids for autotuning, "
+                                          "rather than only the squarest one", CUSTOM],
+            'autotune_mem_fractions': [[0.25], "Fractions of total memory to use to determine problem sizes (N) "
+                                               "for autotuning", CUSTOM],
+            'autotune_nbs': [[128, 192, 256, 384], "Block sizes (NB) to consider for autotuning", CUSTOM],
+        })
+        return extra_vars
+
+    def __init__(self, *args, **kwargs):
+        """Initialize HPL-specific variables."""
+        super().__init__(*args, **kwargs)
+        self.autotune_results = []
+
     def configure_step(self, subdir=None):
         """
         Create Make.UNKNOWN file to build from
@@ -176,6 +294,43 @@ class EB_HPL(ConfigureMake):
         if nfailed > 0:
             self.report_test_failure("%d tests failed residual checks in xhpl output" % nfailed)
 
+        if self.cfg['autotune']:
+            if build_option('mpi_tests'):
+                self.autotune(srcdir)
+            else:
+                print_warning("MPI tests are disabled, not autotuning HPL")
+
+    def autotune(self, srcdir):
+        """
+        Run xhpl with HPL.dat candidates derived from available memory and cores,
+        and determine best configuration.
+        """
+        nranks = self.cfg.parallel
+        nbs = self.cfg['autotune_nbs']
+        ns = det_hpl_problem_sizes(self.cfg['autotune_mem_fractions'], nbs, get_total_memory())
+        grids = det_hpl_process_grids(nranks)
+        if not self.cfg['autotune_all_grids']:
+            # last grid is the squarest one, which is usually the best performing one
+            grids = grids[-1:]
+        self.log.info("Autotuning HPL using %d ranks: N in %s, NB in %s, P x Q in %s", nranks, ns, nbs, grids)
+
+        # xhpl tries all combinations of problem sizes, block sizes and process grids listed in HPL.dat
+        tunedir = os.path.join(self.builddir, 'hpl_autotune')
+        mkdir(tunedir, parents=True)
+        write_file(os.path.join(tunedir, 'HPL.dat'), make_hpl_dat(ns, nbs, grids))
+
+        # one single-threaded MPI rank per core, to avoid oversubscription by a multi-threaded BLAS library
+        env = dict(os.environ, OMP_NUM_THREADS='1')
+        cmd = self.toolchain.mpi_cmd_for(os.path.join(srcdir, 'xhpl'), nranks)
+        res = run_shell_cmd(cmd, work_dir=tunedir, env=env)
+
+        self.autotune_results = sorted(parse_hpl_results(res.output), key=lambda x: x[-1], reverse=True)
+        if self.autotune_results:
+            (_, n, nb, p, q, _, gflops) = self.autotune_results[0]
+            self.log.info("Best HPL configuration: N=%d NB=%d P=%d Q=%d (%.2f GFLOP/s)", n, nb, p, q, gflops)
+        else:
+            raise EasyBuildError("No results found in output of xhpl while autotuning")
+
     def install_step(self):
         """
         Install by copying files to install dir
@@ -187,6 +342,17 @@ class EB_HPL(ConfigureMake):
             srcfile = os.path.join(srcdir, filename)
             copy_file(srcfile, destdir)
 
+        if self.autotune_results:
+            # install best configuration as HPL.dat, keep original one next to it
+            hpl_dat = os.path.join(destdir, 'HPL.dat')
+            copy_file(hpl_dat, hpl_dat + '.orig')
+            (_, n, nb, p, q, _, _) = self.autotune_results[0]
+            write_file(hpl_dat, make_hpl_dat([n], [nb], [(p, q)]))
+
+            lines = ["%-12s %8s %6s %5s %5s %14s %14s" % ('T/V', 'N', 'NB', 'P', 'Q', 'Time', 'Gflops')]
+            lines.extend("%-12s %8d %6d %5d %5d %14.2f %14.4e" % res for res in self.autotune_results)
+            write_file(os.path.join(destdir, 'HPL-autotune-results.txt'), '\n'.join(lines) + '\n')
+
     def sanity_check_step(self, **kwargs):
         """
         Custom sanity check for HPL
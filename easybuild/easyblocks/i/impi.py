@@ -41,6 +41,7 @@ from easybuild.tools import LooseVersion
 
 import easybuild.tools.toolchain as toolchain
 from easybuild.easyblocks.generic.intelbase import IntelBase
+from easybuild.easyblocks.generic.mpihelpers import mpi_benchmark_extra_options, run_mpi_benchmark
 from easybuild.framework.easyconfig import CUSTOM
 from easybuild.tools.build_log import EasyBuildError
 from easybuild.tools.config import build_option
@@ -70,6 +71,7 @@ class EB_impi(IntelBase):
             'rebuild_f08_bindings': [False, 'Rebuild and replace the Fortran 2008 bindings.'
                                             'Not built by default due to backwards compatibility.', CUSTOM],
         }
+        extra_vars.update(mpi_benchmark_extra_options())
         return IntelBase.extra_options(extra_vars)
 
     def prepare_step(self, *args, **kwargs):
@@ -275,6 +277,14 @@ class EB_impi(IntelBase):
 
         super().sanity_check_step(custom_paths=custom_paths, custom_commands=custom_commands)
 
+        if self.cfg['mpi_benchmark']:
+            fake_mod_data = self.load_fake_module(purge=True)
+            try:
+                compile_cmd = "mpicc -cc=%s" % os.getenv('CC') if os.getenv('CC') else 'mpicc'
+                run_mpi_benchmark(self, toolchain.INTELMPI, mpi_version=self.version, compile_cmd=compile_cmd)
+            finally:
+                self.clean_up_fake_module(fake_mod_data)
+
     def make_module_step(self, *args, **kwargs):
         """
         Set paths for module load environment based on the actual installation files
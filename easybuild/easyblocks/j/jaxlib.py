@@ -36,12 +36,16 @@ import tempfile
 
 from easybuild.tools import LooseVersion
 import easybuild.tools.environment as env
+from easybuild.easyblocks.bazel import bazel_cache_extra_options, bazel_cache_opts, bazel_resource_opts
+from easybuild.easyblocks.bazel import bazel_resources_extra_options, report_bazel_cache, report_bazel_profile
 from easybuild.easyblocks.generic.pythonpackage import PythonPackage
 from easybuild.framework.easyconfig import CUSTOM
 from easybuild.tools.build_log import EasyBuildError
 from easybuild.tools.filetools import apply_regex_substitutions, which
 from easybuild.tools.modules import get_software_root, get_software_version
 
+BAZEL_PROFILE = 'bazel-profile.json.gz'
+
 
 class EB_jaxlib(PythonPackage):
     """Support for installing jaxlib. Extension of the existing PythonPackage easyblock"""
@@ -59,6 +63,8 @@ class EB_jaxlib(PythonPackage):
         extra_vars.update({
             'use_mkl_dnn': [True, "Enable support for Intel MKL-DNN", CUSTOM],
         })
+        extra_vars.update(bazel_cache_extra_options())
+        extra_vars.update(bazel_resources_extra_options())
 
         return extra_vars
 
@@ -98,6 +104,19 @@ class EB_jaxlib(PythonPackage):
             '--action_env=PYTHONPATH',
             '--action_env=EBPYTHONPREFIXES',
         ]
+        # Persistent disk/repository caches (if any), located outside of the build dir to be reused by rebuilds
+        bazel_options.extend(bazel_cache_opts(self.cfg, self.builddir))
+        # Avoid running out of memory during link-heavy phases, and make sure all cores are used
+        if self.cfg['bazel_local_resources']:
+            bazel_version = get_software_version('Bazel')
+            if bazel_version:
+                bazel_options.extend(bazel_resource_opts(LooseVersion(bazel_version), self.cfg.parallel,
+                                                         self.cfg['bazel_ram_fraction']))
+            else:
+                self.log.info("Bazel version not known (not a dependency?), not limiting local resources for Bazel")
+        # Let Bazel write a trace profile of the build, which is analysed afterwards
+        if self.cfg['bazel_profile']:
+            bazel_options.append('--profile=%s' % os.path.join(self.builddir, BAZEL_PROFILE))
         if self.toolchain.options.get('debug', None):
             bazel_options.extend([
                 '--strip=never',
@@ -184,3 +203,10 @@ class EB_jaxlib(PythonPackage):
 
         # Print output of build at the end
         apply_regex_substitutions('build/build.py', [(r'  shell\(command\)', '  print(shell(command))')])
+
+    def build_step(self):
+        """Custom build step for jaxlib: report on use of Bazel disk cache and Bazel profile after building."""
+        super().build_step()
+        report_bazel_cache(self.cfg, self.install_cmd_output, self.log)
+        if self.cfg['bazel_profile']:
+            report_bazel_profile(os.path.join(self.builddir, BAZEL_PROFILE), self.logfile, self.log)
@@ -37,7 +37,9 @@ import os
 from easybuild.tools import LooseVersion
 
 import easybuild.tools.environment as env
+import easybuild.tools.toolchain as toolchain
 from easybuild.easyblocks.generic.configuremake import ConfigureMake
+from easybuild.easyblocks.generic.mpihelpers import mpi_benchmark_extra_options, run_mpi_benchmark
 from easybuild.framework.easyconfig import CUSTOM
 from easybuild.tools.build_log import EasyBuildError
 from easybuild.tools.systemtools import get_shared_lib_ext
@@ -52,6 +54,9 @@ class EB_MPICH(ConfigureMake):
     - basically redefinition of environment variables
     """
 
+    # template for command to run MPI benchmark (None implies using default for MPICH)
+    mpi_benchmark_cmd_template = None
+
     @staticmethod
     def extra_options(extra_vars=None):
         """Define custom easyconfig parameters specific to MPICH."""
@@ -61,6 +66,7 @@ class EB_MPICH(ConfigureMake):
             'device': ['ch4', "Device to use for MPICH (e.g. ch4, ch3)", CUSTOM],
             'mpi_abi': [False, "Enable build with MPI ABI compatibility", CUSTOM],
         })
+        extra_vars.update(mpi_benchmark_extra_options())
         return extra_vars
 
     # MPICH configure script complains when F90 or F90FLAGS are set,
@@ -236,3 +242,15 @@ class EB_MPICH(ConfigureMake):
         custom_paths.setdefault('files', []).extend(bins + headers + libs)
 
         super().sanity_check_step(custom_paths=custom_paths)
+
+        if self.cfg['mpi_benchmark']:
+            self.run_mpi_benchmark()
+
+    def run_mpi_benchmark(self):
+        """Run MPI benchmark on local node, with (fake) module for this installation loaded."""
+        fake_mod_data = self.load_fake_module(purge=True)
+        try:
+            run_mpi_benchmark(self, toolchain.MPICH, mpi_version=self.version,
+                              mpi_cmd_template=self.mpi_benchmark_cmd_template)
+        finally:
+            self.clean_up_fake_module(fake_mod_data)
@@ -36,11 +36,12 @@ import easybuild.tools.config as config
 import easybuild.tools.environment as env
 import easybuild.tools.toolchain as toolchain
 from easybuild.tools import LooseVersion
+from easybuild.easyblocks.generic.filehelpers import adjust_permissions_tree
 from easybuild.easyblocks.generic.configuremake import ConfigureMake
 from easybuild.framework.easyconfig import CUSTOM
 from easybuild.tools.build_log import EasyBuildError
-from easybuild.tools.filetools import (adjust_permissions, change_dir, copy_dir, copy_file, mkdir, remove_file,
-                                       remove_dir, symlink, write_file)
+from easybuild.tools.filetools import (change_dir, copy_dir, copy_file, mkdir, remove_file, remove_dir, symlink,
+                                       write_file)
 from easybuild.tools.modules import get_software_libdir, get_software_root, get_software_version
 from easybuild.tools.run import run_shell_cmd
 
@@ -361,8 +362,7 @@ class EB_NWChem(ConfigureMake):
 
         # fix permissions in data directory
         datadir = os.path.join(self.installdir, 'data')
-        adjust_permissions(datadir, stat.S_IROTH, add=True, recursive=True)
-        adjust_permissions(datadir, stat.S_IXOTH, add=True, recursive=True, onlydirs=True)
+        adjust_permissions_tree(datadir, stat.S_IROTH, dir_perms=stat.S_IXOTH, max_workers=self.cfg.parallel)
 
     def sanity_check_step(self):
         """Custom sanity check for NWChem."""
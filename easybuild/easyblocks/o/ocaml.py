@@ -75,6 +75,34 @@ def mk_opam_init_cmd(root=None):
     return ' '.join(opam_init_cmd)
 
 
+def mk_opam_install_cmd(pkgs, parallel=1):
+    """
+    Construct command to install specified OCaml packages (list of (name, version) tuples) using a single
+    'opam install' command, with versions of packages pinned in advance (without installing them).
+    """
+    # 'opam pin add' fixes the version of the package
+    # see https://opam.ocaml.org/doc/Usage.html#opampin
+    cmds = ["eval `opam config env`"]
+    cmds.extend("opam pin -yv --no-action add %s %s" % pkg for pkg in pkgs)
+    cmds.append("opam install -yv --jobs=%d %s" % (parallel, ' '.join('%s.%s' % pkg for pkg in pkgs)))
+    return ' && '.join(cmds)
+
+
+def parse_opam_list(output):
+    """
+    Parse output of 'opam list --installed' command.
+
+    :return: dict with installed version for each OCaml package
+    """
+    pkgs = {}
+    for line in output.splitlines():
+        fields = line.split()
+        # skip header lines (which start with '#')
+        if len(fields) >= 2 and not fields[0].startswith('#'):
+            pkgs[fields[0]] = fields[1]
+    return pkgs
+
+
 class EB_OCaml(ConfigureMake):
     """Support for building/installing OCaml + opam (+ additional extensions)."""
 
@@ -29,6 +29,7 @@ EasyBuild support for building and installing Octave, implemented as an easybloc
 @author: Kenneth Hoste (Ghent University)
 """
 import os
+import re
 
 from easybuild.easyblocks.generic.configuremake import ConfigureMake
 from easybuild.framework.easyconfig import CUSTOM
@@ -38,6 +39,21 @@ from easybuild.tools.modules import get_software_root
 
 EXTS_FILTER_OCTAVE_PACKAGES = ("octave --eval 'pkg list' | grep packages/%(ext_name)s-%(ext_version)s", '')
 
+# regular expression for lines in output of 'pkg list', like:
+#   control  *|   3.4.0 | /path/to/share/octave/packages/control-3.4.0
+# (a '*' after the package name indicates that the package is loaded)
+OCTAVE_PKG_LIST_REGEX = re.compile(r'^\s*(?P<name>[^\s|*]+)\s*\*?\s*\|\s*(?P<version>[^\s|]+)\s*\|\s*(?P<path>.*?)\s*$',
+                                   re.M)
+
+
+def parse_octave_pkg_list(output):
+    """
+    Parse output of 'pkg list' command in Octave.
+
+    :return: dict with installed version for each Octave package
+    """
+    return {m.group('name'): m.group('version') for m in OCTAVE_PKG_LIST_REGEX.finditer(output)}
+
 
 class EB_Octave(ConfigureMake):
     """Support for building/installing Octave."""
@@ -46,12 +46,13 @@ from easybuild.tools import LooseVersion
 
 import easybuild.tools.environment as env
 import easybuild.tools.toolchain as toolchain
+from easybuild.easyblocks.generic.filehelpers import adjust_permissions_tree
 from easybuild.easyblocks.generic.cmakemake import setup_cmake_env
 from easybuild.framework.easyblock import EasyBlock
 from easybuild.framework.easyconfig import CUSTOM
 from easybuild.toolchains.compiler.fujitsu import TC_CONSTANT_FUJITSU
 from easybuild.tools.build_log import EasyBuildError
-from easybuild.tools.filetools import adjust_permissions, apply_regex_substitutions, mkdir, write_file
+from easybuild.tools.filetools import apply_regex_substitutions, mkdir, write_file
 from easybuild.tools.modules import get_software_root, get_software_version
 from easybuild.tools.run import run_shell_cmd
 from easybuild.tools.systemtools import get_shared_lib_ext, get_cpu_architecture, AARCH64, POWER
@@ -423,17 +424,14 @@ class EB_OpenFOAM(EasyBlock):
     def install_step(self):
         """Building was performed in install dir, so just fix permissions."""
 
-        # fix permissions of OpenFOAM dir
-        fullpath = os.path.join(self.installdir, self.openfoamdir)
-        adjust_permissions(fullpath, stat.S_IROTH, add=True, recursive=True, ignore_errors=True)
-        adjust_permissions(fullpath, stat.S_IXOTH, add=True, recursive=True, onlydirs=True, ignore_errors=True)
-
-        # fix permissions of ThirdParty dir and subdirs (also for 2.x)
+        # fix permissions of OpenFOAM dir, and of ThirdParty dir and subdirs (also for 2.x)
         # if the thirdparty tarball is installed
-        fullpath = os.path.join(self.installdir, self.thrdpartydir)
-        if os.path.exists(fullpath):
-            adjust_permissions(fullpath, stat.S_IROTH, add=True, recursive=True, ignore_errors=True)
-            adjust_permissions(fullpath, stat.S_IXOTH, add=True, recursive=True, onlydirs=True, ignore_errors=True)
+        for subdir in (self.openfoamdir, self.thrdpartydir):
+            fullpath = os.path.join(self.installdir, subdir)
+            if subdir == self.openfoamdir or os.path.exists(fullpath):
+                cnt = adjust_permissions_tree(fullpath, stat.S_IROTH, dir_perms=stat.S_IXOTH,
+                                              max_workers=self.cfg.parallel, ignore_errors=True)
+                self.log.info("Adjusted permissions for %d files and directories in %s", cnt, fullpath)
 
         # create symlinks in the lib directory to all libraries in the mpi subdirectory
         # to make sure they take precedence over the libraries in the dummy subdirectory
@@ -35,6 +35,7 @@ from easybuild.tools import LooseVersion
 import easybuild.tools.environment as env
 import easybuild.tools.toolchain as toolchain
 from easybuild.easyblocks.generic.configuremake import ConfigureMake
+from easybuild.easyblocks.generic.mpihelpers import mpi_benchmark_extra_options, run_mpi_benchmark
 from easybuild.framework.easyconfig.constants import EASYCONFIG_CONSTANTS
 from easybuild.tools.build_log import EasyBuildError
 from easybuild.tools.config import build_option
@@ -46,6 +47,13 @@ from easybuild.tools.toolchain.mpi import get_mpi_cmd_template
 class EB_OpenMPI(ConfigureMake):
     """OpenMPI easyblock."""
 
+    @staticmethod
+    def extra_options(extra_vars=None):
+        """Extra easyconfig parameters specific to OpenMPI."""
+        extra_vars = ConfigureMake.extra_options(extra_vars)
+        extra_vars.update(mpi_benchmark_extra_options())
+        return extra_vars
+
     def configure_step(self):
         """Custom configuration step for OpenMPI."""
 
@@ -266,3 +274,10 @@ class EB_OpenMPI(ConfigureMake):
                     custom_commands.append(mpi_cmd_tmpl % params)
 
         super().sanity_check_step(custom_paths=custom_paths, custom_commands=custom_commands)
+
+        if self.cfg['mpi_benchmark']:
+            fake_mod_data = self.load_fake_module(purge=True)
+            try:
+                run_mpi_benchmark(self, toolchain.OPENMPI, mpi_version=self.version)
+            finally:
+                self.clean_up_fake_module(fake_mod_data)
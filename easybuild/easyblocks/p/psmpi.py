@@ -46,6 +46,9 @@ class EB_psmpi(EB_MPICH):
     * Sets extra MPICH options if required by the easyconfig
     """
 
+    # ParaStationMPI does not provide mpirun
+    mpi_benchmark_cmd_template = "mpiexec -n %(nr_ranks)s %(cmd)s"
+
     @staticmethod
     def extra_options(extra_vars=None):
         """Define custom easyconfig parameters specific to ParaStationMPI."""
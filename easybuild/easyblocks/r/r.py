@@ -30,9 +30,15 @@ EasyBuild support for building and installing R, implemented as an easyblock
 """
 import os
 import re
+import tarfile
+from functools import partial
 from easybuild.tools import LooseVersion
 
 import easybuild.tools.environment as env
+from easybuild.base import fancylogger
+from easybuild.easyblocks.generic.extensionhelpers import exts_install_history_extra_options
+from easybuild.easyblocks.generic.extensionhelpers import install_exts_parallel_with_history
+from easybuild.easyblocks.generic.extensionhelpers import stop_exts_make_jobserver
 from easybuild.easyblocks.generic.configuremake import ConfigureMake
 from easybuild.tools.build_log import print_warning
 from easybuild.tools.config import SEARCH_PATH_LIB_DIRS
@@ -42,6 +48,154 @@ from easybuild.tools.systemtools import get_shared_lib_ext
 
 EXTS_FILTER_R_PACKAGES = ("R -q --no-save", "library(%(ext_name)s)")
 
+# marker for lines in output of batched sanity check for R packages
+R_EXTS_SANITY_CHECK_MARKER = 'EB_R_EXT_SANITY_CHECK'
+# R code to check whether R packages (specified via 'pkgs') can be loaded, using (at most) 'workers' worker processes;
+# each package is loaded in a separate forked R process (mc.preschedule = FALSE), so loading packages is isolated
+R_EXTS_SANITY_CHECK_SCRIPT = """
+check_pkg <- function(pkg) {
+    start <- proc.time()[["elapsed"]]
+    err <- tryCatch({
+        suppressPackageStartupMessages(library(pkg, character.only = TRUE))
+        ""
+    }, error = function(e) conditionMessage(e))
+    list(ok = identical(err, ""), error = err, time = proc.time()[["elapsed"]] - start)
+}
+res <- parallel::mclapply(pkgs, check_pkg, mc.cores = workers, mc.preschedule = FALSE)
+for (i in seq_along(pkgs)) {
+    r <- res[[i]]
+    # result is not a list if worker process failed (try-error) or crashed (NULL)
+    if (!is.list(r)) {
+        r <- list(ok = FALSE, error = paste("worker process failed:", paste(r, collapse = " ")), time = NA)
+    }
+    cat(sprintf("%s\\t%s\\t%s\\t%s\\t%s\\n", "MARKER", pkgs[i], if (r$ok) "OK" else "FAIL", r$time,
+                gsub("[\\t\\n]+", " ", r$error)))
+}
+""".replace('MARKER', R_EXTS_SANITY_CHECK_MARKER)
+
+
+# fields in DESCRIPTION file of R packages that list required dependencies
+R_DESCRIPTION_DEP_FIELDS = ('Depends', 'Imports', 'LinkingTo')
+
+# parsed DESCRIPTION files of R package sources, indexed by path of source tarball,
+# along with modification time and size of source tarball to detect changes
+_r_descriptions = {}
+
+_log = fancylogger.getLogger('easyblocks.r')
+
+
+def parse_r_description(txt):
+    """
+    Parse contents of DESCRIPTION file of an R package (Debian Control File format).
+
+    :return: dict with value for each field (continuation lines are merged)
+    """
+    fields = {}
+    key = None
+    for line in txt.splitlines():
+        if line and line[0] in (' ', '\t'):
+            # continuation of value of previous field
+            if key is not None:
+                fields[key] += ' ' + line.strip()
+        elif ':' in line:
+            key, value = line.split(':', 1)
+            key = key.strip()
+            fields[key] = value.strip()
+    return fields
+
+
+def read_r_description(src):
+    """
+    Read DESCRIPTION file of R package from specified source tarball,
+    by streaming through the tarball until the top-level DESCRIPTION file is found.
+
+    :return: contents of DESCRIPTION file, or None if it was not found
+    """
+    with tarfile.open(src, 'r|*') as tar:
+        for member in tar:
+            parts = member.name.strip('/').split('/')
+            if len(parts) == 2 and parts[1] == 'DESCRIPTION' and member.isfile():
+                return tar.extractfile(member).read().decode('utf-8', 'replace')
+    return None
+
+
+def get_r_description(src):
+    """
+    Get parsed DESCRIPTION file of R package in specified source tarball,
+    cached by path, modification time and size of the source tarball.
+
+    :return: dict with fields in DESCRIPTION file, or None if it could not be determined
+    """
+    path = os.path.realpath(src)
+    try:
+        st = os.stat(path)
+    except OSError as err:
+        _log.warning("Failed to read DESCRIPTION file from %s: %s", src, err)
+        _r_descriptions.pop(path, None)
+        return None
+
+    stamp = (st.st_mtime_ns, st.st_size)
+    cached = _r_descriptions.get(path)
+    if cached is None or cached[0] != stamp:
+        try:
+            txt = read_r_description(path)
+        except (tarfile.TarError, OSError) as err:
+            _log.warning("Failed to read DESCRIPTION file from %s: %s", src, err)
+            txt = None
+        cached = (stamp, None if txt is None else parse_r_description(txt))
+        _r_descriptions[path] = cached
+
+    return cached[1]
+
+
+def get_r_description_deps(description):
+    """
+    Determine names of required dependencies listed in parsed DESCRIPTION file of R package
+    (excluding R itself).
+    """
+    deps = []
+    for field in R_DESCRIPTION_DEP_FIELDS:
+        # entries may specify version requirements between brackets (which we don't care about here)
+        for dep in description.get(field, '').split(','):
+            dep = dep.split('(')[0].strip()
+            if dep and dep != 'R' and dep not in deps:
+                deps.append(dep)
+    return deps
+
+
+def make_r_exts_sanity_check_script(pkgs, workers):
+    """
+    Compose R script to check whether specified R packages can be loaded, using a pool of worker processes.
+
+    :param pkgs: list of names of R packages
+    :param workers: number of worker processes to use (at least 2, to ensure that packages are loaded in
+                    forked worker processes rather than in the main R process)
+    """
+    lines = [
+        'pkgs <- c(%s)' % ', '.join('"%s"' % pkg for pkg in pkgs),
+        'workers <- %d' % max(int(workers), 2),
+    ]
+    return '\n'.join(lines) + R_EXTS_SANITY_CHECK_SCRIPT
+
+
+def parse_r_exts_sanity_check_output(output):
+    """
+    Parse output of R script composed with make_r_exts_sanity_check_script.
+
+    :return: dict with (success, error message, time to load package in seconds) tuple for each R package
+    """
+    results = {}
+    for line in output.splitlines():
+        fields = line.split('\t')
+        if len(fields) == 5 and fields[0] == R_EXTS_SANITY_CHECK_MARKER:
+            _, pkg, status, load_time, error = fields
+            try:
+                load_time = float(load_time)
+            except ValueError:
+                load_time = None
+            results[pkg] = (status == 'OK', error.strip(), load_time)
+    return results
+
 
 class EB_R(ConfigureMake):
     """
@@ -50,6 +204,13 @@ class EB_R(ConfigureMake):
     or latest library version (in that order of preference)
     """
 
+    @staticmethod
+    def extra_options(extra_vars=None):
+        """Extra easyconfig parameters specific to R."""
+        extra_vars = ConfigureMake.extra_options(extra_vars=extra_vars)
+        extra_vars.update(exts_install_history_extra_options())
+        return extra_vars
+
     def __init__(self, *args, **kwargs):
         """Constructor for R easyblock."""
         super().__init__(*args, **kwargs)
@@ -66,6 +227,21 @@ class EB_R(ConfigureMake):
         self.cfg['exts_defaultclass'] = "RPackage"
         self.cfg['exts_filter'] = EXTS_FILTER_R_PACKAGES
 
+    def extensions_step(self, *args, **kwargs):
+        """
+        Install extensions, with a GNU make jobserver that can be shared across extensions installed in parallel,
+        which is stopped at the end of this step.
+        """
+        self.exts_make_jobserver = None
+        try:
+            super().extensions_step(*args, **kwargs)
+        finally:
+            stop_exts_make_jobserver(self)
+
+    def install_extensions_parallel(self, *args, **kwargs):
+        """Install extensions in parallel, starting with the extensions on the critical path."""
+        install_exts_parallel_with_history(self, partial(super().install_extensions_parallel, *args, **kwargs))
+
     def configure_step(self):
         """Custom configuration for R."""
 
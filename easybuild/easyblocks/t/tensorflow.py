@@ -31,6 +31,7 @@ EasyBuild support for building and installing TensorFlow, implemented as an easy
 @author: Alexander Grund (TU Dresden)
 """
 import glob
+import json
 import os
 import re
 import stat
@@ -40,6 +41,8 @@ from itertools import chain
 
 import easybuild.tools.environment as env
 import easybuild.tools.toolchain as toolchain
+from easybuild.easyblocks.bazel import bazel_cache_extra_options, bazel_cache_opts, bazel_resource_opts
+from easybuild.easyblocks.bazel import bazel_resources_extra_options, report_bazel_cache, report_bazel_profile
 from easybuild.easyblocks.generic.pythonpackage import PythonPackage, det_python_version
 from easybuild.easyblocks.python import EXTS_FILTER_PYTHON_PACKAGES, PY_ENV_VARS
 from easybuild.framework.easyconfig import CUSTOM
@@ -79,6 +82,20 @@ export PATH=$(echo $PATH | tr ':' '\n' | grep -v "^%(wrapper_dir)s$" | tr '\n' '
 %(compiler_path)s "$@"
 """
 
+# Python script to check which of the Python packages specified as arguments are available (without importing them);
+# prints a JSON dict that maps package name to True/False
+PYTHON_PKGS_EXIST_SCRIPT = """
+import importlib.util, json, sys
+
+def exists(name):
+    try:
+        return importlib.util.find_spec(name) is not None
+    except (ImportError, ValueError):
+        return False
+
+print(json.dumps({name: exists(name) for name in sys.argv[1:]}))
+"""
+
 KNOWN_BINUTILS = ('ar', 'as', 'dwp', 'ld', 'ld.bfd', 'ld.gold', 'nm', 'objcopy', 'objdump', 'strip')
 
 
@@ -246,6 +263,8 @@ class EB_TensorFlow(PythonPackage):
             'jvm_max_memory': [4096, "Maximum amount of memory in MB used for the JVM running Bazel." +
                                "Use None to not set a specific limit (uses a default value).", CUSTOM],
         }
+        extra_vars.update(bazel_cache_extra_options())
+        extra_vars.update(bazel_resources_extra_options())
 
         return PythonPackage.extra_options(extra_vars)
 
@@ -259,6 +278,7 @@ class EB_TensorFlow(PythonPackage):
             self.cfg['exts_filter'] = EXTS_FILTER_PYTHON_PACKAGES
 
         self.system_libs_info = None
+        self.python_pkgs_exist = {}
 
         self.test_script = None
 
@@ -271,12 +291,29 @@ class EB_TensorFlow(PythonPackage):
             else:
                 raise EasyBuildError("Specified test script %s not found!", self.cfg['test_script'])
 
+    def probe_python_pkgs(self, names):
+        """
+        Check which of the given Python packages exist, using a single Python process.
+        Results are cached, and only packages that were not checked before are probed.
+
+        :return: dict mapping package name to True/False
+        """
+        to_probe = sorted(set(name for name in names if name not in self.python_pkgs_exist))
+        if to_probe:
+            cmd = ' '.join([self.python_cmd, '-'] + to_probe)
+            res = run_shell_cmd(cmd, stdin=PYTHON_PKGS_EXIST_SCRIPT, fail_on_error=False, hidden=True)
+            try:
+                probed = json.loads(res.output.strip().splitlines()[-1])
+            except (IndexError, ValueError):
+                raise EasyBuildError("Failed to check for Python packages %s: %s", ', '.join(to_probe), res.output)
+            self.log.debug("Existence check for Python packages: %s", probed)
+            self.python_pkgs_exist.update(probed)
+
+        return {name: self.python_pkgs_exist[name] for name in names}
+
     def python_pkg_exists(self, name):
-        """Check if the given python package exists/can be imported"""
-        cmd = self.python_cmd + " -c 'import %s'" % name
-        res = run_shell_cmd(cmd, fail_on_error=False)
-        self.log.debug('Existence check for %s returned %s with output: %s', name, res.exit_code, res.output)
-        return res.exit_code == 0
+        """Check if the given python package exists"""
+        return self.probe_python_pkgs([name])[name]
 
     def handle_jemalloc(self):
         """Figure out whether jemalloc support should be enabled or not."""
@@ -358,6 +395,8 @@ class EB_TensorFlow(PythonPackage):
         # Some TF dependencies require both a (usually C++) dependency and a Python package
         deps_with_python_pkg = {tf_name for tf_name in dependency_mapping.values()
                                 if tf_name in python_mapping.values()}
+        # check for all relevant Python packages at once
+        python_pkgs_exist = self.probe_python_pkgs(list(python_mapping))
 
         system_libs = []
         cpaths = []
@@ -372,7 +411,7 @@ class EB_TensorFlow(PythonPackage):
                     pkg_name = next(cur_pkg_name for cur_pkg_name, cur_tf_name in python_mapping.items()
                                     if cur_tf_name == tf_name)
                     # Simply ignore. Error reporting is done in the other loop
-                    if not self.python_pkg_exists(pkg_name):
+                    if not python_pkgs_exist[pkg_name]:
                         continue
                 system_libs.append(tf_name)
                 # When using cURL (which uses the system OpenSSL), we also need to use "boringssl"
@@ -404,7 +443,7 @@ class EB_TensorFlow(PythonPackage):
                 ignored_system_deps.append('%s (Dependency %s)' % (tf_name, dep_name))
 
         for pkg_name, tf_name in sorted(python_mapping.items(), key=lambda i: i[0].lower()):
-            if self.python_pkg_exists(pkg_name):
+            if python_pkgs_exist[pkg_name]:
                 # If it is in deps_with_python_pkg we already added it
                 if tf_name not in deps_with_python_pkg:
                     system_libs.append(tf_name)
@@ -429,10 +468,10 @@ class EB_TensorFlow(PythonPackage):
             self.log.warning('For the following $TF_SYSTEM_LIBS dependencies TensorFlow will download a copy ' +
                              'because an EB dependency was not found: \n%s\n' +
                              'EC Dependencies: %s\n' +
-                             'Installed Python packages: %s\n',
+                             'Relevant Python packages found: %s\n',
                              ', '.join(ignored_system_deps),
                              ', '.join(dep_names),
-                             ', '.join(self.get_installed_python_packages()))
+                             ', '.join(sorted(name for name, found in python_pkgs_exist.items() if found)))
         else:
             self.log.info("All known TensorFlow $TF_SYSTEM_LIBS dependencies resolved via EasyBuild!")
 
@@ -451,6 +490,8 @@ class EB_TensorFlow(PythonPackage):
         # Folder where wrapper binaries can be placed, where required. TODO: Replace by --action_env cmds
         self.wrapper_dir = os.path.join(parent_dir, 'wrapper_bin')
         mkdir(self.wrapper_dir)
+        # Persistent disk/repository caches (if any), located outside of the build dir to be reused by rebuilds
+        self.bazel_cache_opts = bazel_cache_opts(self.cfg, self.builddir)
 
     @contextmanager
     def set_tmp_dir(self):
@@ -916,6 +957,12 @@ class EB_TensorFlow(PythonPackage):
         self.target_opts.extend(['--subcommands', '--verbose_failures'])
 
         self.target_opts.append(f'--jobs={self.cfg.parallel}')
+        self.target_opts.extend(self.bazel_cache_opts)
+        # Avoid running out of memory during link-heavy phases, and make sure all cores are used
+        if self.cfg['bazel_local_resources']:
+            resource_opts = bazel_resource_opts(bazel_version, self.cfg.parallel, self.cfg['bazel_ram_fraction'],
+                                                reserved_ram=int(jvm_max_memory or 0))
+            self.target_opts.extend(resource_opts)
 
         if self.toolchain.options.get('pic', None):
             self.target_opts.append('--copt="-fPIC"')
@@ -1003,6 +1050,13 @@ class EB_TensorFlow(PythonPackage):
                 # See https://github.com/bazelbuild/bazel/commit/a463d9095386b22c121d20957222dbb44caef7d4
                 self.target_opts.append('--host_action_env=' + option)
 
+        # Let Bazel write a trace profile of the build, which is analysed afterwards
+        profile_opts = []
+        bazel_profile = None
+        if self.cfg['bazel_profile']:
+            bazel_profile = os.path.join(self.builddir, 'bazel-profile.json.gz')
+            profile_opts.append('--profile=%s' % bazel_profile)
+
         # Compose final command
         cmd = (
             [self.cfg['prebuildopts']]
@@ -1010,6 +1064,7 @@ class EB_TensorFlow(PythonPackage):
             + self.bazel_opts
             + ['build']
             + self.target_opts
+            + profile_opts
             + [self.cfg['buildopts']]
         )
         if LooseVersion(self.version) < '2.16':
@@ -1020,7 +1075,10 @@ class EB_TensorFlow(PythonPackage):
             cmd += ['//tensorflow/tools/pip_package:wheel']
 
         with self.set_tmp_dir():
-            run_shell_cmd(' '.join(cmd))
+            res = run_shell_cmd(' '.join(cmd))
+            report_bazel_cache(self.cfg, res.output, self.log)
+            if bazel_profile:
+                report_bazel_profile(bazel_profile, self.logfile, self.log)
             if LooseVersion(self.version) < LooseVersion('2.16'):
                 # run generated 'build_pip_package' script to build the .whl
                 cmd = "bazel-bin/tensorflow/tools/pip_package/build_pip_package %s" % self.builddir
@@ -33,15 +33,56 @@ from itertools import chain
 import os
 
 from easybuild.easyblocks.generic.configuremake import ConfigureMake
+from easybuild.framework.easyconfig import CUSTOM
 from easybuild.tools.build_log import EasyBuildError
+from easybuild.tools.filetools import write_file
 from easybuild.tools.modules import get_software_root
 from easybuild.tools.run import run_shell_cmd, subprocess_popen_text
 from easybuild.tools.systemtools import get_shared_lib_ext
 
+# plugins in these directories are built after the plugins in the corresponding directory,
+# for the same framework (cuda/rocm); all other plugin directories are independent of each other
+UCX_PLUGINS_MAKEFILE_DIR_DEPS = {
+    'tools/perf': 'uct',
+}
+
+
+def mk_ucx_plugins_makefile(makefile_dirs, make_args=''):
+    """
+    Create contents of makefile to run make in specified directories (in src/) with specified arguments,
+    in parallel where possible. Sub-make processes share the jobserver of the top-level make process,
+    so running 'make -j N' with this makefile results in at most N jobs in total.
+    """
+    targets = [x.replace('/', '_') for x in makefile_dirs]
+    lines = [
+        "all: %s" % ' '.join(targets),
+        ".PHONY: all %s" % ' '.join(targets),
+    ]
+    for makefile_dir, target in zip(makefile_dirs, targets):
+        subdir, framework = os.path.split(makefile_dir)
+        dep = UCX_PLUGINS_MAKEFILE_DIR_DEPS.get(subdir)
+        dep_dir = os.path.join(dep, framework) if dep else None
+        deps = [dep_dir.replace('/', '_')] if dep_dir in makefile_dirs else []
+        lines.extend([
+            "%s: %s" % (target, ' '.join(deps)),
+            "\t$(MAKE) -C src/%s %s" % (makefile_dir, make_args),
+        ])
+    return '\n'.join(x.rstrip() for x in lines) + '\n'
+
 
 class EB_UCX_Plugins(ConfigureMake):
     """Support for building additional plugins for a existing UCX module"""
 
+    @staticmethod
+    def extra_options(extra_vars=None):
+        """Extra easyconfig parameters specific to UCX-Plugins."""
+        extra_vars = ConfigureMake.extra_options(extra_vars)
+        extra_vars.update({
+            'combined_build_install': [False, "Build and install plugins in a single pass (during build step)",
+                                       CUSTOM],
+        })
+        return extra_vars
+
     def __init__(self, *args, **kwargs):
         """Custom initialization for UCX-Plugins."""
         super().__init__(*args, **kwargs)
@@ -103,15 +144,26 @@ class EB_UCX_Plugins(ConfigureMake):
 
         super().configure_step()
 
+    def run_make_plugins(self, make_args):
+        """Run make with specified arguments for all plugin directories, in parallel."""
+        makefile = os.path.join(self.builddir, 'eb-ucx-plugins.mk')
+        write_file(makefile, mk_ucx_plugins_makefile(self.makefile_dirs, make_args=make_args))
+        run_shell_cmd('make -f %s -j %s' % (makefile, self.cfg.parallel))
+
     def build_step(self):
         """Build plugins"""
-        for makefile_dir in self.makefile_dirs:
-            run_shell_cmd('make -C src/%s V=1' % makefile_dir)
+        if self.cfg['combined_build_install']:
+            self.log.info("Building and installing plugins in a single pass")
+            self.run_make_plugins('V=1 install')
+        else:
+            self.run_make_plugins('V=1')
 
     def install_step(self):
         """Install plugins"""
-        for makefile_dir in self.makefile_dirs:
-            run_shell_cmd('make -C src/%s install' % (makefile_dir))
+        if self.cfg['combined_build_install']:
+            self.log.info("Plugins were already installed during build step")
+        else:
+            self.run_make_plugins('install')
 
     def make_module_extra(self, *args, **kwargs):
         """Add extra statements to generated module file specific to UCX plugins"""
@@ -28,10 +28,12 @@ Unit tests for specific easyblocks.
 @author: Kenneth Hoste (Ghent University)
 """
 import copy
+import json
 import os
 import re
 import stat
 import sys
+import tarfile
 import tempfile
 import textwrap
 from io import StringIO
@@ -41,24 +43,44 @@ from test.easyblocks.module import cleanup
 
 import easybuild.tools.options as eboptions
 import easybuild.tools.tomllib as tomllib
+import easybuild.easyblocks.b.bazel as bazel
+import easybuild.easyblocks.b.boost as boost
+import easybuild.easyblocks.c.cuda as cuda
 import easybuild.easyblocks.generic.pythonpackage as pythonpackage
 import easybuild.easyblocks.generic.cargo as cargo
+import easybuild.easyblocks.generic.configuremake as configuremake
+import easybuild.easyblocks.generic.extensionhelpers as extensionhelpers
+import easybuild.easyblocks.generic.filehelpers as filehelpers
+import easybuild.easyblocks.generic.juliapackage as juliapackage
+import easybuild.easyblocks.generic.mesonninja as mesonninja
+import easybuild.easyblocks.generic.mpihelpers as mpihelpers
+import easybuild.easyblocks.generic.perlmodule as perlmodule
+import easybuild.easyblocks.h.hpcg as hpcg
+import easybuild.easyblocks.h.hpl as hpl
 import easybuild.easyblocks.l.lammps as lammps
+import easybuild.easyblocks.o.ocaml as ocaml
+import easybuild.easyblocks.o.octave as octave
+import easybuild.easyblocks.o.openblas as openblas
 import easybuild.easyblocks.p.python as python
 import easybuild.easyblocks.p.pytorch as pytorch
+import easybuild.easyblocks.r.r as r
+import easybuild.easyblocks.u.ucx_plugins as ucx_plugins
+from easybuild.base import fancylogger
 from easybuild.base.testing import TestCase
-from easybuild.easyblocks.generic.cmakemake import det_cmake_version
+from easybuild.easyblocks.generic.cmakemake import det_cmake_version, get_cmake_cache, is_cmake_false
+from easybuild.easyblocks.generic.cmakemake import make_ctest_resource_spec, parse_ctest_junit
 from easybuild.easyblocks.generic.toolchain import Toolchain
 from easybuild.framework.easyblock import EasyBlock, get_easyblock_instance
 from easybuild.framework.easyconfig.easyconfig import process_easyconfig
 from easybuild.tools import config
 from easybuild.tools.build_log import EasyBuildError
-from easybuild.tools.config import GENERAL_CLASS, get_module_syntax
+from easybuild.tools.config import GENERAL_CLASS, get_module_syntax, update_build_option
 from easybuild.tools.environment import modify_env
-from easybuild.tools.filetools import adjust_permissions, mkdir, move_file, remove_dir, symlink, write_file
+from easybuild.tools.filetools import adjust_permissions, change_dir, mkdir, move_file, read_file, remove_dir, symlink
+from easybuild.tools.filetools import write_file
 from easybuild.tools.modules import modules_tool
 from easybuild.tools.options import set_tmpdir
-from easybuild.tools.run import RunShellCmdResult
+from easybuild.tools.run import RunShellCmdResult, run_shell_cmd
 
 
 class EasyBlockSpecificTest(TestCase):
@@ -228,6 +250,102 @@ class EasyBlockSpecificTest(TestCase):
                 extra_eb_env_vars.append(key)
         self.assertEqual(extra_eb_env_vars, [])
 
+    def test_config_cache(self):
+        """Test helper functions for shared configure cache in ConfigureMake easyblock"""
+        # configure options for different precisions of FFTW, one variant overrides a cache variable
+        configopts = [
+            '--enable-single --enable-sse2 --enable-mpi --with-pic',
+            '--enable-long-double --enable-mpi --with-pic ac_cv_prog_f77_v=-v',
+            '--enable-quad-precision --enable-mpi --with-pic ac_cv_prog_f77_v="-###"',
+        ]
+        excludes = configuremake.det_config_cache_excludes(configopts)
+        self.assertEqual(excludes, [r'^ac_cv_prog_f77_v$'])
+        self.assertEqual(configuremake.det_config_cache_excludes(['--enable-mpi']), [])
+        # variables that are set to the same value in all variants, or that are not cache variables, are irrelevant
+        configopts = ['--enable-single ac_cv_prog_f77_v=-v CFLAGS=-O2', '--enable-long-double ac_cv_prog_f77_v=-v']
+        self.assertEqual(configuremake.det_config_cache_excludes(configopts), [])
+
+        # excerpt of config.cache produced by configure script of FFTW 3.3.10
+        cache_txt = textwrap.dedent("""
+            # This file is a shell script that caches the results of configure
+            ac_cv_env_CC_set=set
+            ac_cv_env_CC_value=gcc
+            ac_cv_env_CFLAGS_set=set
+            ac_cv_env_CFLAGS_value='-O2 -ftree-vectorize -march=native'
+            ac_cv_build=${ac_cv_build=x86_64-pc-linux-gnu}
+            ac_cv_c_compiler_gnu=${ac_cv_c_compiler_gnu=yes}
+            ac_cv_header_stdlib_h=${ac_cv_header_stdlib_h=yes}
+            ac_cv_prog_f77_v=${ac_cv_prog_f77_v='-###'}
+            ac_cv_sizeof_long_double=${ac_cv_sizeof_long_double=16}
+            ac_cv_type_long_double=${ac_cv_type_long_double=yes}
+            ax_cv_c_flags__msse2=${ax_cv_c_flags__msse2=yes}
+            lt_cv_sys_global_symbol_pipe=${lt_cv_sys_global_symbol_pipe='sed -n -e '\''s/^T .*/&/p'\''
+            '}
+        """).lstrip()
+        cache_file = os.path.join(self.tmpdir, 'config.cache')
+        write_file(cache_file, cache_txt)
+        # explicitly specified excludes (via configure_cache_exclude) are combined with automatic ones
+        removed = configuremake.filter_config_cache(cache_file, excludes + [r'^ax_cv_c_flags__msse2$', r'^lt_cv_'])
+        self.assertEqual(removed, ['ac_cv_prog_f77_v', 'ax_cv_c_flags__msse2', 'lt_cv_sys_global_symbol_pipe'])
+        # entries for 'precious' variables are retained, so configure can check whether they changed
+        self.assertEqual(read_file(cache_file), textwrap.dedent("""
+            # This file is a shell script that caches the results of configure
+            ac_cv_env_CC_set=set
+            ac_cv_env_CC_value=gcc
+            ac_cv_env_CFLAGS_set=set
+            ac_cv_env_CFLAGS_value='-O2 -ftree-vectorize -march=native'
+            ac_cv_build=${ac_cv_build=x86_64-pc-linux-gnu}
+            ac_cv_c_compiler_gnu=${ac_cv_c_compiler_gnu=yes}
+            ac_cv_header_stdlib_h=${ac_cv_header_stdlib_h=yes}
+            ac_cv_sizeof_long_double=${ac_cv_sizeof_long_double=16}
+            ac_cv_type_long_double=${ac_cv_type_long_double=yes}
+        """).lstrip())
+        self.assertEqual(configuremake.filter_config_cache(cache_file, excludes), [])
+
+        # key for configure cache file depends on compilers/flags in environment,
+        # and on variables set via (pre)configure options
+        os.environ['CC'] = 'gcc'
+        os.environ['CFLAGS'] = '-O2'
+        key = configuremake.det_config_cache_key('', '--enable-mpi')
+        self.assertTrue(re.match('^[0-9a-f]{16}$', key))
+        self.assertEqual(configuremake.det_config_cache_key(None, '--enable-mpi --with-pic'), key)
+        keys = {
+            key,
+            configuremake.det_config_cache_key('', "--enable-mpi CFLAGS='-O3 -g'"),
+            configuremake.det_config_cache_key('', '--enable-mpi CFLAGS="-O3 -g"'),
+            configuremake.det_config_cache_key('CC=clang ', '--enable-mpi'),
+            configuremake.det_config_cache_key('', '--enable-mpi CC=clang'),
+        }
+        self.assertEqual(len(keys), 4)
+        self.assertNotEqual(configuremake.det_config_cache_key('', "CFLAGS='-O3 -g'"),
+                            configuremake.det_config_cache_key('', "CFLAGS='-O3 -g -fPIC'"))
+        os.environ['CFLAGS'] = '-O3'
+        self.assertNotEqual(configuremake.det_config_cache_key('', '--enable-mpi'), key)
+
+    def test_parse_compiler_launcher_stats(self):
+        """Test parse_compiler_launcher_stats function from ConfigureMake easyblock"""
+        ccache_output = textwrap.dedent("""
+            stats_updated_timestamp	1760000000
+            cache_miss	12
+            direct_cache_hit	30
+            preprocessed_cache_hit	5
+            files_in_cache	94
+        """)
+        self.assertEqual(configuremake.parse_compiler_launcher_stats('ccache', ccache_output), (35, 12))
+        self.assertEqual(configuremake.parse_compiler_launcher_stats('ccache', ''), None)
+
+        sccache_output = json.dumps({'stats': {
+            'compile_requests': 50,
+            'cache_hits': {'counts': {'C/C++': 20, 'CUDA': 2}, 'adv_counts': {}},
+            'cache_misses': {'counts': {'C/C++': 8}, 'adv_counts': {}},
+        }})
+        self.assertEqual(configuremake.parse_compiler_launcher_stats('sccache', sccache_output), (22, 8))
+        sccache_output = "Compile requests      50\nCache hits            22\nCache misses           8\n"
+        self.assertEqual(configuremake.parse_compiler_launcher_stats('sccache', sccache_output), (22, 8))
+
+        self.assertErrorRegex(EasyBuildError, "Unknown compiler launcher",
+                              configuremake.parse_compiler_launcher_stats, 'distcc', '')
+
     def test_det_cmake_version(self):
         """Tests for det_cmake_version function provided along with CMakeMake generic easyblock."""
 
@@ -276,6 +394,100 @@ class EasyBlockSpecificTest(TestCase):
         """))
         self.assertEqual(det_cmake_version(), '1.2.3-rc4')
 
+    def test_get_cmake_cache(self):
+        """Test get_cmake_cache function from CMakeMake easyblock"""
+        self.assertEqual(get_cmake_cache(self.tmpdir), None)
+
+        cmake_cache_file = os.path.join(self.tmpdir, 'CMakeCache.txt')
+        write_file(cmake_cache_file, textwrap.dedent("""
+            # This is the CMakeCache file.
+            //Build shared libraries
+            BUILD_SHARED_LIBS:BOOL=ON
+            //Path to a library.
+            ZLIB_LIBRARY_RELEASE:FILEPATH=/software/zlib/1.3.1/lib/libz.so
+            Python3_EXECUTABLE:FILEPATH=/usr/bin/python3
+            HDF5_INCLUDE_DIR:PATH=HDF5_INCLUDE_DIR-NOTFOUND
+            "KEY:WITH:COLONS":STRING=a=b
+            UNTYPED=value
+            CMAKE_CACHEFILE_DIR:INTERNAL=/tmp/build
+        """))
+        cmake_cache = get_cmake_cache(self.tmpdir)
+        self.assertEqual(len(cmake_cache), 7)
+        self.assertEqual(cmake_cache['BUILD_SHARED_LIBS'], ('BOOL', 'ON'))
+        self.assertEqual(cmake_cache['ZLIB_LIBRARY_RELEASE'].value, '/software/zlib/1.3.1/lib/libz.so')
+        self.assertEqual(cmake_cache['KEY:WITH:COLONS'], ('STRING', 'a=b'))
+        self.assertEqual(cmake_cache['UNTYPED'], (None, 'value'))
+        self.assertTrue(is_cmake_false(cmake_cache['HDF5_INCLUDE_DIR'].value))
+        self.assertFalse(is_cmake_false(cmake_cache['BUILD_SHARED_LIBS'].value))
+        self.assertTrue(is_cmake_false('off'))
+
+        # parsed result is cached, and only updated when the file is modified
+        self.assertIs(get_cmake_cache(self.tmpdir), cmake_cache)
+        write_file(cmake_cache_file, "BUILD_SHARED_LIBS:BOOL=OFF\n")
+        os.utime(cmake_cache_file, ns=(0, 0))
+        self.assertEqual(get_cmake_cache(self.tmpdir), {'BUILD_SHARED_LIBS': ('BOOL', 'OFF')})
+
+    def test_ctest_helpers(self):
+        """Test parse_ctest_junit and make_ctest_resource_spec functions from CMakeMake easyblock"""
+        junit_file = os.path.join(self.tmpdir, 'ctest-junit.xml')
+        write_file(junit_file, textwrap.dedent("""<?xml version="1.0" encoding="UTF-8"?>
+            <testsuite name="Linux-c++" tests="4" failures="1" disabled="1" skipped="0" hostname="" time="12">
+                <testcase name="unit_a" classname="unit_a" time="0.5" status="run">
+                    <system-out>all good</system-out>
+                </testcase>
+                <testcase name="mpi_b" classname="mpi_b" time="10.25" status="fail">
+                    <failure message="Failed"/>
+                </testcase>
+                <testcase name="unit_c" classname="unit_c" time="0" status="disabled">
+                    <skipped message="Disabled"/>
+                </testcase>
+                <testcase name="unit_d" classname="unit_d" time="1.0" status="run"/>
+            </testsuite>
+        """))
+        self.assertEqual(parse_ctest_junit(junit_file), [
+            ('unit_a', 'passed', 0.5),
+            ('mpi_b', 'failed', 10.25),
+            ('unit_c', 'skipped', 0.0),
+            ('unit_d', 'passed', 1.0),
+        ])
+        write_file(junit_file, '<testsuite')
+        self.assertErrorRegex(EasyBuildError, "Failed to parse CTest JUnit output", parse_ctest_junit, junit_file)
+
+        self.assertEqual(json.loads(make_ctest_resource_spec({'mpi': 8, 'gpus': 2})), {
+            'version': {'major': 1, 'minor': 0},
+            'local': [{'gpus': [{'id': '0', 'slots': 2}], 'mpi': [{'id': '0', 'slots': 8}]}],
+        })
+
+    def test_ninja_log(self):
+        """Test parsing and summarizing .ninja_log in MesonNinja easyblock"""
+        ninja_log = '\n'.join([
+            "# ninja log v5",
+            "0\t4000\t1760000000000000000\tsrc/a.o\t1a2b3c",
+            "10\t2010\t1760000000000000000\tsrc/b.o\t4d5e6f",
+            "2020\t3020\t1760000000000000000\tsrc/c.o\t7a8b9c",
+            "4000\t5000\t1760000000000000000\tlibfoo.so\tabcdef",
+            "4000\t5000\t1760000000000000000\tlibfoo.so.1\tabcdef",
+            "invalid line",
+        ])
+        edges = mesonninja.parse_ninja_log(ninja_log)
+        self.assertEqual(edges, [
+            (0, 4000, ['src/a.o']),
+            (10, 2010, ['src/b.o']),
+            (2020, 3020, ['src/c.o']),
+            (4000, 5000, ['libfoo.so', 'libfoo.so.1']),
+        ])
+
+        summary = mesonninja.ninja_log_summary(edges, top=2)
+        self.assertEqual(summary['cpu_time'], 8.0)
+        self.assertEqual(summary['wall_time'], 5.0)
+        self.assertEqual(summary['parallelism'], 1.6)
+        self.assertEqual(summary['slowest'], [(4.0, ['src/a.o']), (2.0, ['src/b.o'])])
+
+        events = mesonninja.ninja_log_chrome_trace(edges)
+        self.assertEqual([(e['name'], e['tid']) for e in events],
+                         [('src/a.o', 0), ('src/b.o', 1), ('src/c.o', 1), ('libfoo.so, libfoo.so.1', 0)])
+        self.assertEqual((events[1]['ts'], events[1]['dur']), (10000, 2000000))
+
     def test_det_installed_python_packages(self):
         """
         Test det_installed_python_packages function providyed by PythonPackage easyblock
@@ -623,6 +835,652 @@ class EasyBlockSpecificTest(TestCase):
         self.assertTrue(os.path.isdir(lib64_site_path))
         self.assertFalse(os.path.islink(lib64_site_path))
 
+    def test_adjust_permissions_tree(self):
+        """Test adjust_permissions_tree helper function"""
+        top = os.path.join(self.tmpdir, 'tree')
+        for subdir in ('a/b', 'c', 'unreadable/sub'):
+            write_file(os.path.join(top, subdir, 'file.txt'), 'test')
+        symlink(os.path.join(top, 'c', 'file.txt'), os.path.join(top, 'c', 'link.txt'))
+        for subdir in ('', 'a', 'a/b', 'c'):
+            os.chmod(os.path.join(top, subdir), 0o700)
+        for subdir in ('a/b', 'c'):
+            os.chmod(os.path.join(top, subdir, 'file.txt'), 0o600)
+
+        unreadable = os.path.join(top, 'unreadable')
+        os.chmod(unreadable, 0o300)
+
+        # root can list directories without read permissions, so simulate failing scan in that case
+        orig_scandir = os.scandir
+
+        def scandir(path):
+            if path == unreadable:
+                raise PermissionError(13, "Permission denied", path)
+            return orig_scandir(path)
+
+        if os.getuid() == 0:
+            os.scandir = scandir
+        try:
+            error_pattern = r"Failed to adjust permissions for 1 paths in .*/tree: .*unreadable"
+            self.assertErrorRegex(EasyBuildError, error_pattern, filehelpers.adjust_permissions_tree,
+                                  top, stat.S_IROTH, dir_perms=stat.S_IXOTH, max_workers=2)
+            # permissions are already adjusted where possible, so only failure to scan remains
+            cnt = filehelpers.adjust_permissions_tree(top, stat.S_IROTH, dir_perms=stat.S_IXOTH, ignore_errors=True)
+            self.assertEqual(cnt, 0)
+        finally:
+            os.scandir = orig_scandir
+            os.chmod(unreadable, 0o700)
+
+        for subdir in ('', 'a', 'a/b', 'c'):
+            self.assertEqual(stat.S_IMODE(os.stat(os.path.join(top, subdir)).st_mode), 0o705)
+        for subdir in ('a/b', 'c'):
+            self.assertEqual(stat.S_IMODE(os.stat(os.path.join(top, subdir, 'file.txt')).st_mode), 0o604)
+
+        # directory that is readable again is handled, nothing to do when permissions are already in place
+        self.assertEqual(filehelpers.adjust_permissions_tree(top, stat.S_IROTH, dir_perms=stat.S_IXOTH), 1)
+        self.assertEqual(filehelpers.adjust_permissions_tree(top, stat.S_IROTH, dir_perms=stat.S_IXOTH), 0)
+
+        # failing to adjust permissions of top directory is also handled
+        self.assertErrorRegex(EasyBuildError, "Failed to adjust permissions", filehelpers.adjust_permissions_tree,
+                              os.path.join(self.tmpdir, 'nosuchdir'), stat.S_IROTH)
+        self.assertEqual(filehelpers.adjust_permissions_tree(os.path.join(self.tmpdir, 'nosuchdir'), stat.S_IROTH,
+                                                             ignore_errors=True), 0)
+
+    def test_bazel_cache_helpers(self):
+        """Test helper functions for persistent Bazel caches in Bazel easyblock"""
+        output = textwrap.dedent("""
+            INFO: Elapsed time: 1.234s, Critical Path: 0.50s
+            INFO: 20 processes: 2 remote cache hit, 18 internal.
+            INFO: Build completed successfully, 20 total actions
+            INFO: 12345 processes: 9876 disk cache hit, 1234 internal, 1235 linux-sandbox.
+        """)
+        self.assertEqual(bazel.parse_bazel_cache_hits(output), (9876, 12345))
+        self.assertEqual(bazel.parse_bazel_cache_hits("INFO: 4 processes: 4 internal."), (0, 4))
+        self.assertEqual(bazel.parse_bazel_cache_hits("no summary here"), None)
+
+        cache_dir = os.path.join(self.tmpdir, 'bazel-disk-cache')
+        for idx in range(4):
+            cache_file = os.path.join(cache_dir, 'cas', 'entry%d' % idx)
+            write_file(cache_file, 'x' * 1024 ** 2)
+            os.utime(cache_file, (1000 + idx, 1000 + idx))
+
+        # least recently used entries are removed first
+        self.assertEqual(bazel.trim_bazel_disk_cache(cache_dir, 2), 2 * 1024 ** 2)
+        self.assertEqual(sorted(os.listdir(os.path.join(cache_dir, 'cas'))), ['entry2', 'entry3'])
+        self.assertEqual(bazel.trim_bazel_disk_cache(cache_dir, 2), 0)
+
+        profile = os.path.join(self.tmpdir, 'bazel-profile.json')
+        write_file(profile, json.dumps({'traceEvents': [
+            {'name': 'Compiling a.cc', 'cat': 'action processing', 'ph': 'X', 'ts': 0, 'dur': 3000000},
+            {'name': 'Compiling b.cc', 'cat': 'action processing', 'ph': 'X', 'ts': 1000000, 'dur': 1000000},
+            {'name': 'Compiling c.cc', 'cat': 'action processing', 'ph': 'X', 'ts': 2000000, 'dur': 2000000},
+            {'name': 'Linking libab.so', 'cat': 'action processing', 'ph': 'X', 'ts': 4000000, 'dur': 500000},
+            {'name': 'action \'Compiling a.cc\'', 'cat': 'critical path component', 'ph': 'X', 'ts': 0,
+             'dur': 3000000},
+            {'name': 'action \'Linking libab.so\'', 'cat': 'critical path component', 'ph': 'X', 'ts': 4000000,
+             'dur': 500000},
+            {'name': 'thread_name', 'ph': 'M', 'pid': 1, 'tid': 1, 'args': {'name': 'Critical Path'}},
+        ]}))
+        res = bazel.parse_bazel_profile(profile, top=1)
+        self.assertEqual(res['actions'], 4)
+        self.assertEqual(res['peak_concurrency'], 2)
+        self.assertEqual(res['critical_path'], [(3.0, "action 'Compiling a.cc'")])
+        self.assertEqual(res['critical_path_time'], 3.5)
+
+        opts = bazel.bazel_resource_opts(bazel.LooseVersion('7.4.1'), 8, 0.5)
+        self.assertEqual(opts[-1], '--local_resources=cpu=8')
+        self.assertTrue(re.match('^--local_resources=memory=[0-9]+$', opts[0]))
+        opts = bazel.bazel_resource_opts(bazel.LooseVersion('6.5.0'), 4, 0.5)
+        self.assertEqual(opts[-1], '--local_cpu_resources=4')
+
+    def test_julia_pkg_cmds(self):
+        """Test batching of Julia.Pkg commands in JuliaPackage easyblock"""
+        test_ec_path = os.path.join(self.tmpdir, 'test.eb')
+        write_file(test_ec_path, '\n'.join([
+            "easyblock = 'JuliaPackage'",
+            "name = 'Example'",
+            "version = '0.5.3'",
+            "homepage = 'https://example.com'",
+            "description = 'just a test'",
+            "toolchain = SYSTEM",
+            "preinstallopts = 'export TEST=1 && '",
+        ]))
+        eb = get_easyblock_instance(process_easyconfig(test_ec_path)[0])
+        self.assertTrue(isinstance(eb, juliapackage.JuliaPackage))
+
+        cmds = []
+
+        def mocked_run_shell_cmd(cmd, **kwargs):
+            cmds.append(cmd)
+            output = "   1234.5 ms  ✓ Foo\n    56.7 ms  ✓ Bar\n  2 dependencies successfully precompiled\n"
+            return RunShellCmdResult(cmd=cmd, exit_code=0, output=output, stderr=None, work_dir=None,
+                                     out_file=None, err_file=None, cmd_sh=None, thread_id=None, task_id=None)
+
+        orig_run_shell_cmd = juliapackage.run_shell_cmd
+        juliapackage.run_shell_cmd = mocked_run_shell_cmd
+        os.environ['EBVERSIONJULIA'] = '1.10.0'
+        try:
+            foo, bar = os.path.join(self.tmpdir, 'Foo'), os.path.join(self.tmpdir, 'Bar')
+            mkdir(os.path.join(bar, '.git'), parents=True)
+            eb.julia_pkg_cmds.extend(eb.pkg_source_cmds(foo))
+            eb.julia_pkg_cmds.extend(eb.pkg_source_cmds(bar))
+            self.assertEqual(eb.julia_pkg_cmds, [
+                'Pkg.develop(PackageSpec(path="%s"); preserve=PRESERVE_ALL)' % foo,
+                'Pkg.build("Foo")',
+                'Pkg.add(url="%s"; preserve=PRESERVE_ALL)' % bar,
+            ])
+
+            # all queued commands are run in a single Julia session, followed by a single precompilation
+            env_path = eb.julia_env_path()
+            self.assertTrue(eb.run_queued_julia_pkg_cmds().startswith("   1234.5 ms"))
+            self.assertEqual(cmds, [
+                "export TEST=1 &&  julia -e 'using Pkg; Pkg.activate(\"%s\"); " % env_path +
+                '; '.join(['Pkg.develop(PackageSpec(path="%s"); preserve=PRESERVE_ALL)' % foo, 'Pkg.build("Foo")',
+                           'Pkg.add(url="%s"; preserve=PRESERVE_ALL)' % bar, 'Pkg.precompile(timing=true)']) +
+                "' ",
+            ])
+            self.assertEqual(eb.julia_pkg_cmds, [])
+
+            # no Julia session if there are no queued commands
+            self.assertEqual(eb.run_queued_julia_pkg_cmds(), '')
+            self.assertEqual(len(cmds), 1)
+
+            # precompilation can be skipped, no timing info for older Julia versions
+            eb.run_julia_pkg_cmds(['Pkg.build("Foo")'], env_path, precompile=False)
+            self.assertTrue(cmds[-1].endswith('Pkg.build("Foo")\' '))
+            os.environ['EBVERSIONJULIA'] = '1.8.5'
+            eb.run_julia_pkg_cmds(['Pkg.build("Foo")'], env_path)
+            self.assertTrue(cmds[-1].endswith('Pkg.build("Foo"); Pkg.precompile()\' '))
+        finally:
+            juliapackage.run_shell_cmd = orig_run_shell_cmd
+
+    def test_hpcg_summary(self):
+        """Test parse_hpcg_summary and compare_hpcg_results functions from HPCG easyblock"""
+        # 'Section::Key=Value' format (HPCG >= 3.0)
+        txt = textwrap.dedent("""
+            HPCG-Benchmark version=3.1
+            GB/s Summary=
+            GB/s Summary::Raw Read B/W=80.5
+            GB/s Summary::Raw Write B/W=18.25
+            GB/s Summary::Raw Total B/W=98.75
+            GFLOP/s Summary=
+            GFLOP/s Summary::Raw DDOT=9.5
+            GFLOP/s Summary::Raw WAXPBY=6.25
+            GFLOP/s Summary::Raw SpMV=12
+            GFLOP/s Summary::Raw MG=13.5
+            GFLOP/s Summary::Raw Total=12.75
+            Final Summary=
+            Final Summary::HPCG result is VALID with a GFLOP/s rating of=12.5
+            Final Summary::Results are valid but execution time (sec) is=60.1
+        """)
+        results = hpcg.parse_hpcg_summary(txt)
+        expected = {
+            'rating': 12.5,
+            'valid': True,
+            'gflops': {'DDOT': 9.5, 'WAXPBY': 6.25, 'SpMV': 12.0, 'MG': 13.5, 'Total': 12.75},
+            'bandwidth': {'Read': 80.5, 'Write': 18.25, 'Total': 98.75},
+        }
+        self.assertEqual(results, expected)
+
+        # YAML format (HPCG 2.x)
+        txt = textwrap.dedent("""
+            HPCG-Benchmark:
+              version: 2.4
+            GB/s Summary:
+              Raw Read B/W: 80.5
+              Raw Write B/W: 18.25
+              Raw Total B/W: 98.75
+            GFLOP/s Summary:
+              Raw DDOT: 9.5
+              Raw WAXPBY: 6.25
+              Raw SpMV: 12
+              Raw MG: 13.5
+              Raw Total: 12.75
+            Final Summary:
+              HPCG result is VALID with a GFLOP/s rating of: 12.5
+        """)
+        self.assertEqual(hpcg.parse_hpcg_summary(txt), expected)
+
+        # invalid run, no rating reported
+        txt = "Final Summary=\nFinal Summary::HPCG result is=INVALID.\n"
+        results = hpcg.parse_hpcg_summary(txt)
+        self.assertEqual(results['rating'], None)
+        self.assertFalse(results['valid'])
+
+        # no regression compared to itself, or within tolerated margin
+        self.assertEqual(hpcg.compare_hpcg_results(expected, expected, 0.05), [])
+        baseline = copy.deepcopy(expected)
+        baseline['rating'] = 13.0
+        self.assertEqual(hpcg.compare_hpcg_results(expected, baseline, 0.05), [])
+
+        baseline['rating'] = 14.0
+        baseline['gflops']['MG'] = 15.0
+        baseline['bandwidth']['Read'] = 80.0
+        # metric missing from baseline is ignored
+        del baseline['gflops']['DDOT']
+        self.assertEqual(hpcg.compare_hpcg_results(expected, baseline, 0.05), [
+            ('rating', 12.5, 14.0),
+            ('gflops/MG', 13.5, 15.0),
+        ])
+        self.assertEqual(hpcg.compare_hpcg_results(expected, baseline, 0.2), [])
+
+    def test_hpl_autotune_helpers(self):
+        """Test helper functions for autotuning in HPL easyblock"""
+        self.assertEqual(hpl.det_hpl_process_grids(1), [(1, 1)])
+        self.assertEqual(hpl.det_hpl_process_grids(12), [(1, 12), (2, 6), (3, 4)])
+        self.assertEqual(hpl.det_hpl_process_grids(16), [(1, 16), (2, 8), (4, 4)])
+
+        # 256GiB of memory, problem sizes must be a multiple of 768 (least common multiple of block sizes)
+        ns = hpl.det_hpl_problem_sizes([0.8, 0.5], [128, 192, 256, 384], 256 * 1024)
+        self.assertEqual(ns, [130560, 165120])
+        self.assertTrue(all(n % 768 == 0 for n in ns))
+
+        hpl_dat = hpl.make_hpl_dat([1000, 2000], [192], [(2, 2), (1, 4)])
+        self.assertTrue(re.search(r'^2 +# of problems sizes \(N\)\n1000 2000 +Ns$', hpl_dat, re.M))
+        self.assertTrue(re.search(r'^2 +# of process grids \(P x Q\)\n2 1 +Ps\n2 4 +Qs$', hpl_dat, re.M))
+
+        output = textwrap.dedent("""
+            T/V                N    NB     P     Q               Time                 Gflops
+            --------------------------------------------------------------------------------
+            WR11C2R4       29184   192     2     2             123.45             1.3456e+02
+            HPL_pdgesv() start time Thu Jan  1 00:00:00 2026
+            WR11C2R4       29184   256     1     4             130.10             1.2768e+02
+        """)
+        self.assertEqual(hpl.parse_hpl_results(output), [
+            ('WR11C2R4', 29184, 192, 2, 2, 123.45, 134.56),
+            ('WR11C2R4', 29184, 256, 1, 4, 130.10, 127.68),
+        ])
+
+    def test_r_exts_sanity_check(self):
+        """Test helper functions for batched sanity check of R extensions in R easyblock"""
+        script = r.make_r_exts_sanity_check_script(['Rcpp', 'data.table'], 1)
+        self.assertTrue(script.startswith('pkgs <- c("Rcpp", "data.table")\nworkers <- 2\n'))
+        self.assertIn('mc.preschedule = FALSE', script)
+
+        output = '\n'.join([
+            "> pkgs <- c(\"Rcpp\", \"data.table\", \"foo\")",
+            "EB_R_EXT_SANITY_CHECK\tRcpp\tOK\t0.123\t",
+            "EB_R_EXT_SANITY_CHECK\tdata.table\tOK\t0.5\t",
+            "EB_R_EXT_SANITY_CHECK\tfoo\tFAIL\tNA\tthere is no package called 'foo'",
+        ])
+        self.assertEqual(r.parse_r_exts_sanity_check_output(output), {
+            'Rcpp': (True, '', 0.123),
+            'data.table': (True, '', 0.5),
+            'foo': (False, "there is no package called 'foo'", None),
+        })
+
+    def test_r_description(self):
+        """Test helper functions to determine required dependencies of R packages in R easyblock"""
+        description = textwrap.dedent("""
+            Package: foo
+            Version: 1.2.3
+            Depends: R (>= 3.5.0), methods
+            Imports: Rcpp (>= 1.0.0),
+                bar,
+                methods
+            LinkingTo: Rcpp, RcppEigen
+            Suggests: testthat
+        """).lstrip()
+
+        pkg_dir = os.path.join(self.tmpdir, 'foo')
+        write_file(os.path.join(pkg_dir, 'DESCRIPTION'), description)
+        # DESCRIPTION file of package bundled with foo should be ignored
+        write_file(os.path.join(pkg_dir, 'inst', 'bundled', 'DESCRIPTION'), "Package: bundled\nDepends: baz\n")
+        src = os.path.join(self.tmpdir, 'foo_1.2.3.tar.gz')
+        with tarfile.open(src, 'w:gz') as tar:
+            tar.add(os.path.join(pkg_dir, 'inst'), arcname='foo/inst')
+            tar.add(os.path.join(pkg_dir, 'DESCRIPTION'), arcname='foo/DESCRIPTION')
+
+        self.assertEqual(r.read_r_description(src), description)
+        fields = r.get_r_description(src)
+        self.assertEqual(fields['Package'], 'foo')
+        self.assertEqual(fields['Imports'], 'Rcpp (>= 1.0.0), bar, methods')
+        self.assertEqual(r.get_r_description_deps(fields), ['methods', 'Rcpp', 'bar', 'RcppEigen'])
+        # result is cached, until source tarball is changed
+        self.assertIs(r.get_r_description(src), fields)
+        st = os.stat(src)
+        os.utime(src, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+        self.assertIsNot(r.get_r_description(src), fields)
+        self.assertEqual(r.get_r_description(src), fields)
+
+        # missing or broken source tarballs are handled gracefully
+        self.assertEqual(r.get_r_description(os.path.join(self.tmpdir, 'nosuchfile.tar.gz')), None)
+        write_file(src, 'not a tarball')
+        self.assertEqual(r.get_r_description(src), None)
+
+    def test_parse_b2_xml_log(self):
+        """Test parse_b2_xml_log function from Boost easyblock"""
+        xml_log = os.path.join(self.tmpdir, 'b2-build-log.xml')
+        write_file(xml_log, textwrap.dedent("""
+            <?xml version="1.0" encoding="utf-8"?>
+            <build format="1.0" version="4.10.1">
+              <action status="0" start="0" end="2" user="1.50" system="0.25">
+                <name><![CDATA[gcc.compile.c++]]></name>
+                <path><![CDATA[bin.v2/libs/filesystem/build/gcc-13/release/path.o]]></path>
+                <command><![CDATA["g++" -c -o "path.o" "libs/filesystem/src/path.cpp"]]></command>
+                <output><![CDATA[]]></output>
+              </action>
+              <action status="0" start="2" end="3" user="0.5" system="0.0">
+                <name><![CDATA[gcc.link.dll]]></name>
+                <path><![CDATA[bin.v2/libs/filesystem/build/gcc-13/release/libboost_filesystem.so.1.85.0]]></path>
+              </action>
+              <action status="0" start="0" end="9" user="8.0" system="1.0">
+                <name><![CDATA[gcc.compile.c++]]></name>
+                <path><![CDATA[bin.v2/libs/serialization/build/gcc-13/release/archive.o]]></path>
+              </action>
+              <action status="0" start="9" end="10" user="0.01" system="0.01">
+                <name><![CDATA[common.copy]]></name>
+                <path><![CDATA[/prefix/include/boost/version.hpp]]></path>
+              </action>
+            </build>
+        """).lstrip())
+        self.assertEqual(boost.parse_b2_xml_log(xml_log), {
+            'filesystem': (2.25, 2),
+            'serialization': (9.0, 1),
+        })
+
+    def test_cuda_components(self):
+        """Test helper functions for installing selected components in CUDA easyblock"""
+        manifest = os.path.join(self.tmpdir, 'version.json')
+        write_file(manifest, json.dumps({
+            'cuda': {'name': 'CUDA SDK', 'version': '12.4.0'},
+            'cuda_nvcc': {'name': 'CUDA NVCC', 'version': '12.4.99'},
+            'cuda_cudart': {'name': 'CUDA Runtime (cudart)', 'version': '12.4.99'},
+            'nsight_compute': {'name': 'Nsight Compute', 'version': '2024.1.0.13'},
+            'nsight_systems': {'name': 'Nsight Systems', 'version': '2023.4.4.54'},
+        }))
+        components = cuda.read_cuda_components_manifest(manifest)
+        self.assertEqual(components['cuda_nvcc'], '12.4.99')
+        self.assertEqual(cuda.select_cuda_components(sorted(components), ['*'], exclude=['nsight_*', 'cuda']),
+                         ['cuda_cudart', 'cuda_nvcc'])
+        self.assertEqual(cuda.select_cuda_components(sorted(components), ['nsight_*']),
+                         ['nsight_compute', 'nsight_systems'])
+
+        for method in cuda.CUDA_COMPONENTS_INSTALL_METHODS:
+            src_dir = os.path.join(self.tmpdir, method, 'builds', 'cuda_nvcc')
+            write_file(os.path.join(src_dir, 'bin', 'nvcc'), 'nvcc')
+            write_file(os.path.join(src_dir, 'targets', 'x86_64-linux', 'lib', 'libfoo.so.1'), 'foo')
+            symlink('libfoo.so.1', os.path.join(src_dir, 'targets', 'x86_64-linux', 'lib', 'libfoo.so'),
+                    use_abspath_source=False)
+            target_dir = os.path.join(self.tmpdir, method, 'install')
+            write_file(os.path.join(target_dir, 'bin', 'nvcc'), 'old')
+
+            self.assertEqual(cuda.merge_tree(src_dir, target_dir, method=method), 3)
+            self.assertEqual(read_file(os.path.join(target_dir, 'bin', 'nvcc')), 'nvcc')
+            libfoo = os.path.join(target_dir, 'targets', 'x86_64-linux', 'lib', 'libfoo.so')
+            self.assertEqual(os.readlink(libfoo), 'libfoo.so.1')
+            self.assertEqual(read_file(libfoo), 'foo')
+            # source files are still in place when hardlinking
+            self.assertEqual(os.path.exists(os.path.join(src_dir, 'bin', 'nvcc')), method == 'hardlink')
+
+            # merge two components with overlapping entries, incl. a symlink to a directory
+            target_dir = os.path.join(self.tmpdir, method, 'overlap')
+            for comp in ['cuda_cudart', 'cuda_cupti']:
+                src_dir = os.path.join(self.tmpdir, method, 'builds', comp)
+                write_file(os.path.join(src_dir, 'include', 'common.h'), comp)
+                write_file(os.path.join(src_dir, 'targets', 'x86_64-linux', 'lib', 'lib%s.so' % comp), comp)
+                symlink(os.path.join('targets', 'x86_64-linux', 'lib'), os.path.join(src_dir, 'lib64'),
+                        use_abspath_source=False)
+                self.assertEqual(cuda.merge_tree(src_dir, target_dir, method=method), 3)
+
+            self.assertEqual(read_file(os.path.join(target_dir, 'include', 'common.h')), 'cuda_cupti')
+            lib64 = os.path.join(target_dir, 'lib64')
+            self.assertEqual(os.readlink(lib64), os.path.join('targets', 'x86_64-linux', 'lib'))
+            self.assertEqual(sorted(os.listdir(lib64)), ['libcuda_cudart.so', 'libcuda_cupti.so'])
+
+        self.assertErrorRegex(EasyBuildError, "Unknown method", cuda.merge_tree, src_dir, target_dir, method='copy')
+
+    def test_mpi_benchmark_helpers(self):
+        """Test helper functions for MPI benchmark run as part of sanity check of MPI libraries"""
+        output = textwrap.dedent("""
+            pingpong 1 0.254 3.937
+            pingpong 4194304 612.345 6849.481
+            alltoall 1 1.123
+            alltoall 65536 52.500
+        """)
+        results = mpihelpers.parse_mpi_benchmark_output(output)
+        self.assertEqual(results, {
+            'pingpong': {1: (0.254, 3.937), 4194304: (612.345, 6849.481)},
+            'alltoall': {1: 1.123, 65536: 52.5},
+        })
+        self.assertEqual(mpihelpers.check_mpi_benchmark_results(results, max_latency=10, min_bandwidth=1000), [])
+        self.assertEqual(mpihelpers.check_mpi_benchmark_results(results), [])
+
+        errors = mpihelpers.check_mpi_benchmark_results(results, max_latency=0.1, min_bandwidth=10000)
+        self.assertEqual(errors, [
+            "latency for 1 byte messages is 0.25 us, should be at most 0.1 us",
+            "bandwidth for 4194304 byte messages is 6849.5 MB/s, should be at least 10000 MB/s",
+        ])
+        self.assertEqual(mpihelpers.check_mpi_benchmark_results(mpihelpers.parse_mpi_benchmark_output('')), [
+            "no results found for MPI ping-pong benchmark",
+            "no results found for MPI alltoall benchmark",
+        ])
+
+    def test_ucx_plugins_makefile(self):
+        """Test mk_ucx_plugins_makefile function from UCX-Plugins easyblock"""
+        makefile_dirs = ['uct/cuda', 'ucm/cuda', 'tools/perf/cuda']
+        txt = ucx_plugins.mk_ucx_plugins_makefile(makefile_dirs, make_args='V=1 install')
+        self.assertEqual(txt, '\n'.join([
+            "all: uct_cuda ucm_cuda tools_perf_cuda",
+            ".PHONY: all uct_cuda ucm_cuda tools_perf_cuda",
+            "uct_cuda:",
+            "\t$(MAKE) -C src/uct/cuda V=1 install",
+            "ucm_cuda:",
+            "\t$(MAKE) -C src/ucm/cuda V=1 install",
+            "tools_perf_cuda: uct_cuda",
+            "\t$(MAKE) -C src/tools/perf/cuda V=1 install",
+        ]) + '\n')
+        # no dependency on plugin directory that is not being built
+        txt = ucx_plugins.mk_ucx_plugins_makefile(['tools/perf/rocm'])
+        self.assertIn("tools_perf_rocm:\n\t$(MAKE) -C src/tools/perf/rocm\n", txt)
+
+    def test_opam_helpers(self):
+        """Test helper functions for installing OCaml packages with opam in OCaml easyblock"""
+        cmd = ocaml.mk_opam_install_cmd([('dune', '3.16.0'), ('ocamlfind', '1.9.6')], parallel=4)
+        self.assertEqual(cmd, ' && '.join([
+            "eval `opam config env`",
+            "opam pin -yv --no-action add dune 3.16.0",
+            "opam pin -yv --no-action add ocamlfind 1.9.6",
+            "opam install -yv --jobs=4 dune.3.16.0 ocamlfind.1.9.6",
+        ]))
+
+        output = textwrap.dedent("""
+            # Packages matching: installed
+            # Name        # Installed # Synopsis
+            base-bigarray base
+            dune          3.16.0      Fast, portable, and opinionated build system
+            ocamlfind     1.9.6       A library manager for OCaml
+        """)
+        self.assertEqual(ocaml.parse_opam_list(output),
+                         {'base-bigarray': 'base', 'dune': '3.16.0', 'ocamlfind': '1.9.6'})
+
+    def test_parse_octave_pkg_list(self):
+        """Test parse_octave_pkg_list function from Octave easyblock"""
+        output = textwrap.dedent("""
+            Package Name  | Version | Installation directory
+            --------------+---------+-----------------------
+                 control *|   3.4.0 | /apps/Octave/share/octave/packages/control-3.4.0
+                  signal  |   1.4.1 | /apps/Octave/share/octave/packages/signal-1.4.1
+        """)
+        self.assertEqual(octave.parse_octave_pkg_list(output), {
+            'control': '3.4.0',
+            'signal': '1.4.1',
+        })
+        self.assertEqual(octave.parse_octave_pkg_list("no packages installed.\n"), {})
+
+    def test_make_jobserver(self):
+        """Test helper functions for GNU make jobserver shared across extensions"""
+        fifo = os.path.join(self.tmpdir, 'jobserver.fifo')
+        fd = extensionhelpers.start_make_jobserver(fifo, 3)
+        self.assertTrue(stat.S_ISFIFO(os.stat(fifo).st_mode))
+
+        self.assertEqual(extensionhelpers.make_jobserver_makeflags(fifo, 3), '-j3 --jobserver-auth=fifo:' + fifo)
+        self.assertEqual(extensionhelpers.make_jobserver_makeflags(fifo, 3, makeflags='-k'),
+                         '-k -j3 --jobserver-auth=fifo:' + fifo)
+
+        # wrapped command holds a token while it runs, and returns it afterwards (also on failure)
+        cmd = extensionhelpers.make_jobserver_cmd("echo 'running'; exit 5", fifo)
+        res = run_shell_cmd(cmd, fail_on_error=False, hidden=True)
+        self.assertEqual(res.exit_code, 5)
+        self.assertEqual(res.output.strip(), 'running')
+
+        os.set_blocking(fd, False)
+        self.assertEqual(os.read(fd, 10), b'+++')
+
+        extensionhelpers.stop_make_jobserver(fifo, fd)
+        self.assertNotExists(fifo)
+        self.assertRaises(OSError, os.fstat, fd)
+
+        # jobserver is only stopped by parent installation if one was started
+        class Master:
+            def __init__(self):
+                self.log = fancylogger.getLogger('test', fname=False)
+
+        master = Master()
+        extensionhelpers.stop_exts_make_jobserver(master)
+        self.assertEqual(master.exts_make_jobserver, False)
+        fd = extensionhelpers.start_make_jobserver(fifo, 2)
+        master.exts_make_jobserver = (fifo, 2, fd)
+        extensionhelpers.stop_exts_make_jobserver(master)
+        self.assertEqual(master.exts_make_jobserver, False)
+        self.assertNotExists(fifo)
+        self.assertRaises(OSError, os.fstat, fd)
+
+    def test_ext_pkgs_list_sanity_check(self):
+        """Test ext_pkgs_list_sanity_check helper function for extensions"""
+        exts_filter = ("pkg-check %(ext_name)s", '')
+
+        class Cfg(dict):
+            def get_ref(self, key):
+                return self.get(key)
+
+        class Master:
+            pass
+
+        class Ext:
+            def __init__(self, name, version, options=None, cfg=None):
+                self.name, self.version, self.options = name, version, options or {}
+                self.cfg = Cfg(cfg or {})
+                self.master, self.is_extension, self.dry_run = master, True, False
+                self.log = fancylogger.getLogger('test', fname=False)
+
+        def parse_output(output):
+            return dict(line.split() for line in output.splitlines())
+
+        def check(ext, list_cmd="printf 'foo 1.0\\nbar 2.0\\n'"):
+            return extensionhelpers.ext_pkgs_list_sanity_check(ext, exts_filter, list_cmd, parse_output, 'test_pkgs')
+
+        master = Master()
+        self.assertEqual(check(Ext('foo', '1.0')), (True, ''))
+        self.assertEqual(master.test_pkgs, {'foo': '1.0', 'bar': '2.0'})
+        # list of installed packages is only determined once
+        self.assertEqual(check(Ext('bar', '2.0'), list_cmd='false'), (True, ''))
+        self.assertEqual(check(Ext('bar', '2.1'), list_cmd='false'),
+                         (False, "Found version 2.0 of package bar rather than 2.1"))
+        self.assertEqual(check(Ext('baz', '1.0'), list_cmd='false'),
+                         (False, "Package baz not found in output of 'false'"))
+        self.assertEqual(check(Ext('foo', '1.0', cfg={'exts_filter': list(exts_filter)})), (True, ''))
+
+        # standard sanity check is used if 'modulename' is specified, for custom exts_filter,
+        # or when installed packages can not be listed
+        self.assertEqual(check(Ext('foo', '1.0', options={'modulename': False})), None)
+        self.assertEqual(check(Ext('foo', '1.0', options={'modulename': 'Foo'})), None)
+        self.assertEqual(check(Ext('foo', '1.0', cfg={'exts_filter': ("check %(ext_name)s", '')})), None)
+        master = Master()
+        self.assertEqual(check(Ext('foo', '1.0'), list_cmd='false'), None)
+        self.assertEqual(master.test_pkgs, {})
+
+    def test_ext_batch(self):
+        """Test det_ext_batch helper function for extensions"""
+        class Master:
+            pass
+
+        class Ext:
+            def __init__(self, name):
+                self.name, self.master = name, master
+
+        master = Master()
+        master.ext_instances = [Ext(name) for name in ['pkg1', 'pkg2', 'other', 'pkg3', 'pkg4', 'pkg5']]
+        exts = master.ext_instances
+
+        def batchable(ext):
+            return ext.name.startswith('pkg')
+
+        def batch_names(ext):
+            return [x.name for x in extensionhelpers.det_ext_batch(ext, batchable)]
+
+        # batch only includes contiguous run of extensions starting at specified extension
+        self.assertEqual(batch_names(exts[0]), ['pkg1', 'pkg2'])
+        self.assertEqual(batch_names(exts[1]), ['pkg2'])
+        self.assertEqual(batch_names(exts[3]), ['pkg3', 'pkg4', 'pkg5'])
+        self.assertEqual(batch_names(exts[5]), ['pkg5'])
+
+    def test_exts_install_history(self):
+        """Test helper functions for history of installation times of extensions"""
+        from concurrent.futures import ThreadPoolExecutor
+
+        class Ext:
+            def __init__(self, name, version, src=None):
+                self.name, self.version, self.src = name, version, src
+
+        self.assertEqual(extensionhelpers.det_exts_install_history_path(False), None)
+        self.assertEqual(extensionhelpers.det_exts_install_history_path('/tmp/hist.json'), '/tmp/hist.json')
+        os.environ['XDG_CACHE_HOME'] = self.tmpdir
+        self.assertEqual(extensionhelpers.det_exts_install_history_path(True),
+                         os.path.join(self.tmpdir, extensionhelpers.EXTS_INSTALL_HISTORY_FILE))
+
+        exts = [Ext('foo', '1.0'), Ext('bar', '2.0'), Ext('baz', '3.0')]
+        with ThreadPoolExecutor(max_workers=2) as thread_pool:
+            for ext, cmd in zip(exts, ['true', 'false']):
+                task = thread_pool.submit(run_shell_cmd, cmd, fail_on_error=False, hidden=True)
+                self.assertIs(extensionhelpers.track_ext_install_duration(ext, task), task)
+        self.assertTrue(exts[0].install_duration >= 0)
+        # no installation time for failed installation
+        self.assertFalse(hasattr(exts[1], 'install_duration'))
+
+        path = os.path.join(self.tmpdir, 'history', 'times.json')
+        exts[0].install_duration, exts[2].install_duration = 12.34, 40
+        extensionhelpers.update_exts_install_history(path, exts)
+        self.assertEqual(extensionhelpers.read_exts_install_history(path), {'foo': {'1.0': 12.3}, 'baz': {'3.0': 40}})
+        exts = [Ext('foo', '1.1'), Ext('baz', '3.0')]
+        exts[0].install_duration = 20
+        extensionhelpers.update_exts_install_history(path, exts)
+        history = extensionhelpers.read_exts_install_history(path)
+        self.assertEqual(history, {'foo': {'1.0': 12.3, '1.1': 20}, 'baz': {'3.0': 40}})
+
+        # concurrent updates of history file do not clobber each other
+        def update_history(idx):
+            ext = Ext('ext%d' % idx, '1.0')
+            ext.install_duration = idx
+            extensionhelpers.update_exts_install_history(path, [ext])
+
+        with ThreadPoolExecutor(max_workers=4) as thread_pool:
+            list(thread_pool.map(update_history, range(1, 17)))
+        concurrent_history = extensionhelpers.read_exts_install_history(path)
+        self.assertEqual(sorted(concurrent_history), sorted(['foo', 'baz'] + ['ext%d' % i for i in range(1, 17)]))
+        self.assertExists(path + '.lock')
+
+        # weight is installation time of same version (or latest version),
+        # or estimated based on size of source for unknown extensions
+        src = os.path.join(self.tmpdir, 'qux.tar.gz')
+        write_file(src, 'x' * 4 * 1024 ** 2)
+        exts = [Ext('foo', '1.2'), Ext('baz', '3.0'), Ext('qux', '1.0', src=src)]
+        weight_func = extensionhelpers.make_ext_weight_func(exts, history)
+        self.assertEqual([weight_func(ext) for ext in exts], [20, 40, 120])
+
+    def test_critical_path_priorities(self):
+        """Test det_critical_path_priorities helper function for extensions"""
+        # a <- b <- d, a <- c, e (independent)
+        deps = [[], [0], [0], [1], []]
+        weights = [1, 2, 1, 3, 4]
+        priorities = extensionhelpers.det_critical_path_priorities(deps, weights)
+        self.assertEqual(priorities, [6, 5, 1, 3, 4])
+        # sorting by priority results in valid installation order
+        order = sorted(range(len(deps)), key=lambda idx: (-priorities[idx], idx))
+        self.assertEqual(order, [0, 1, 4, 3, 2])
+
+        # nodes in dependency cycle only get their own weight
+        self.assertEqual(extensionhelpers.det_critical_path_priorities([[1], [0], [1]], [1, 1, 1]), [1, 1, 1])
+
     def test_translate_lammps_version(self):
         """Test translate_lammps_version function from LAMMPS easyblock"""
         lammps_versions = {
@@ -654,6 +1512,161 @@ class EasyBlockSpecificTest(TestCase):
 
         self.assertEqual(lammps.translate_lammps_version('d3adb33f', path=self.tmpdir), '2025.04.02.3')
 
+    def test_lower_gemm_benchmark_coretypes(self):
+        """Test det_lower_gemm_benchmark_coretypes function from OpenBLAS easyblock"""
+        coretypes = ['Prescott', 'Nehalem', 'Sandybridge', 'Haswell', 'SkylakeX']
+        det_lower_coretypes = openblas.det_lower_gemm_benchmark_coretypes
+        self.assertEqual(det_lower_coretypes('HASWELL', coretypes, openblas.X86_64),
+                         ['Prescott', 'Nehalem', 'Sandybridge'])
+        self.assertEqual(det_lower_coretypes('Prescott', coretypes, openblas.X86_64), [])
+        self.assertEqual(det_lower_coretypes('SkylakeX', coretypes, openblas.X86_64),
+                         ['Prescott', 'Nehalem', 'Sandybridge', 'Haswell'])
+        # unknown auto-selected core type, or unknown CPU architecture
+        self.assertEqual(det_lower_coretypes('Zen', coretypes, openblas.X86_64), None)
+        self.assertEqual(det_lower_coretypes('NEOVERSEN1', ['ARMV8', 'NEOVERSEV1'], openblas.AARCH64), ['ARMV8'])
+        self.assertEqual(det_lower_coretypes('Haswell', coretypes, openblas.POWER), None)
+
+    def test_openblas_lapack_test_output(self):
+        """Test parsing of output of LAPACK test suite in OpenBLAS easyblock"""
+        test_output = textwrap.dedent("""
+            Testing REAL Linear-Equation-Routines-LIN/stest.in
+             SGE:    3 out of  1558 tests failed to pass the threshold
+            Testing COMPLEX16 Generalized-Nonsymmetric-Eigenvalue-Problem-Driver-EIG/zgd.in
+             ZGV drivers:    2 out of   1092 tests failed to pass the threshold
+             SGE:    1 out of   500 tests failed to pass the threshold
+
+                                    -->   LAPACK TESTING SUMMARY  <--
+            SUMMARY                 nb test run     numerical error         other error
+            ================        ===========     =================       ================
+            REAL                    1327023         4       (0.000%)        0       (0.000%)
+            DOUBLE PRECISION        1300917         0       (0.000%)        0       (0.000%)
+            COMPLEX                 786775          0       (0.000%)        1       (0.000%)
+            COMPLEX16               787213          2       (0.000%)        0       (0.000%)
+
+            --> ALL PRECISIONS      4201928         6       (0.000%)        1       (0.000%)
+        """)
+        summary, routine_failures = openblas.parse_lapack_test_output(test_output.splitlines())
+        self.assertEqual(summary, {
+            'REAL': (1327023, 4, 0),
+            'DOUBLE PRECISION': (1300917, 0, 0),
+            'COMPLEX': (786775, 0, 1),
+            'COMPLEX16': (787213, 2, 0),
+            'ALL PRECISIONS': (4201928, 6, 1),
+        })
+        self.assertEqual(routine_failures, {'SGE': 4, 'ZGV drivers': 2})
+
+        self.assertEqual(openblas.parse_lapack_test_output(['no summary here']), ({}, {}))
+
+        bench_output = '\n'.join([
+            "GEMM corename=Haswell precision=d size=1024 threads=4 gflops=123.456",
+            "GEMM corename=Sandybridge precision=s size=256 threads=1 gflops=30.5",
+        ])
+        self.assertEqual(openblas.parse_gemm_benchmark_output(bench_output),
+                         [('Haswell', 'd', 1024, 4, 123.456), ('Sandybridge', 's', 256, 1, 30.5)])
+
+    def test_perl_module_async_test_failure(self):
+        """Test whether failing tests of Perl module installed asynchronously as extension are reported"""
+        from concurrent.futures import ThreadPoolExecutor
+
+        test_ec_path = os.path.join(self.tmpdir, 'test.eb')
+        write_file(test_ec_path, '\n'.join([
+            "easyblock = 'Bundle'",
+            "name = 'test'",
+            "version = '1.0'",
+            "homepage = 'https://example.com'",
+            "description = 'just a test'",
+            "toolchain = SYSTEM",
+        ]))
+        master = get_easyblock_instance(process_easyconfig(test_ec_path)[0])
+        master.installdir = os.path.join(self.tmpdir, 'install')
+
+        # Perl module with failing tests
+        srcdir = os.path.join(self.tmpdir, 'Foo-1.0')
+        write_file(os.path.join(srcdir, 'Makefile.PL'), textwrap.dedent("""
+            open(my $fh, '>', 'Makefile') or die;
+            print $fh "all:\\n\\ttrue\\ntest:\\n\\tfalse\\ninstall:\\n\\ttrue\\n";
+            close($fh);
+        """))
+        ext = perlmodule.PerlModule(master, {'name': 'Foo', 'version': '1.0', 'options': {'runtest': 'test'}})
+        cwd = change_dir(srcdir)
+        cmd = ext.perl_module_cmd()
+        change_dir(cwd)
+
+        with ThreadPoolExecutor(max_workers=1) as thread_pool:
+            ext.async_cmd_task = thread_pool.submit(run_shell_cmd, cmd, fail_on_error=False, hidden=True,
+                                                    work_dir=srcdir)
+        # exit code of test command is masked, so that installation still completes
+        self.assertEqual(ext.async_cmd_task.result().exit_code, 0)
+        self.assertIn(perlmodule.PERL_TEST_FAILURE_MARKER, ext.async_cmd_task.result().output)
+
+        self.assertErrorRegex(EasyBuildError, "Tests failed for Perl module Foo", ext.post_install_extension)
+
+        # failing tests can be ignored
+        update_build_option('ignore_test_failure', True)
+        try:
+            self.mock_stderr(True)
+            ext.post_install_extension()
+            stderr = self.get_stderr()
+            self.mock_stderr(False)
+        finally:
+            update_build_option('ignore_test_failure', False)
+        self.assertIn("Test failure ignored: Tests failed for Perl module Foo", stderr)
+
+        # tests are not run when test step is skipped, also for Perl modules using Build.PL
+        remove_dir(srcdir)
+        write_file(os.path.join(srcdir, 'Build.PL'), '')
+        cwd = change_dir(srcdir)
+        self.assertIn("perl Build test", ext.perl_module_cmd())
+        update_build_option('skip_test_step', True)
+        try:
+            cmd = ext.perl_module_cmd()
+        finally:
+            update_build_option('skip_test_step', False)
+            change_dir(cwd)
+        self.assertNotIn("perl Build test", cmd)
+        self.assertNotIn(perlmodule.PERL_TEST_FAILURE_MARKER, cmd)
+        self.assertIn("perl Build install", cmd)
+
+    def test_perl_module_meta(self):
+        """Test obtaining metadata from source tarball of Perl module."""
+        srcdir = os.path.join(self.tmpdir, 'Foo-Bar-1.0')
+        write_file(os.path.join(srcdir, 'META.yml'), textwrap.dedent("""
+            ---
+            name: Foo-Bar
+            requires:
+              perl: 5.006
+              LWP::UserAgent: 0
+              'Test::More': '0.88'
+            configure_requires:
+              ExtUtils::MakeMaker: 6.30
+            provides:
+              Foo::Bar:
+                file: lib/Foo/Bar.pm
+                version: 1.0
+            version: 1.0
+        """))
+        tarball = os.path.join(self.tmpdir, 'Foo-Bar-1.0.tar.gz')
+        with tarfile.open(tarball, 'w:gz') as tar:
+            tar.add(srcdir, arcname='Foo-Bar-1.0')
+
+        self.assertEqual(perlmodule.get_perl_meta(tarball), {
+            'name': 'Foo-Bar',
+            'prereqs': {
+                'configure': {'requires': {'ExtUtils::MakeMaker': '6.30'}},
+                'runtime': {'requires': {'perl': '5.006', 'LWP::UserAgent': '0', 'Test::More': '0.88'}},
+            },
+            'provides': {'Foo::Bar': {}},
+        })
+
+        # META.json takes precedence over META.yml
+        meta_json = {'name': 'Foo-Bar', 'prereqs': {'test': {'requires': {'Test::Deep': '0'}}}}
+        write_file(os.path.join(srcdir, 'META.json'), json.dumps(meta_json))
+        with tarfile.open(tarball, 'w:gz') as tar:
+            tar.add(srcdir, arcname='Foo-Bar-1.0')
+        self.assertEqual(perlmodule.get_perl_meta(tarball), meta_json)
+
+        self.assertEqual(perlmodule.get_perl_meta(os.path.join(self.tmpdir, 'nosuchfile.tar.gz')), None)
+
     def test_pytorch_test_log_parsing(self):
         """Verify parsing of XML files produced by PyTorch tests."""
         TestState = pytorch.TestState
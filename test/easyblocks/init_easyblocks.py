@@ -218,7 +218,10 @@ def suite(loader):
     # dynamically generate a separate test for each of the available easyblocks
     easyblocks_path = get_paths_for("easyblocks")[0]
     all_pys = glob.glob('%s/*/*.py' % easyblocks_path)
-    easyblocks = [eb for eb in all_pys if not eb.endswith('__init__.py') and '/test/' not in eb]
+    # modules with helper functions for easyblocks do not provide an easyblock class
+    helper_modules = ['extensionhelpers.py', 'filehelpers.py', 'mpihelpers.py']
+    easyblocks = [eb for eb in all_pys if not eb.endswith('__init__.py') and '/test/' not in eb and
+                  os.path.basename(eb) not in helper_modules]
 
     for easyblock in easyblocks:
         easyblock_fn = os.path.basename(easyblock)
@@ -442,8 +442,10 @@ def suite(loader):
     all_pys = glob.glob('%s/*/*.py' % easyblocks_path)
     easyblocks = [eb for eb in all_pys if os.path.basename(eb) != '__init__.py' and '/test/' not in eb]
 
-    # filter out no longer supported easyblocks, or easyblocks that are tested in a different way
-    excluded_easyblocks = ['versionindependendpythonpackage.py']
+    # filter out no longer supported easyblocks, or easyblocks that are tested in a different way,
+    # and modules that only provide helper functions for easyblocks
+    excluded_easyblocks = ['versionindependendpythonpackage.py', 'extensionhelpers.py', 'filehelpers.py',
+                           'mpihelpers.py']
     easyblocks = [e for e in easyblocks if os.path.basename(e) not in excluded_easyblocks]
 
     # add dummy PrgEnv-* modules, required for testing CrayToolchain easyblock